@@ -1,6 +1,9 @@
+from collections import namedtuple
+
 import numpy as np
 import scipy.sparse as sprs
 from scipy.sparse import csgraph
+from numba import njit
 from openpnm._skgraph.tools import conns_to_am, dict_to_am, dict_to_im
 from openpnm._skgraph.tools import istriu, isgtriu
 from openpnm._skgraph.tools import get_node_prefix, get_edge_prefix
@@ -16,6 +19,7 @@ __all__ = [
     'find_complementary_nodes',
     'find_complementary_edges',
     'find_path',
+    'find_shortest_paths',
     'find_coordination',
 ]
 
@@ -171,7 +175,8 @@ def find_connected_nodes(network, inds, flatten=True, logic='or'):
     return neighbors
 
 
-def find_neighbor_edges(network, inds, flatten=True, logic='or'):
+def find_neighbor_edges(network, inds, flatten=True, logic='or',
+                        ragged=False):
     r"""
     Finds all edges that are connected to the given input nodes
 
@@ -209,11 +214,18 @@ def find_neighbor_edges(network, inds, flatten=True, logic='or'):
                 'and'.
         ======= ===============================================================
 
+    ragged : bool
+        If ``True`` the neighbors of each input node are returned as a CSR
+        style ragged array, and ``flatten`` is ignored. The default is
+        ``False``.
+
     Returns
     -------
     An array containing the neighboring edges filtered by the given logic. If
     ``flatten`` is ``False`` then the result is a list of lists containing the
-    neighbors of each given input node.
+    neighbors of each given input node. If ``ragged`` is ``True`` then the
+    result is a namedtuple with ``indptr`` and ``indices`` attributes, where
+    the neighbors of the i-th input node are ``indices[indptr[i]:indptr[i+1]]``.
 
     Notes
     -----
@@ -224,43 +236,33 @@ def find_neighbor_edges(network, inds, flatten=True, logic='or'):
     if global sites are considered.
 
     """
-    if flatten == False:
-        im = dict_to_im(network)
+    if (flatten is False) or ragged:
+        im = dict_to_im(network).tocsr()
         am = None
     else:
         am = dict_to_am(network)
         im = None
     if im is not None:
-        if im.format != 'lil':
-            im = im.tolil(copy=False)
-        rows = [im.rows[i] for i in np.array(inds, ndmin=1, dtype=np.int64)]
-        if len(rows) == 0:
+        inds = np.array(inds, ndmin=1, dtype=np.int64)
+        if (len(inds) == 0) and not ragged:
             return []
-        neighbors = np.hstack(rows).astype(np.int64)
-        n_bonds = int(im.nnz / 2)
+        indptr, neighbors = _gather_rows(im, inds)
+        counts = np.bincount(neighbors, minlength=im.shape[1])
         if logic in ['or', 'union', 'any']:
-            neighbors = np.unique(neighbors)
+            mask = counts > 0
         elif logic in ['xor', 'exclusive_or']:
-            neighbors = np.unique(np.where(np.bincount(neighbors) == 1)[0])
+            mask = counts == 1
         elif logic in ['xnor', 'shared']:
-            neighbors = np.unique(np.where(np.bincount(neighbors) > 1)[0])
+            mask = counts > 1
         elif logic in ['and', 'all', 'intersection']:
-            neighbors = set(neighbors)
-            [neighbors.intersection_update(i) for i in rows]
-            neighbors = np.array(list(neighbors), dtype=int, ndmin=1)
+            mask = counts == len(inds)
         else:
             raise Exception('Specified logic is not implemented')
-        if (flatten is False):
-            if (neighbors.size > 0):
-                mask = np.zeros(shape=n_bonds, dtype=bool)
-                mask[neighbors] = True
-                for i in range(len(rows)):
-                    vals = np.array(rows[i], dtype=np.int64)
-                    rows[i] = vals[mask[vals]]
-                neighbors = rows
-            else:
-                neighbors = [np.array([], dtype=np.int64) for i in range(len(inds))]
-        return neighbors
+        neighbors = _filter_ragged(indptr, neighbors, mask[neighbors])
+        if ragged:
+            return neighbors
+        # The list is made of views into the ragged array
+        return np.split(neighbors.indices, neighbors.indptr[1:-1])
     elif am is not None:
         if am.format != 'coo':
             am = am.tocoo(copy=False)
@@ -288,7 +290,7 @@ def find_neighbor_edges(network, inds, flatten=True, logic='or'):
 
 
 def find_neighbor_nodes(network, inds, flatten=True, include_input=False,
-                        logic='or'):
+                        logic='or', ragged=False):
     r"""
     Finds all nodes that are directly connected to the input nodes
 
@@ -329,12 +331,20 @@ def find_neighbor_nodes(network, inds, flatten=True, include_input=False,
                 'and'.
         ======= ===============================================================
 
+    ragged : bool
+        If ``True`` the neighbors of each input node are returned as a CSR
+        style ragged array, and ``flatten`` is ignored. The default is
+        ``False``.
+
     Returns
     -------
     nodes : ndarray
         An array containing the neighboring nodes filtered by the given logic.  If
         ``flatten`` is ``False`` then the result is a list of lists containing the
-        neighbors of each input site.
+        neighbors of each input site. If ``ragged`` is ``True`` then the
+        result is a namedtuple with ``indptr`` and ``indices`` attributes,
+        where the neighbors of the i-th input node are
+        ``indices[indptr[i]:indptr[i+1]]``.
 
     Notes
     -----
@@ -343,47 +353,57 @@ def find_neighbor_nodes(network, inds, flatten=True, include_input=False,
     This is because the list of global nodes might be very large.
 
     """
-    g = network
-    nodes = np.array(inds, ndmin=1)
+    nodes = np.array(inds, ndmin=1, dtype=np.int64)
     # Short-circuit the function if the input list is already empty
-    if len(nodes) == 0:
-        return []
-    am_coo = dict_to_am(g)
-    am = am_coo.tolil(copy=False)
-    rows = am.rows[nodes].tolist()
-    if len(rows) == 0:
+    if (len(nodes) == 0) and not ragged:
         return []
+    am = dict_to_am(network).tocsr()
     n_nodes = am.shape[0]
-    neighbors = am_coo.col[np.in1d(am_coo.row, nodes)]
+    # The logic is applied to the neighbors of each unique input
+    neighbors = _gather_rows(am, np.unique(nodes))[1]
+    counts = np.bincount(neighbors, minlength=n_nodes)
     if logic in ['or', 'union', 'any']:
-        neighbors = np.unique(neighbors)
+        mask = counts > 0
     elif logic in ['xor', 'exclusive_or']:
-        neighbors = np.unique(np.where(np.bincount(neighbors) == 1)[0])
+        mask = counts == 1
     elif logic in ['xnor', 'nxor']:
-        neighbors = np.unique(np.where(np.bincount(neighbors) > 1)[0])
+        mask = counts > 1
     elif logic in ['and', 'all', 'intersection']:
-        neighbors = set(neighbors)
-        [neighbors.intersection_update(i) for i in rows]
-        neighbors = np.array(list(neighbors), dtype=np.int64, ndmin=1)
+        mask = counts == np.unique(nodes).size
     else:
         raise Exception('Specified logic is not implemented')
     # Deal with removing inputs or not
-    mask = np.zeros(shape=n_nodes, dtype=bool)
-    mask[neighbors] = True
     if not include_input:
         mask[nodes] = False
     # Finally flatten or not
-    if flatten:
-        neighbors = np.where(mask)[0]
-    else:
-        if neighbors.size > 0:
-            for i in range(len(rows)):
-                vals = np.array(rows[i], dtype=np.int64)
-                rows[i] = vals[mask[vals]]
-            neighbors = rows
-        else:
-            neighbors = [np.array([], dtype=int) for i in range(len(nodes))]
-    return neighbors
+    if flatten and not ragged:
+        return np.where(mask)[0]
+    indptr, neighbors = _gather_rows(am, nodes)
+    neighbors = _filter_ragged(indptr, neighbors, mask[neighbors])
+    if ragged:
+        return neighbors
+    # The list is made of views into the ragged array
+    return np.split(neighbors.indices, neighbors.indptr[1:-1])
+
+
+def _gather_rows(csr, inds):
+    # Returns the entries in the given rows of a canonical CSR matrix as a
+    # ragged array, given by indptr and indices
+    starts = csr.indptr[inds]
+    counts = csr.indptr[inds + 1] - starts
+    indptr = np.zeros(len(inds) + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    locs = np.repeat(starts - indptr[:-1], counts) + np.arange(indptr[-1])
+    return indptr, csr.indices[locs].astype(np.int64)
+
+
+def _filter_ragged(indptr, indices, keep):
+    # Removes the entries of a ragged array where keep is False
+    row = np.repeat(np.arange(indptr.size - 1), np.diff(indptr))
+    new = np.zeros_like(indptr)
+    np.cumsum(np.bincount(row[keep], minlength=indptr.size - 1), out=new[1:])
+    tup = namedtuple('neighbors', ('indptr', 'indices'))
+    return tup(new, indices[keep])
 
 
 def find_connecting_edges(inds, network=None, am=None):
@@ -410,30 +430,47 @@ def find_connecting_edges(inds, network=None, am=None):
 
     Notes
     -----
-    The adjacency matrix is converted to the ``DOK`` format internally if
-    needed, so if this format is already available it should be provided to
-    save time.
+    Each pair of nodes is converted to a single integer key, and all pairs
+    are looked up at once with ``numpy.searchsorted`` in the sorted keys
+    of the edges (or of the non-zero locations of ``am``), so millions of
+    pairs can be processed quickly.
 
     """
     nodes = np.array(inds, ndmin=2)
     # Short-circuit function if nodes is an empty list
     if nodes.size == 0:
         return []
+    nodes = nodes.astype(np.int64)
     if network is not None:
         edge_prefix = get_edge_prefix(network)
-        am = dict_to_am(
-            network,
-            weights=np.arange(network[edge_prefix+'.conns'].shape[0])
-        )
+        conns = np.array(network[edge_prefix+'.conns'], dtype=np.int64)
+        N = max(conns.max(initial=-1), nodes.max()) + 1
+        keys = conns[:, 0]*N + conns[:, 1]
+        values = np.arange(conns.shape[0])
+        if isgtriu(network):  # Undirected so look up pairs as [low, high]
+            nodes = np.sort(nodes, axis=1)
+        order = np.argsort(keys, kind='stable')
+        keys = keys[order]
+        values = values[order]
     elif am is not None:
-        pass
+        am = am.tocsr()
+        am.sum_duplicates()  # Also sorts the indices of each row
+        N = max(am.shape[0], am.shape[1], nodes.max() + 1)
+        rows = np.repeat(np.arange(am.shape[0], dtype=np.int64),
+                         np.diff(am.indptr))
+        keys = rows*N + am.indices
+        values = am.data
     else:
         raise Exception('Either g or am must be provided')
-    if am.format != 'dok':
-        am = am.todok(copy=True)
-    z = tuple(zip(nodes[:, 0], nodes[:, 1]))
-    neighbors = np.array([am.get(item, np.nan) for item in z])
-    return neighbors
+    query = nodes[:, 0]*N + nodes[:, 1]
+    loc = np.searchsorted(keys, query)
+    loc[loc == keys.size] = 0
+    hits = keys[loc] == query if keys.size else np.zeros(query.size, bool)
+    edges = values[loc] if keys.size else np.zeros(query.size)
+    if not np.all(hits):
+        edges = edges.astype(float)
+        edges[~hits] = np.nan
+    return edges
 
 
 def find_common_edges(network, inds_1, inds_2):
@@ -546,36 +583,204 @@ def find_path(network, pairs, weights=None):
     Notes
     -----
     The shortest path is found using Dijkstra's algorithm included in the
-    ``scipy.sparse.csgraph`` module
+    ``scipy.sparse.csgraph`` module. The paths are extracted by
+    ``find_shortest_paths``, which should be used directly when many paths
+    are needed since it returns them as flat arrays rather than lists.
 
     """
-    am = dict_to_am(network)
-    if weights is not None:
-        am.data = np.ones_like(am.row, dtype=int)
     pairs = np.array(pairs, ndmin=2)
-    paths = csgraph.dijkstra(csgraph=am, indices=pairs[:, 0],
-                             return_predecessors=True, min_only=False)[1]
+    paths = find_shortest_paths(network=network, sources=pairs[:, 0],
+                                targets=pairs[:, 1], weights=weights)
+    nodes = np.split(paths.nodes, paths.node_indptr[1:-1])
+    edges = np.split(paths.edges, paths.edge_indptr[1:-1])
+    # Paths without any edges (including from a node to itself) are empty
+    empty = np.diff(paths.edge_indptr) == 0
+    for i in np.where(empty)[0]:
+        nodes[i] = []
+        edges[i] = []
+    return {'node_paths': nodes, 'edge_paths': edges}
+
+
+def find_shortest_paths(network, sources, targets=None, weights=None):
+    r"""
+    Find the shortest paths from each source node to the given target nodes
+
+    Parameters
+    ----------
+    network : dict
+        The network dictionary
+    sources : array_like
+        The nodes from which the paths start
+    targets : array_like, optional
+        The nodes at which the paths end, the same length as ``sources`` so
+        that each source is paired with the corresponding target. If not
+        given then the paths from each source to *every* node are found.
+    weights : ndarray, optional
+        The edge weights to use when traversing the path. If not provided
+        then 1's will be used.
+
+    Returns
+    -------
+    paths : namedtuple
+        A namedtuple with the following attributes, where the paths are
+        stored as flat arrays in the style of a CSR sparse matrix, so the
+        nodes along path ``i`` are ``nodes[node_indptr[i]:node_indptr[i+1]]``:
+
+        =============== =====================================================
+        Attribute       Description
+        =============== =====================================================
+        sources         The start node of each path
+        targets         The end node of each path
+        distance        The total weight of each path, with ``inf``
+                        indicating that no path was found
+        nodes           The nodes along all paths, starting at the source
+        node_indptr     The location of each path in ``nodes``
+        edges           The edges along all paths
+        edge_indptr     The location of each path in ``edges``
+        =============== =====================================================
+
+    Notes
+    -----
+    Dijkstra's algorithm from ``scipy.sparse.csgraph`` is run once for each
+    unique source, in batches to limit the size of the predecessor matrix,
+    then all paths are traced and matched to their edges by compiled
+    kernels. A path from a node to itself contains only that node, while
+    a path that was not found contains no nodes. If the network contains
+    duplicate edges, the one with the lowest weight is reported.
+
+    Examples
+    --------
+    >>> from openpnm._skgraph.generators import cubic
+    >>> from openpnm._skgraph.queries import find_shortest_paths
+    >>> g = cubic(shape=[3, 1, 1])
+    >>> paths = find_shortest_paths(g, sources=[0], targets=[2])
+    >>> print(paths.nodes, paths.edges)
+    [0 1 2] [0 1]
+    >>> paths = find_shortest_paths(g, sources=[1])
+    >>> print(paths.nodes, paths.node_indptr)
+    [1 0 1 1 2] [0 2 3 5]
+
+    """
+    edge_prefix = get_edge_prefix(network)
+    node_prefix = get_node_prefix(network)
+    conns = np.array(network[edge_prefix+'.conns'], dtype=np.int64, ndmin=2)
+    Nn = network[node_prefix+'.coords'].shape[0]
+    Ne = conns.shape[0]
+    am = dict_to_am(network, weights=weights)
+    sources = np.array(sources, dtype=np.int64, ndmin=1)
+    if targets is None:
+        targets = np.tile(np.arange(Nn, dtype=np.int64), sources.size)
+        sources = np.repeat(sources, Nn)
+    else:
+        targets = np.array(targets, dtype=np.int64, ndmin=1)
+        if targets.size != sources.size:
+            raise Exception('sources and targets must be the same length')
+    # A CSR style lookup of the edges leaving each node, with the weights
+    # used to pick the lowest among duplicates
+    w = np.ones(Ne) if weights is None else np.array(weights, dtype=float)
     if isgtriu(network):
-        am.data = np.hstack(2*[np.arange(am.data.size/2)]).astype(int)
+        rows = np.hstack((conns[:, 0], conns[:, 1]))
+        cols = np.hstack((conns[:, 1], conns[:, 0]))
+        eids = np.tile(np.arange(Ne, dtype=np.int64), 2)
+        w = np.tile(w, 2)
     else:
-        am.data = np.arange(am.data.size).astype(int)
-    dok = am.todok()
-    nodes = []
-    edges = []
-    for row in range(0, np.shape(pairs)[0]):
-        j = pairs[row][1]
-        ans = []
-        while paths[row][j] > -9999:
-            ans.append(j)
-            j = paths[row][j]
-        if len(ans) > 0:
-            ans.append(pairs[row][0])
-            ans.reverse()
-            nodes.append(np.array(ans, dtype=int))
-            keys = [tuple((ans[i], ans[i+1])) for i in range(len(ans)-1)]
-            temp = [dok[k] for k in keys]
-            edges.append(np.array(temp, dtype=int))
-        else:
-            nodes.append([])
-            edges.append([])
-    return {'node_paths': nodes, 'edge_paths': edges}
+        rows, cols = conns[:, 0], conns[:, 1]
+        eids = np.arange(Ne, dtype=np.int64)
+    order = np.argsort(rows*Nn + cols, kind='stable')
+    indptr = np.zeros(Nn + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=Nn), out=indptr[1:])
+    cols, eids, w = cols[order], eids[order], w[order]
+    # Process pairs grouped by source, limiting how many rows of the
+    # predecessor matrix are held at once
+    uniq, inv = np.unique(sources, return_inverse=True)
+    perm = np.argsort(inv, kind='stable')
+    step = max(1, 2**24 // max(Nn, 1))
+    bounds = np.searchsorted(inv[perm], np.arange(0, uniq.size + step, step))
+    dist = np.full(sources.size, np.inf)
+    counts = np.zeros(sources.size, dtype=np.int64)
+    chunks = []
+    for k in range(bounds.size - 1):
+        loc = perm[bounds[k]:bounds[k+1]]
+        if loc.size == 0:
+            continue
+        d, pred = csgraph.dijkstra(csgraph=am, indices=uniq[k*step:(k+1)*step],
+                                   return_predecessors=True)
+        row = inv[loc] - k*step
+        dist[loc] = d[row, targets[loc]]
+        n = _count_path_nodes(pred, row, sources[loc], targets[loc])
+        counts[loc] = n
+        chunks.append(_trace_paths(pred, row, targets[loc], n,
+                                   indptr, cols, eids, w))
+    if len(chunks):
+        nodes = np.hstack([c[0] for c in chunks])
+        edges = np.hstack([c[1] for c in chunks])
+    else:
+        nodes = np.zeros(0, dtype=np.int64)
+        edges = np.zeros(0, dtype=np.int64)
+    # The chunks hold the paths in the order of perm, so put them back into
+    # the order of the given pairs
+    if not np.all(perm[:-1] < perm[1:]):
+        nodes = nodes[_ragged_reorder(counts, perm)]
+        edges = edges[_ragged_reorder(np.maximum(counts - 1, 0), perm)]
+    node_indptr = np.zeros(sources.size + 1, dtype=np.int64)
+    np.cumsum(counts, out=node_indptr[1:])
+    edge_indptr = np.zeros(sources.size + 1, dtype=np.int64)
+    np.cumsum(np.maximum(counts - 1, 0), out=edge_indptr[1:])
+    tup = namedtuple('paths', ('sources', 'targets', 'distance', 'nodes',
+                               'node_indptr', 'edges', 'edge_indptr'))
+    return tup(sources, targets, dist, nodes, node_indptr, edges, edge_indptr)
+
+
+def _ragged_reorder(counts, perm):
+    # Returns the indices which move the segments of a ragged array from
+    # the order given by perm back into the original order
+    starts = np.zeros(perm.size, dtype=np.int64)
+    np.cumsum(counts[perm][:-1], out=starts[1:])
+    starts[perm] = starts.copy()
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return offsets + np.arange(counts.sum())
+
+
+@njit
+def _count_path_nodes(pred, row, sources, targets):  # pragma: no cover
+    n = np.zeros(targets.size, dtype=np.int64)
+    for i in range(targets.size):
+        j = targets[i]
+        p = pred[row[i]]
+        if (j != sources[i]) and (p[j] < 0):
+            continue  # No path found
+        c = 0
+        while j >= 0:
+            c += 1
+            j = p[j]
+        n[i] = c
+    return n
+
+
+@njit
+def _trace_paths(pred, row, targets, n, indptr, cols, eids, w):  # pragma: no cover
+    nodes = np.empty(n.sum(), dtype=np.int64)
+    edges = np.empty(n.sum() - np.count_nonzero(n), dtype=np.int64)
+    a = 0
+    b = 0
+    for i in range(targets.size):
+        if n[i] == 0:
+            continue
+        p = pred[row[i]]
+        # Walk back from the target, filling the path from its end
+        j = targets[i]
+        for k in range(n[i] - 1, -1, -1):
+            nodes[a + k] = j
+            j = p[j]
+        for k in range(n[i] - 1):
+            u = nodes[a + k]
+            v = nodes[a + k + 1]
+            best = -1
+            for m in range(indptr[u], indptr[u + 1]):
+                if cols[m] == v:
+                    if (best < 0) or (w[m] < w[best]):
+                        best = m
+            edges[b + k] = eids[best]
+        a += n[i]
+        b += n[i] - 1
+    return nodes, edges
@@ -1,2 +1,3 @@
 from ._funcs import *
 from ._percolation import *
+from ._clusters import *
@@ -0,0 +1,296 @@
+from collections import namedtuple
+
+import numpy as np
+import scipy.sparse as sprs
+from numba import njit
+
+
+__all__ = [
+    'IncrementalClusters',
+    'find_percolation_threshold',
+]
+
+
+class IncrementalClusters:
+    r"""
+    Tracks cluster labels of sites and bonds as occupancy grows
+
+    Parameters
+    ----------
+    conns : array_like
+        An N x 2 array connections
+    Np : int, optional
+        The number of sites. If not given it is inferred from ``conns``.
+
+    Notes
+    -----
+    Clusters are stored in a union-find (disjoint set) structure, so adding
+    a batch of occupied bonds or sites only touches the newly occupied items
+    rather than relabelling the entire network with
+    ``scipy.sparse.csgraph.connected_components``. This makes it suitable for
+    processes where occupancy only increases, such as drainage or sweeps of
+    ``ispercolating``. Sites are considered occupied if they were added
+    with ``add_sites`` or are connected to an occupied bond. Bonds are
+    occupied if they were added with ``add_bonds`` or if both of their
+    sites are occupied.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from openpnm._skgraph.simulations import IncrementalClusters
+    >>> conns = np.array([[0, 1], [1, 2], [2, 3]])
+    >>> c = IncrementalClusters(conns)
+    >>> c.add_bonds([0])
+    >>> c.ispercolating(inlets=[0], outlets=[3])
+    False
+    >>> c.add_bonds([1, 2])
+    >>> c.ispercolating(inlets=[0], outlets=[3])
+    True
+
+    """
+
+    def __init__(self, conns, Np=None):
+        self.conns = np.array(conns, dtype=np.int_, ndmin=2)
+        if Np is None:
+            Np = np.amax(self.conns) + 1 if self.conns.size else 0
+        self.Np = Np
+        self.Nt = self.conns.shape[0]
+        self.occupied_sites = np.zeros(self.Np, dtype=bool)
+        self.occupied_bonds = np.zeros(self.Nt, dtype=bool)
+        self._parent = np.arange(self.Np, dtype=np.int_)
+        self._size = np.ones(self.Np, dtype=np.int_)
+        self._im = None
+
+    def _parse(self, inds, N):
+        inds = np.array(inds, ndmin=1)
+        if inds.dtype == bool:
+            if inds.size != N:
+                raise Exception('Mask of locations has the wrong length')
+            inds = np.where(inds)[0]
+        return inds.astype(np.int_)
+
+    def add_bonds(self, bonds):
+        r"""
+        Marks the given bonds, and the sites they connect, as occupied
+
+        Parameters
+        ----------
+        bonds : array_like
+            The indices of the bonds to occupy, or a boolean mask. Bonds that
+            are already occupied are skipped.
+        """
+        bonds = self._parse(bonds, self.Nt)
+        bonds = bonds[~self.occupied_bonds[bonds]]
+        self.occupied_bonds[bonds] = True
+        self.occupied_sites[self.conns[bonds].flatten()] = True
+        _union_bonds(self._parent, self._size, self.conns, bonds)
+
+    def add_sites(self, sites):
+        r"""
+        Marks the given sites as occupied, along with any bonds between two
+        occupied sites
+
+        Parameters
+        ----------
+        sites : array_like
+            The indices of the sites to occupy, or a boolean mask. Sites that
+            are already occupied are skipped.
+        """
+        sites = self._parse(sites, self.Np)
+        sites = sites[~self.occupied_sites[sites]]
+        if self._im is None:
+            data = np.ones(2*self.Nt, dtype=bool)
+            row = self.conns.T.flatten()
+            col = np.tile(np.arange(self.Nt), 2)
+            self._im = sprs.csr_matrix((data, (row, col)),
+                                       shape=(self.Np, self.Nt))
+        _union_sites(self._parent, self._size, self.occupied_sites,
+                     self.occupied_bonds, self.conns, self._im.indices,
+                     self._im.indptr, sites)
+
+    @property
+    def roots(self):
+        r"""
+        The root site of the cluster to which each site belongs
+        """
+        return _find_roots(self._parent)
+
+    @property
+    def labels(self):
+        r"""
+        Returns the cluster labels of all sites and bonds, with -1 indicating
+        unoccupied, in the same format as ``bond_percolation``
+        """
+        roots = self.roots
+        s_labels = -np.ones(self.Np, dtype=np.int_)
+        s_labels[self.occupied_sites] = \
+            np.unique(roots[self.occupied_sites], return_inverse=True)[1]
+        b_labels = s_labels[self.conns[:, 0]]
+        b_labels[~self.occupied_bonds] = -1
+        tup = namedtuple('cluster_labels', ('site_labels', 'bond_labels'))
+        return tup(s_labels, b_labels)
+
+    def find_connected(self, sites):
+        r"""
+        Finds the occupied sites and bonds that belong to the same clusters as
+        the given sites
+
+        Parameters
+        ----------
+        sites : array_like
+            The indices of sites (or a boolean mask), such as inlets. Any of
+            these which are not occupied are ignored.
+
+        Returns
+        -------
+        A tuple containing boolean masks of the connected sites and bonds
+        """
+        sites = self._parse(sites, self.Np)
+        roots = self.roots
+        hits = np.zeros(self.Np, dtype=bool)
+        hits[roots[sites[self.occupied_sites[sites]]]] = True
+        s_mask = hits[roots]*self.occupied_sites
+        b_mask = s_mask[self.conns[:, 0]]*self.occupied_bonds
+        tup = namedtuple('connected', ('sites', 'bonds'))
+        return tup(s_mask, b_mask)
+
+    def ispercolating(self, inlets, outlets):
+        r"""
+        Determines if any occupied cluster spans the given inlet and outlet
+        sites
+        """
+        inlets = self._parse(inlets, self.Np)
+        outlets = self._parse(outlets, self.Np)
+        roots = self.roots
+        ins = roots[inlets[self.occupied_sites[inlets]]]
+        outs = roots[outlets[self.occupied_sites[outlets]]]
+        return bool(np.any(np.isin(ins, outs)))
+
+
+def find_percolation_threshold(conns, weights, inlets, outlets, Np=None):
+    r"""
+    Finds the bond weight at which a cluster first spans the inlets and
+    outlets
+
+    Parameters
+    ----------
+    conns : array_like
+        An N x 2 array connections
+    weights : array_like
+        The weight of each bond, such as the entry pressure. Bonds are
+        occupied in order of increasing weight.
+    inlets : array_like
+        The indices of the inlet sites, or a boolean mask
+    outlets : array_like
+        The indices of the outlet sites, or a boolean mask
+    Np : int, optional
+        The number of sites. If not given it is inferred from ``conns``,
+        which misses any isolated sites numbered after the last connected
+        one.
+
+    Returns
+    -------
+    threshold : float
+        The lowest weight such that ``ispercolating`` returns ``True`` when
+        all bonds with weights less than or equal to it are occupied. If the
+        inlets and outlets are never connected then ``np.inf`` is returned,
+        and if a site is both an inlet and an outlet then 0 is returned
+        since no bonds need to be occupied.
+
+    Notes
+    -----
+    Bonds are sorted once and merged into a union-find structure in that
+    order, keeping track of which clusters contain inlets and outlets, so
+    the threshold is found in a single pass without repeated cluster
+    labelling.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> from openpnm._skgraph.simulations import find_percolation_threshold
+    >>> conns = np.array([[0, 1], [1, 2], [2, 3], [0, 3]])
+    >>> weights = np.array([1.0, 5.0, 2.0, 9.0])
+    >>> float(find_percolation_threshold(conns, weights, [0], [2]))
+    5.0
+
+    """
+    conns = np.array(conns, dtype=np.int_, ndmin=2)
+    weights = np.array(weights, dtype=float, ndmin=1)
+    if Np is None:
+        Np = np.amax(conns) + 1 if conns.size else 0
+    is_inlet = np.zeros(Np, dtype=bool)
+    is_inlet[inlets] = True
+    is_outlet = np.zeros(Np, dtype=bool)
+    is_outlet[outlets] = True
+    if np.any(is_inlet & is_outlet):
+        return 0.0
+    order = np.argsort(weights, kind='stable')
+    b = _merge_until_spanning(conns, order, is_inlet, is_outlet)
+    return weights[b] if b >= 0 else np.inf
+
+
+@njit
+def _merge_until_spanning(conns, order, is_inlet, is_outlet):  # pragma: no cover
+    parent = np.arange(is_inlet.size)
+    size = np.ones_like(parent)
+    for b in order:
+        ri = _find(parent, conns[b, 0])
+        rj = _find(parent, conns[b, 1])
+        r = _union(parent, size, ri, rj)
+        # Roots carry the inlet/outlet status of their whole cluster
+        is_inlet[r] = is_inlet[ri] or is_inlet[rj]
+        is_outlet[r] = is_outlet[ri] or is_outlet[rj]
+        if is_inlet[r] and is_outlet[r]:
+            return b
+    return -1
+
+
+@njit
+def _find(parent, i):  # pragma: no cover
+    # Find root with path halving
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+@njit
+def _union(parent, size, i, j):  # pragma: no cover
+    ri = _find(parent, i)
+    rj = _find(parent, j)
+    if ri != rj:
+        # Attach the smaller tree below the larger one
+        if size[ri] < size[rj]:
+            ri, rj = rj, ri
+        parent[rj] = ri
+        size[ri] += size[rj]
+    return ri
+
+
+@njit
+def _union_bonds(parent, size, conns, bonds):  # pragma: no cover
+    for b in bonds:
+        _union(parent, size, conns[b, 0], conns[b, 1])
+
+
+@njit
+def _union_sites(parent, size, occupied_sites, occupied_bonds, conns,
+                 indices, indptr, sites):  # pragma: no cover
+    for s in sites:
+        occupied_sites[s] = True
+    for s in sites:
+        for k in range(indptr[s], indptr[s+1]):
+            b = indices[k]
+            if occupied_bonds[b]:
+                continue
+            if occupied_sites[conns[b, 0]] and occupied_sites[conns[b, 1]]:
+                occupied_bonds[b] = True
+                _union(parent, size, conns[b, 0], conns[b, 1])
+
+
+@njit
+def _find_roots(parent):  # pragma: no cover
+    roots = np.empty_like(parent)
+    for i in range(parent.size):
+        roots[i] = _find(parent, i)
+    return roots
@@ -41,26 +41,22 @@ class Algorithm(ParserMixin, LabelMixin, Base2):
         self['pore.all'] = np.ones([network.Np, ], dtype=bool)
         self['throat.all'] = np.ones([network.Nt, ], dtype=bool)
 
-    # @functools.cached_property
     @property
     def iterative_props(self):
         r"""
         Finds and returns properties that need to be iterated while
         running the algorithm.
+
+        Notes
+        -----
+        The dependency graph is cached on the phase's ``models`` attribute
+        and only rebuilt when models are added, removed or changed.
         """
-        import networkx as nx
         phase = self.project[self.settings.phase]
-        # Generate global dependency graph
-        dg = nx.compose_all([x.models.dependency_graph(deep=True)
-                             for x in [phase]])
         variable_props = self.settings["variable_props"].copy()
         variable_props.add(self.settings["quantity"])
-        base = list(variable_props)
         # Find all props downstream that depend on base props
-        dg = nx.DiGraph(nx.edge_dfs(dg, source=base))
-        if len(dg.nodes) == 0:
-            return []
-        iterative_props = list(nx.dag.lexicographical_topological_sort(dg))
+        iterative_props = phase.models.downstream(list(variable_props))
         # "variable_props" should be in the returned list but not "quantity"
         if self.settings.quantity in iterative_props:
             iterative_props.remove(self.settings["quantity"])
@@ -1,14 +1,16 @@
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 from tqdm.auto import tqdm
 
 from openpnm._skgraph.simulations import (
-    bond_percolation,
-    find_connected_clusters,
+    IncrementalClusters,
+    find_percolation_threshold,
     site_percolation,
 )
 from openpnm.algorithms import Algorithm
+from openpnm.algorithms._invasion_percolation import _invade
 from openpnm.utils import Docorator, TypedSet
 
 docstr = Docorator()
@@ -159,9 +161,12 @@ class Drainage(Algorithm):
             low = 0.80*phase[self.settings.throat_entry_pressure].min()
             pressures = np.logspace(np.log10(low), np.log10(hi), pressures)
         pressures = np.array(pressures, ndmin=1)
+        # Occupancy only grows with pressure so clusters are tracked
+        # incrementally rather than relabelled at each step
+        clusters = IncrementalClusters(self.network.conns, Np=self.Np)
         msg = 'Performing drainage simulation'
         for i, p in enumerate(tqdm(pressures, msg)):
-            self._run_special(p)
+            self._run_special(p, clusters)
             pmask = self['pore.invaded'] * (self['pore.invasion_pressure'] == np.inf)
             self['pore.invasion_pressure'][pmask] = p
             self['pore.invasion_sequence'][pmask] = i
@@ -172,20 +177,18 @@ class Drainage(Algorithm):
         if np.any(self['pore.bc.outlet']):
             self.apply_trapping()
 
-    def _run_special(self, pressure):
+    def _run_special(self, pressure, clusters):
         phase = self.project[self.settings.phase]
         Tinv = phase[self.settings.throat_entry_pressure] <= pressure
-        # Tinv += self['throat.invaded']
         # Remove trapped throats from this list, if any
         # Tinv[self['throat.trapped']] = False
-        # Perform bond_percolation to label invaded clusters
-        s_labels, b_labels = bond_percolation(self.network.conns, Tinv)
-        # Remove label from any clusters not connected to the inlets
-        s_labels, b_labels = find_connected_clusters(
-            b_labels, s_labels, self['pore.bc.inlet'], asmask=False)
+        # Add newly invadable throats to the existing clusters
+        clusters.add_bonds(Tinv)
+        # Find clusters connected to the inlets
+        s_mask, b_mask = clusters.find_connected(self['pore.bc.inlet'])
         # Add result to existing invaded locations
-        self['pore.invaded'][s_labels >= 0] = True
-        self['throat.invaded'][b_labels >= 0] = True
+        self['pore.invaded'][s_mask] = True
+        self['throat.invaded'][b_mask] = True
 
     def apply_trapping(self):
         r"""
@@ -224,20 +227,19 @@ class Drainage(Algorithm):
         temp = (pseq[self.network.conns].T > tseq).T
         self['throat.trapped'][np.all(temp, axis=1)] = True
         # Now scan through and use site percolation to find other trapped
-        # clusters of pores
-        for p in np.unique(pseq):
-            s, b = site_percolation(conns=self.network.conns,
-                                    occupied_sites=pseq > p)
-            # Identify cluster numbers connected to the outlets
-            clusters = np.unique(s[self['pore.bc.outlet']])
+        # clusters of pores. Pressures are visited in descending order so
+        # the uninvaded sites only grow and clusters are tracked incrementally
+        clusters = IncrementalClusters(self.network.conns, Np=self.Np)
+        for p in np.unique(pseq)[::-1]:
+            clusters.add_sites(pseq > p)
+            # Find sites in clusters connected to the outlets
+            s = clusters.find_connected(self['pore.bc.outlet']).sites
+            # Mark sites as trapped if they are NOT connected to the outlets
+            trapped = clusters.occupied_sites*~s
+            self['pore.trapped'] += trapped
             # Find ALL throats connected to any trapped site, since these
-            # throats must also be trapped, and update their cluster numbers
-            Ts = self.network.find_neighbor_throats(pores=s >= 0)
-            b[Ts] = np.amax(s[self.network.conns], axis=1)[Ts]
-            # Finally, mark pores and throats as trapped if their cluster
-            # numbers are NOT connected to the outlets
-            self['pore.trapped'] += np.isin(s, clusters, invert=True)*(s >= 0)
-            self['throat.trapped'] += np.isin(b, clusters, invert=True)*(b >= 0)
+            # throats must also be trapped
+            self['throat.trapped'] += np.any(trapped[self.network.conns], axis=1)
         # Use the identified trapped pores and throats to update the other
         # data on the object accordingly
         # self['pore.trapped'][self['pore.residual']] = False
@@ -249,7 +251,143 @@ class Drainage(Algorithm):
         self['pore.invasion_sequence'][self['pore.trapped']] = -1
         self['throat.invasion_sequence'][self['throat.trapped']] = -1
 
+    def run_realizations(self, entry_pressures, pressures=25, workers=None):
+        r"""
+        Runs drainage on many realizations of throat entry pressures
+
+        Parameters
+        ----------
+        entry_pressures : ndarray
+            An Nr-by-Nt array with each row containing the throat entry
+            pressures of one realization. The inlets set on the algorithm
+            are used for all realizations.
+        pressures : int or ndarray
+            The number of pressure steps to apply, or an array of specific
+            points. The same pressures are applied to all realizations.
+        workers : int, optional
+            The number of threads used to process the realizations in
+            parallel. The default is chosen by ``ThreadPoolExecutor``.
+
+        Returns
+        -------
+        results : namedtuple
+            A tuple containing ``'pore_invasion_pressure'``,
+            ``'throat_invasion_pressure'``, ``'pore_invasion_sequence'``,
+            ``'throat_invasion_sequence'`` as Nr-by-Np or Nr-by-Nt arrays,
+            along with ``'pc'`` and ``'snwp'`` giving the capillary pressure
+            curve of each realization as Nr-by-Npressures arrays.
+
+        Notes
+        -----
+        A pore or throat is invaded at the lowest applied pressure that
+        exceeds the highest entry pressure along its easiest path from the
+        inlets. This bottleneck value is the running maximum of the entry
+        pressures in the invasion percolation sequence, so each realization
+        requires one invasion percolation pass instead of a cluster labelling
+        step per pressure. The results match those of ``run`` without
+        trapping, and are returned rather than being stored on the object.
+
+        """
+        Pe = np.array(entry_pressures, dtype=float, ndmin=2)
+        if Pe.shape[1] != self.Nt:
+            raise Exception('entry_pressures must have Nt columns')
+        if isinstance(pressures, int):
+            hi = 1.25*Pe.max()
+            low = 0.80*Pe.min()
+            pressures = np.logspace(np.log10(low), np.log10(hi), pressures)
+        pressures = np.sort(np.array(pressures, dtype=float, ndmin=1))
+        net = self.network
+        conns = net.conns
+        im = net.create_incidence_matrix(fmt='csr')
+        inlets = np.where(self['pore.bc.inlet'])[0]
+        Ts = net.find_neighbor_throats(pores=inlets)
+        Vp = net[self.settings.pore_volume]
+        Vt = net[self.settings.throat_volume]
+
+        def _run(row):
+            t_inv = _invade(Pe[row], conns, im.indices, im.indptr, inlets, Ts)[0]
+            # Bottleneck pressure of each throat is the running max along
+            # the invasion sequence
+            t_lvl = np.full(self.Nt, np.inf)
+            hits = np.argsort(t_inv)
+            hits = hits[t_inv[hits] > 0]
+            t_lvl[hits] = np.maximum.accumulate(Pe[row][hits])
+            # Pores are invaded along with their most easily invaded throat
+            p_lvl = np.full(self.Np, np.inf)
+            np.minimum.at(p_lvl, conns[:, 0], t_lvl)
+            np.minimum.at(p_lvl, conns[:, 1], t_lvl)
+            out = []
+            for lvl in (p_lvl, t_lvl):
+                seq = np.searchsorted(pressures, lvl, side='left')
+                Pc = np.append(pressures, np.inf)[seq]
+                seq[seq == pressures.size] = -1
+                out.extend([Pc, seq])
+            out.append(_snwp(pressures, out[0], out[2], Vp, Vt))
+            return out
+
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            out = list(ex.map(_run, range(Pe.shape[0])))
+        p_Pc, p_seq, t_Pc, t_seq, snwp = [np.vstack(item) for item in zip(*out)]
+        pc = np.tile(pressures, (Pe.shape[0], 1))
+        results = namedtuple('drainage_realizations',
+                             ('pore_invasion_pressure',
+                              'throat_invasion_pressure',
+                              'pore_invasion_sequence',
+                              'throat_invasion_sequence',
+                              'pc', 'snwp'))
+        return results(p_Pc, t_Pc, p_seq, t_seq, pc, snwp)
+
+    def find_percolation_threshold(self):
+        r"""
+        Finds the breakthrough pressure, at which the invading phase first
+        connects the inlets to the outlets
+
+        Returns
+        -------
+        pressure : float
+            The lowest applied pressure for which the invading phase spans
+            the inlets and outlets, or ``np.inf`` if they are not connected.
+
+        Notes
+        -----
+        This does not require running the algorithm first, but both inlets
+        and outlets must be set. See
+        ``openpnm._skgraph.simulations.find_percolation_threshold`` for
+        details.
+
+        """
+        if not np.any(self['pore.bc.outlet']):
+            raise Exception('Outlets must be specified to find the threshold')
+        phase = self.project[self.settings['phase']]
+        Pc = find_percolation_threshold(
+            conns=self.network.conns,
+            weights=phase[self.settings.throat_entry_pressure],
+            inlets=self['pore.bc.inlet'],
+            outlets=self['pore.bc.outlet'],
+            Np=self.network.Np)
+        return Pc
+
     def pc_curve(self, pressures=None):
+        r"""
+        Get the percolation data as the non-wetting phase saturation vs the
+        capillary pressure.
+
+        Parameters
+        ----------
+        pressures : int or ndarray, optional
+            The capillary pressures at which the saturation should be
+            computed. If an int is given then this number of points is
+            generated on a log scale spanning the invasion pressures. If not
+            given then the unique invasion pressures are used.
+
+        Notes
+        -----
+        The invasion pressures of all pores and throats are sorted once and
+        the cumulative invaded volume is then looked up for each requested
+        pressure using ``np.searchsorted``, so the cost of a curve is
+        dominated by a single sort regardless of the number of points.
+
+        """
         if pressures is None:
             pressures = np.unique(self['pore.invasion_pressure'])
         elif isinstance(pressures, int):
@@ -258,20 +396,31 @@ class Drainage(Algorithm):
             pressures = np.logspace(np.log10(p.min()/2), np.log10(p.max()*2), pressures)
         else:
             pressures = np.array(pressures)
-        pc = []
-        s = []
         Vp = self.network[self.settings.pore_volume]
         Vt = self.network[self.settings.throat_volume]
-        for p in pressures:
-            Snwp_p = self['pore.invasion_pressure'] <= p
-            Snwp_t = self['throat.invasion_pressure'] <= p
-            pc.append(p)
-            s.append(((Snwp_p*Vp).sum() + (Snwp_t*Vt).sum())/(Vp.sum() + Vt.sum()))
+        s = _snwp(pressures, self['pore.invasion_pressure'],
+                  self['throat.invasion_pressure'], Vp, Vt)
         pc_curve = namedtuple('pc_curve', ('pc', 'snwp'))
-        data = pc_curve(np.array(pc), np.array(s))
+        data = pc_curve(np.array(pressures, ndmin=1),
+                        np.array(s, ndmin=1))
         return data
 
 
+def _snwp(pressures, pore_pressures, throat_pressures, Vp, Vt):
+    r"""
+    Computes the invaded volume fraction at each of the given pressures using
+    a single sort of the invasion pressures
+    """
+    Pc = np.concatenate((pore_pressures, throat_pressures))
+    V = np.concatenate((Vp, Vt))
+    inds = np.argsort(Pc, kind='stable')
+    Pc = Pc[inds]
+    Vcum = np.concatenate(([0.0], np.cumsum(V[inds])))
+    # Number of pores/throats with invasion pressure <= each pressure
+    n = np.searchsorted(Pc, pressures, side='right')
+    return Vcum[n]/Vcum[-1]
+
+
 # %%
 # def run_examples():
 if __name__ == '__main__':
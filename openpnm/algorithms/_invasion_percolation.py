@@ -1,13 +1,18 @@
 import heapq as hq
 import logging
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 from numba import jit, njit
 from tqdm.auto import tqdm
 
 from openpnm._skgraph.queries import qupc_initialize, qupc_reduce, qupc_update
-from openpnm._skgraph.simulations import bond_percolation, site_percolation
+from openpnm._skgraph.simulations import (
+    bond_percolation,
+    find_percolation_threshold,
+    site_percolation,
+)
 from openpnm.algorithms import Algorithm
 from openpnm.utils import Docorator
 
@@ -181,15 +186,29 @@ class InvasionPercolation(Algorithm):
         """
         self.set_BC(pores=pores, bcvalues=True, bctype='outlet', mode=mode)
 
-    def run(self):
+    def run(self, correction=None):
         r"""
         Performs the algorithm for the given number of steps
 
+        Parameters
+        ----------
+        correction : callable or ndarray, optional
+            A position-dependent correction that is added to the throat entry
+            pressures before they are sorted, such as the hydrostatic pressure
+            difference between the phases. If a callable is given it must
+            accept an Nt-by-3 array containing the coordinates of each throat
+            center and return an Nt-long array. For instance, gravity acting
+            in the z-direction can be included with
+            ``correction=lambda xyz: delta_rho*9.81*xyz[:, 2]``. An Nt-long
+            array of values can also be given directly. Since the correction
+            is folded into the sort order of the throats, it adds no cost to
+            the invasion itself.
+
         """
         # Setup arrays and info
         # TODO: This should be called conditionally so that it doesn't
         # overwrite existing data when doing a few steps at a time
-        self._run_setup()
+        self._run_setup(correction=correction)
         n_steps = np.inf
 
         # Create incidence matrix for use in _run_accelerated which is jit
@@ -222,7 +241,7 @@ class InvasionPercolation(Algorithm):
         # self['throat.invasion_sequence'][self['throat.residual']] = 0
         # self['pore.invasion_sequence'][self['pore.residual']] = 0
 
-    def _run_setup(self):
+    def _run_setup(self, correction=None):
         self['pore.invasion_sequence'][self['pore.bc.inlet']] = 0
         # self['pore.invasion_sequence'][self['pore.residual']] = 0
         # self['throat.invasion_sequence'][self['throat.residual']] = 0
@@ -232,12 +251,112 @@ class InvasionPercolation(Algorithm):
         # Get throat capillary pressures from phase and update
         phase = self.project[self.settings['phase']]
         self['throat.entry_pressure'] = phase[self.settings['entry_pressure']]
+        if correction is not None:
+            self['throat.entry_pressure'] = \
+                self['throat.entry_pressure'] + self._get_correction(correction)
         # self['throat.entry_pressure'][self['throat.residual']] = 0.0
         # Generated indices into t_entry giving a sorted list
         self['throat.sorted'] = np.argsort(self['throat.entry_pressure'], axis=0)
         self['throat.order'] = 0
         self['throat.order'][self['throat.sorted']] = np.arange(0, self.Nt)
 
+    def run_realizations(self, entry_pressures, workers=None):
+        r"""
+        Performs invasion on many realizations of throat entry pressures
+
+        Parameters
+        ----------
+        entry_pressures : ndarray
+            An Nr-by-Nt array with each row containing the throat entry
+            pressures of one realization. The inlets set on the algorithm
+            are used for all realizations.
+        workers : int, optional
+            The number of threads used to process the realizations in
+            parallel. The default is chosen by ``ThreadPoolExecutor``.
+
+        Returns
+        -------
+        results : namedtuple
+            A tuple containing ``'pore_invasion_sequence'``,
+            ``'throat_invasion_sequence'``, ``'pore_invasion_pressure'`` and
+            ``'throat_invasion_pressure'``, each an Nr-by-Np or Nr-by-Nt
+            array with one row per realization.
+
+        Notes
+        -----
+        The incidence matrix of the network is created once and shared by
+        all realizations, and the numba-jitted invasion releases the GIL so
+        the realizations run concurrently. The results are returned rather
+        than being stored on the object.
+
+        """
+        Pe = np.array(entry_pressures, dtype=float, ndmin=2)
+        if Pe.shape[1] != self.Nt:
+            raise Exception('entry_pressures must have Nt columns')
+        net = self.network
+        im = net.create_incidence_matrix(fmt='csr')
+        inlets = np.where(self['pore.bc.inlet'])[0]
+        Ts = net.find_neighbor_throats(pores=inlets)
+
+        def _run(row):
+            t_inv, p_inv, p_inv_t = _invade(
+                Pe[row], net.conns, im.indices, im.indptr, inlets, Ts)
+            p_Pc = Pe[row][p_inv_t]
+            p_Pc[p_inv == 0] = 0.0
+            return t_inv, p_inv, Pe[row], p_Pc
+
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            out = list(ex.map(_run, range(Pe.shape[0])))
+        t_inv, p_inv, t_Pc, p_Pc = [np.vstack(item) for item in zip(*out)]
+        results = namedtuple('ip_realizations',
+                             ('pore_invasion_sequence',
+                              'throat_invasion_sequence',
+                              'pore_invasion_pressure',
+                              'throat_invasion_pressure'))
+        return results(p_inv, t_inv, p_Pc, t_Pc)
+
+    def _get_correction(self, correction):
+        if callable(correction):
+            net = self.network
+            xyz = net.coords[net.conns].mean(axis=1)
+            correction = correction(xyz)
+        correction = np.array(correction, dtype=float, ndmin=1)
+        if correction.size == 1:
+            correction = np.tile(correction, self.Nt)
+        if correction.shape != (self.Nt, ):
+            raise Exception('The correction must produce one value per throat')
+        return correction
+
+    def find_percolation_threshold(self):
+        r"""
+        Finds the breakthrough pressure, at which the invading phase first
+        connects the inlets to the outlets
+
+        Returns
+        -------
+        pressure : float
+            The lowest applied pressure for which the invading phase spans
+            the inlets and outlets, or ``np.inf`` if they are not connected.
+
+        Notes
+        -----
+        This does not require running the algorithm first, but both inlets
+        and outlets must be set. See
+        ``openpnm._skgraph.simulations.find_percolation_threshold`` for
+        details.
+
+        """
+        if not np.any(self['pore.bc.outlet']):
+            raise Exception('Outlets must be specified to find the threshold')
+        phase = self.project[self.settings['phase']]
+        Pc = find_percolation_threshold(
+            conns=self.network.conns,
+            weights=phase[self.settings['entry_pressure']],
+            inlets=self['pore.bc.inlet'],
+            outlets=self['pore.bc.outlet'],
+            Np=self.network.Np)
+        return Pc
+
     def pc_curve(self):
         r"""
         Get the percolation data as the non-wetting phase saturation vs the
@@ -408,7 +527,39 @@ def _find_trapped_pores(inv_seq, indices, indptr, outlets):
     return trapped_pores
 
 
-@njit
+def _invade(entry_pressure, conns, indices, indptr, inlets, Ts):
+    r"""
+    Runs an invasion from the given inlets on a bare array of entry pressures
+
+    Notes
+    -----
+    ``indices`` and ``indptr`` belong to the network's incidence matrix in
+    csr format, and ``Ts`` are the throats neighboring the ``inlets``. This
+    is used to run many realizations on the same topology.
+
+    """
+    Np, Nt = indptr.size - 1, entry_pressure.size
+    t_sorted = np.argsort(entry_pressure, axis=0)
+    t_order = np.zeros(Nt, dtype=int)
+    t_order[t_sorted] = np.arange(0, Nt)
+    p_inv = -np.ones(Np, dtype=int)
+    p_inv[inlets] = 0
+    t_inv, p_inv, p_inv_t = \
+        _run_accelerated(
+            t_start=t_order[Ts],
+            t_sorted=t_sorted,
+            t_order=t_order,
+            t_inv=-np.ones(Nt, dtype=int),
+            p_inv=p_inv,
+            p_inv_t=np.zeros(Np, dtype=int),
+            conns=conns,
+            idx=indices,
+            indptr=indptr,
+            n_steps=np.inf)
+    return t_inv, p_inv, p_inv_t
+
+
+@njit(nogil=True)
 def _run_accelerated(t_start, t_sorted, t_order, t_inv, p_inv, p_inv_t,
                      conns, idx, indptr, n_steps):  # pragma: no cover
     r"""
@@ -151,7 +151,7 @@ class MultiPhase(Phase):
         if self.settings["throat_occupancy"] == "automatic":
             self.regenerate_models(propnames=f"throat.occupancy.{phase.name}")
 
-    def regenerate_models(self, propnames=None, exclude=[]):
+    def regenerate_models(self, propnames=None, exclude=[], changed_only=False):
         r"""
         Regenerate models associated with the Multiphase object
 
@@ -169,13 +169,18 @@ class MultiPhase(Phase):
             used to exclude specific models. It may be more convenient to
             supply as list of 2 models to exclude than to specify 8 models
             to include.
+        changed_only : bool
+            If ``True`` then only models whose inputs have changed since
+            they were last run are regenerated.
 
         """
         # Regenerate models associated with phases within MultiPhase object
         for phase in self.phases.values():
-            phase.regenerate_models(propnames=propnames, exclude=exclude)
+            phase.regenerate_models(propnames=propnames, exclude=exclude,
+                                    changed_only=changed_only)
         # Regenerate models specific to MultiPhase object
-        super().regenerate_models(propnames=propnames, exclude=exclude)
+        super().regenerate_models(propnames=propnames, exclude=exclude,
+                                  changed_only=changed_only)
 
     def set_binary_partition_coef(self, phases, model, **kwargs):
         """
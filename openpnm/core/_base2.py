@@ -1,6 +1,10 @@
 import numpy as np
+import functools
+import itertools
 import logging
 import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 from openpnm.core import (
     LabelMixin,
@@ -10,6 +14,7 @@ from openpnm.core import (
 from openpnm.utils import (
     Workspace,
     SettingsAttr,
+    TypedSet,
     PrintableList,
     PrintableDict,
     Docorator,
@@ -21,6 +26,8 @@ from openpnm.utils import (
 docstr = Docorator()
 logger = logging.getLogger(__name__)
 ws = Workspace()
+# Shared by all objects so versions are unique across the workspace
+_version_counter = itertools.count(1)
 
 
 __all__ = [
@@ -29,6 +36,123 @@ __all__ = [
 ]
 
 
+@functools.lru_cache(maxsize=4096)
+def _parse_key(key):
+    # The same few keys are used over and over, so cache their parsing
+    propname, _, domain = key.partition('@')
+    element, _, prop = propname.partition('.')
+    return element, prop, domain
+
+
+class _PackedLabel:
+    r"""
+    Holds a boolean array as bits, used when the ``pack_labels`` setting
+    is on. The ``shape`` and ``dtype`` mimic the unpacked array so that
+    code inspecting the raw dictionary values still works.
+    """
+    dtype = np.dtype(bool)
+
+    def __init__(self, arr):
+        self.shape = arr.shape
+        self.bits = np.packbits(arr)
+
+    def unpack(self):
+        return np.unpackbits(self.bits, count=self.shape[0]).astype(bool)
+
+
+# The number of rows initially reserved in a _ColumnBlock
+_N_COLUMNS = 8
+
+
+class _ColumnBlock:
+    r"""
+    Holds the float properties of one element as the rows of a few 2D
+    arrays, used when the ``columnar`` setting is on. The dictionary stores
+    a view of each row, so reading a property costs nothing extra while
+    reindexing all of them is one fancy-indexing operation per array.
+
+    When the arrays are full another one is added rather than growing
+    them, so rows never move and views held elsewhere keep writing to the
+    stored data. Rows of deleted properties are left as gaps and only
+    reclaimed when the rows are gathered into a new array by ``take`` or
+    ``resize``, so views which are still held elsewhere never see another
+    property's data written into them.
+    """
+
+    def __init__(self, N, size=_N_COLUMNS):
+        self.rows = {}  # The chunk and row of each property
+        self.chunks = [np.empty((max(size, 1), N))]
+        self.n = 0  # The next unused row of the last chunk
+
+    @property
+    def N(self):
+        return self.chunks[-1].shape[1]
+
+    def keys(self):
+        return sorted(self.rows, key=self.rows.get)
+
+    def put(self, key, value):
+        loc = self.rows.get(key)
+        if loc is None:
+            if self.n == self.chunks[-1].shape[0]:
+                size = max(sum([c.shape[0] for c in self.chunks]), _N_COLUMNS)
+                self.chunks.append(np.empty((size, self.N)))
+                self.n = 0
+            loc = self.rows[key] = (len(self.chunks) - 1, self.n)
+            self.n += 1
+        self.chunks[loc[0]][loc[1]] = value
+
+    def drop(self, key):
+        del self.rows[key]
+
+    def take(self, indices):
+        # A new array is allocated so the old ones are freed, and arrays
+        # already obtained from the object keep their values
+        self._gather(lambda rows: np.take(rows, indices, axis=1))
+
+    def resize(self, N):
+        def extend(rows):
+            M = min(N, rows.shape[1])
+            data = np.empty((rows.shape[0], N))
+            data[:, :M] = rows[:, :M]
+            data[:, M:] = np.nan
+            return data
+        self._gather(extend)
+
+    def _gather(self, func):
+        # Replaces the chunks with a single array holding the rows in use,
+        # in order, after passing the rows of each chunk through func
+        keys = self.keys()
+        parts = []
+        for c, chunk in enumerate(self.chunks):
+            used = [self.rows[k][1] for k in keys if self.rows[k][0] == c]
+            if used == list(range(len(used))):
+                parts.append(func(chunk[:len(used)]))
+            else:
+                parts.append(func(chunk[used]))
+        data = np.concatenate(parts) if len(parts) > 1 else parts[0]
+        if data.shape[0] == 0:
+            data = np.empty((_N_COLUMNS, data.shape[1]))
+        self.chunks = [data]
+        self.rows = {k: (0, i) for i, k in enumerate(keys)}
+        self.n = len(keys)
+
+    def view(self, key):
+        c, row = self.rows[key]
+        return self.chunks[c][row]
+
+    def export(self):
+        # Returns the rows in use as a single 2D array, which is a view if
+        # they are already stored contiguously and a copy otherwise
+        keys = self.keys()
+        if [self.rows[k] for k in keys] == [(0, i) for i in range(len(keys))]:
+            return keys, self.chunks[0][:len(keys)]
+        data = np.empty((len(keys), self.N))
+        for i, k in enumerate(keys):
+            data[i] = self.view(k)
+        return keys, data
+
+
 @docstr.get_sections(base='BaseSettings', sections=docstr.all_sections)
 @docstr.dedent
 class BaseSettings:
@@ -39,9 +163,41 @@ class BaseSettings:
     ----------
     uuid : str
         A universally unique identifier for the object to keep things straight
+    compact_conns : bool
+        If ``True`` then 'throat.conns' is stored as ``int32`` when the
+        number of pores allows it. The default is ``False``.
+    float32_props : set of str
+        The names of properties that should be stored as ``float32`` rather
+        than ``float64``.
+    pack_labels : bool
+        If ``True`` then labels are stored as packed bits, using 1/8th of
+        the memory. A label is unpacked when accessed and packed again
+        once the returned array is no longer referenced, so that in-place
+        changes such as ``obj['pore.left'][0] = True`` are retained. Note
+        that changes made through a slice of the array after the array
+        itself is released are lost. The default is ``False``.
+    columnar : bool
+        If ``True`` then all 1D ``float64`` properties of each element are
+        stored as the rows of one contiguous 2D array, and the dictionary
+        holds views of these rows. This makes reindexing all properties,
+        as done by ``trim`` and ``extend``, a single operation, and lets
+        ``get_column_block`` return them as one array. Note that writing
+        to an existing property copies the values into its row, so arrays
+        previously obtained from the object see these changes. The default
+        is ``False``.
+
+    Notes
+    -----
+    The ``compact_conns``, ``float32_props``, ``pack_labels`` and
+    ``columnar`` settings are applied when data is written. Use
+    ``apply_memory_policy`` to apply them to data already on the object.
 
     """
     default_domain = 'domain_1'
+    compact_conns = False
+    float32_props = TypedSet()
+    pack_labels = False
+    columnar = False
 
 
 @docstr.get_sections(base='Base', sections=['Parameters'])
@@ -62,6 +218,10 @@ class Base2(dict):
         # use it before calling super.__init__()
         instance.settings = SettingsAttr()
         instance.settings['uuid'] = str(uuid.uuid4())
+        instance._versions = {}
+        instance._unpacked = {}
+        instance._label_cache = {}
+        instance._columns = {}
         return instance
 
     def __init__(self, network=None, project=None, name='obj_?'):
@@ -81,6 +241,33 @@ class Base2(dict):
     def __eq__(self, other):
         return hex(id(self)) == hex(id(other))
 
+    def __getstate__(self):
+        # Weak references cannot be pickled, and the project restores its
+        # own when the object is appended to it
+        self._repack()
+        state = self.__dict__.copy()
+        state.pop('_project_ref', None)
+        state['_unpacked'] = {}
+        state['_label_cache'] = {}
+        state['_columns'] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # The items were restored as separate arrays, so rebuild the blocks
+        if getattr(self.settings, 'columnar', False):
+            items = [(k, v) for k, v in self.items()
+                     if isinstance(v, np.ndarray) and (v.ndim == 1)
+                     and (v.dtype == np.float64)]
+            # Each block is sized to hold all of its rows in one array
+            for element in ['pore', 'throat']:
+                vals = [v for k, v in items if k.startswith(element+'.')]
+                if vals:
+                    self._columns[element] = \
+                        _ColumnBlock(vals[0].shape[0], size=len(vals))
+            for key, value in items:
+                self._put_column(key.split('.', 1)[0], key, value)
+
     def __repr__(self):  # pragma: no cover
         module = self.__module__
         module = ".".join([x for x in module.split(".") if not x.startswith("_")])
@@ -97,14 +284,15 @@ class Base2(dict):
             self._params[key] = value
             return
 
-        if not (key.startswith('pore.') or key.startswith('throat.')):
+        element, prop, domain = _parse_key(key)
+        if element not in ['pore', 'throat']:
             raise Exception("All dict names must start with pore, throat, or param")
 
         # Intercept @ symbol
-        if '@' in key:
-            element, prop = key.split('@')[0].split('.', 1)
-            domain = key.split('@')[1]
+        if domain:
             locs = super().__getitem__(f'{element}.{domain}')
+            if isinstance(locs, _PackedLabel):
+                locs = self._unpack(f'{element}.{domain}', locs)
             try:
                 vals = self[f'{element}.{prop}']
                 vals[locs] = value
@@ -116,33 +304,278 @@ class Base2(dict):
                 self[f'{element}.{prop}'][locs] = value
             return
 
-        element, prop = key.split('.', 1)
         # Catch dictionaries and break them up
         if isinstance(value, dict):
             for k, v in value.items():
                 self[f'{key}.{k}'] = v
             return
 
-        # Enforce correct dict naming
-        if element not in ['pore', 'throat']:
-            raise Exception('All keys must start with either pore or throat')
+        # Packed labels are stored as is (i.e. when unpickling)
+        if isinstance(value, _PackedLabel):
+            self._unpacked.pop(key, None)
+            super().__setitem__(key, value)
+            return
+
         # Convert value to ndarray
         if not isinstance(value, np.ndarray):
             value = np.array(value, ndmin=1)
+        # Apply memory settings
+        settings = self.settings
+        if (value.dtype == np.float64) \
+                and (key in getattr(settings, 'float32_props', ())):
+            value = value.astype(np.float32)
         # Skip checks for coords and conns
         if key in ['pore.coords', 'throat.conns']:
-            self.update({key: value})
+            if (key == 'throat.conns') \
+                    and getattr(settings, 'compact_conns', False) \
+                    and (value.dtype.kind in 'iu') and (value.itemsize > 4) \
+                    and ((value.size == 0) or (value.max() < 2**31)):
+                value = value.astype(np.int32)
+            super().__setitem__(key, value)
+            self._touch(key)
             return
         # Finally write data
-        if self._count(element) is None:
-            self.update({key: value})  # If length not defined, do it
+        N = self._count(element)
+        if N is None:
+            pass  # If length not defined, do it
         elif value.shape[0] == 1:  # If value is scalar
-            value = np.ones((self._count(element), ), dtype=value.dtype)*value
-            self.update({key: value})
-        elif np.shape(value)[0] == self._count(element):
-            self.update({key: value})
-        else:
+            if value.ndim == 1:
+                value = np.full((N, ), value[0], dtype=value.dtype)
+            else:
+                value = np.ones((N, ), dtype=value.dtype)*value
+        elif value.shape[0] != N:
             raise Exception('Provided array is wrong length for ' + key)
+        if (value.dtype == np.float64) and (value.ndim == 1) \
+                and getattr(settings, 'columnar', False) \
+                and self._put_column(element, key, value):
+            self._touch(key)
+            return
+        if self._columns:
+            self._drop_column(key)
+        self._unpacked.pop(key, None)
+        if (value.dtype == bool) and (value.ndim == 1) \
+                and getattr(settings, 'pack_labels', False):
+            value = _PackedLabel(value)
+        super().__setitem__(key, value)
+        self._touch(key)
+
+    def _unpack(self, key, packed):
+        r"""
+        Returns the unpacked array for a packed label
+
+        The returned array is a view of a buffer kept on the object, so the
+        same array is returned while it is referenced elsewhere and any
+        in-place changes to it are packed again once it is released.
+        """
+        entry = self._unpacked.get(key, None)
+        if entry is not None:
+            arr = entry[1]()
+            if arr is not None:
+                return arr
+        buf = packed.unpack()
+        arr = buf.view()
+        obj_ref = weakref.ref(self)
+
+        def release(ref):
+            obj = obj_ref()
+            if (obj is not None) \
+                    and (obj._unpacked.get(key, (None, None))[1] is ref):
+                obj._repack(key)
+
+        self._unpacked[key] = (buf, weakref.ref(arr, release))
+        return arr
+
+    def _repack(self, key=None):
+        # Packs the unpacked copy of the given label (or of all labels) back
+        # into the dictionary, capturing any in-place changes.  Copies whose
+        # array is no longer referenced elsewhere are then discarded.
+        keys = list(self._unpacked.keys()) if key is None else [key]
+        for k in keys:
+            buf, ref = self._unpacked[k]
+            if isinstance(dict.get(self, k, None), _PackedLabel):
+                super().__setitem__(k, _PackedLabel(buf))
+            if ref() is None:
+                del self._unpacked[k]
+
+    def _put_column(self, element, key, value):
+        r"""
+        Writes a 1D float array into the column block of the given element,
+        returning ``False`` if it does not fit the block's length
+        """
+        block = self._columns.get(element)
+        if (block is None) \
+                or ((not block.rows) and (block.N != value.shape[0])):
+            block = self._columns[element] = _ColumnBlock(value.shape[0])
+        elif block.N != value.shape[0]:
+            return False
+        block.put(key, value)
+        super().__setitem__(key, block.view(key))
+        return True
+
+    def _drop_column(self, key):
+        # Removes the given key from its column block, if it is in one
+        block = self._columns.get(key.split('.', 1)[0])
+        if (block is not None) and (key in block.rows):
+            block.drop(key)
+
+    def get_column_block(self, element):
+        r"""
+        Returns the names and values of the properties of the given element
+        which are stored in columnar form
+
+        Parameters
+        ----------
+        element : str
+            Either 'pore' or 'throat'
+
+        Returns
+        -------
+        keys : list of str
+            The names of the properties, in the order of the rows
+        data : ndarray
+            A 2D array with one row per property, such that
+            ``pandas.DataFrame(data.T, columns=keys)`` gives a table of the
+            properties.
+
+        Notes
+        -----
+        Only 1D ``float64`` properties are stored in columnar form, and only
+        when the ``columnar`` setting is on. The returned ``data`` is a view
+        of the stored values, so no copy is made, if the properties occupy
+        a single contiguous block. This is the case after ``trim`` or
+        ``extend``, or if no more than 8 properties were added and none were
+        deleted since. Otherwise a copy is returned, since gathering the
+        rows in place would detach the arrays already obtained from the
+        object.
+        """
+        if element not in ['pore', 'throat']:
+            raise Exception('element must be either pore or throat')
+        block = self._columns.get(element)
+        if block is None:
+            return [], np.empty((0, self._count(element) or 0))
+        return block.export()
+
+    def _refresh_columns(self, element):
+        # Points the dictionary values at the current block after it has
+        # been reallocated
+        block = self._columns[element]
+        for key in block.rows:
+            super().__setitem__(key, block.view(key))
+
+    def _take(self, pores, throats, workers=1):
+        r"""
+        Keeps only the given pores and throats in every array on the object
+
+        Parameters
+        ----------
+        pores, throats : array_like
+            The indices of the pores and throats to keep, in order
+        workers : int, optional
+            The number of threads used to reindex the arrays, with one array
+            handled per thread at a time. The default is 1, and ``None``
+            lets ``ThreadPoolExecutor`` decide.
+
+        Notes
+        -----
+        Each array is reindexed once and written back under its existing
+        key, so the order of the keys is preserved and none of the checks
+        of ``__setitem__`` are repeated. Columnar properties are reindexed
+        with a single operation per element.
+        """
+        locs = {'pore': pores, 'throat': throats}
+        blocks = self._columns
+        for element, block in blocks.items():
+            block.take(locs[element])
+        items = []
+        for key, value in dict.items(self):
+            element = key.split('.', 1)[0]
+            if (element in blocks) and (key in blocks[element].rows):
+                continue
+            packed = isinstance(value, _PackedLabel)
+            if packed:
+                entry = self._unpacked.pop(key, None)
+                value = value.unpack() if entry is None else entry[0]
+            items.append((key, value, locs[element], packed))
+
+        def take(item):
+            return item[1][item[2]]
+
+        if workers == 1:
+            arrs = map(take, items)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                arrs = list(ex.map(take, items))
+        for (key, _, _, packed), arr in zip(items, arrs):
+            super().__setitem__(key, _PackedLabel(arr) if packed else arr)
+            self._touch(key)
+        for element in blocks.keys():
+            self._refresh_columns(element)
+            for key in blocks[element].rows:
+                self._touch(key)
+
+    def _resize_columns(self, pores, throats):
+        r"""
+        Extends the columnar properties to the given number of pores and
+        throats, filling the new locations with ``nan``
+        """
+        for element, N in (('pore', pores), ('throat', throats)):
+            block = self._columns.get(element)
+            if (block is not None) and (block.N != N):
+                block.resize(N)
+                self._refresh_columns(element)
+                for key in block.rows:
+                    self._touch(key)
+
+    def apply_memory_policy(self):
+        r"""
+        Rewrites all arrays on the object so they follow the current
+        ``compact_conns``, ``float32_props``, ``pack_labels`` and
+        ``columnar`` settings
+
+        Notes
+        -----
+        Labels which are already packed are unpacked if ``pack_labels`` is
+        ``False``. Otherwise, labels which have been unpacked by accessing
+        them are packed again, so in-place changes to arrays obtained before
+        this call are no longer stored on the object.
+        """
+        for key in list(self.keys()):
+            self[key] = self[key]
+
+    def _touch(self, key):
+        r"""
+        Records that the data stored under ``key`` has changed by giving it,
+        and any parent keys if it is nested, a new version number
+        """
+        v = next(_version_counter)
+        parts = key.split('.')
+        for i in range(2, len(parts)+1):
+            self._versions['.'.join(parts[:i])] = v
+
+    def _get_version(self, key):
+        r"""
+        Returns the version number of the data stored under ``key``
+
+        Notes
+        -----
+        Version numbers change each time an array is written with
+        ``__setitem__``, deleted, or produced by a pore-scale model. Changes
+        made in-place (i.e. ``obj['pore.foo'][0] = 1.0``) are not detected.
+        Keys which are not found on the object are looked up on the
+        network, matching the lookup behavior of phases.
+        """
+        key = key.split('@')[0]
+        try:
+            return self._versions[key]
+        except (KeyError, AttributeError):
+            pass
+        try:
+            network = self.network
+        except AttributeError:
+            network = None
+        if (network is not None) and (network is not self):
+            return network._get_version(key)
+        return 0
 
     def __getitem__(self, key):
         # If key is a just a numerical value, then kick it directly back.
@@ -151,6 +584,14 @@ class Base2(dict):
         if not isinstance(key, str):
             return key
 
+        # Most requests are for arrays stored under exactly the given key,
+        # so try that before any parsing (None is never stored)
+        vals = dict.get(self, key, None)
+        if vals is not None:
+            if vals.__class__ is _PackedLabel:
+                vals = self._unpack(key, vals)
+            return vals
+
         if key.startswith('param'):
             _, key = key.split('.', 1)
             try:
@@ -160,45 +601,48 @@ class Base2(dict):
 
         # If key contains an @ symbol then return a subset of values at the
         # requested locations, by recursively calling __getitem__
-        if '@' in key:
-            element, prop = key.split('@')[0].split('.', 1)
-            domain = key.split('@')[1]
+        element, prop, domain = _parse_key(key)
+        if domain:
             if f'{element}.{domain}' not in self.keys():
                 raise KeyError(key)
             locs = self[f'{element}.{domain}']
             vals = self[f'{element}.{prop}']
             return vals[locs]
 
-        try:
-            return super().__getitem__(key)
-        except KeyError:
-            # If key is object's name or all, return ones
-            if key.split('.', 1)[-1] in [self.name, 'all']:
-                element, prop = key.split('.', 1)
-                vals = np.ones(self._count(element), dtype=bool)
+        # If key is object's name or all, return ones
+        if prop in [self.name, 'all']:
+            vals = np.ones(self._count(element), dtype=bool)
+            return vals
+        else:
+            prefix = f'{key}.'
+            vals = {}  # Gather any arrays into a dict
+            for k in list(self.keys()):
+                if k.startswith(prefix):
+                    vals[k.replace(prefix, '')] = self[k]
+            if len(vals) > 0:
                 return vals
             else:
-                vals = {}  # Gather any arrays into a dict
-                for k in self.keys():
-                    if k.startswith(f'{key}.'):
-                        vals.update({k.replace(f'{key}.', ''): self[k]})
-                if len(vals) > 0:
-                    return vals
-                else:
-                    raise KeyError(key)
+                raise KeyError(key)
 
     def __delitem__(self, key):
+        self._unpacked.pop(key, None)
         try:
             super().__delitem__(key)
+            self._drop_column(key)
         except KeyError:
             d = self[key]  # If key is a nested dict, get all values
             for item in d.keys():
                 super().__delitem__(f'{key}.{item}')
+                self._drop_column(f'{key}.{item}')
+        self._touch(key)
 
     def pop(self, *args):
         r"""
         """
         v = super().pop(*args)
+        if isinstance(v, _PackedLabel):
+            entry = self._unpacked.pop(args[0], None)
+            v = v.unpack() if entry is None else entry[0]
         if v is None:
             try:
                 d = self[args[0]]
@@ -206,8 +650,12 @@ class Base2(dict):
                 for item in d.keys():
                     key = f'{args[0]}.{item}'
                     v[key] = super().pop(key)
+                    self._drop_column(key)
             except KeyError:
                 pass
+        if isinstance(args[0], str):
+            self._drop_column(args[0])
+            self._touch(args[0])
         return v
 
     def clear(self, mode=None):
@@ -234,6 +682,8 @@ class Base2(dict):
 
         """
         if mode is None:
+            self._unpacked.clear()
+            self._columns.clear()
             super().clear()
         else:
             if isinstance(mode, str):
@@ -315,8 +765,15 @@ class Base2(dict):
     name = property(_get_name, _set_name)
 
     def _get_project(self):
+        # The project sets a weak reference on each object it holds, so check
+        # it first and only scan the workspace if it is missing or stale
+        ref = getattr(self, '_project_ref', None)
+        proj = ref() if ref is not None else None
+        if (proj is not None) and (ws.get(proj.name) is proj):
+            return proj
         for proj in list(ws.values()):
             if self in proj:
+                self._project_ref = weakref.ref(proj)
                 return proj
 
     project = property(fget=_get_project)
@@ -354,19 +811,20 @@ class Base2(dict):
 
     def _count(self, element):
         if element == 'pore':
-            try:
-                return self['pore.coords'].shape[0]
-            except KeyError:
-                for k, v in self.items():
-                    if k.startswith('pore.'):
-                        return v.shape[0]
+            key = 'pore.coords'
         elif element == 'throat':
-            try:
-                return self['throat.conns'].shape[0]
-            except KeyError:
-                for k, v in self.items():
-                    if k.startswith('throat.'):
-                        return v.shape[0]
+            key = 'throat.conns'
+        else:
+            return None
+        vals = dict.get(self, key, None)
+        if vals is not None:
+            return vals.shape[0]
+        try:
+            return self[key].shape[0]
+        except KeyError:
+            for k, v in self.items():
+                if k.startswith(element + '.'):
+                    return v.shape[0]
 
     @property
     def Nt(self):
@@ -8,6 +8,21 @@ __all__ = [
 ]
 
 
+_LABEL_CACHE_SIZE = 32
+
+
+def _same_stamp(a, b):
+    # Compares the lengths and packed label arrays recorded with queries
+    if a[0] != b[0]:
+        return False
+    for x, y in zip(a[1], b[1]):
+        if (x is None) != (y is None):
+            return False
+        if (x is not None) and not np.array_equal(x, y):
+            return False
+    return True
+
+
 class ParserMixin:
 
     def _parse_indices(self, indices):
@@ -371,51 +386,92 @@ class LabelMixin:
         This is the actual method for getting indices, but should not be called
         directly.  Use ``pores`` or ``throats`` instead.
         """
+        mask, ind = self._query_labels(element=element, labels=labels,
+                                       mode=mode)
+        return ind.copy()
+
+    def _query_labels(self, element, labels, mode='or'):
+        r"""
+        Returns the boolean mask and the indices of the locations satisfying
+        the given label query.
+
+        Notes
+        -----
+        The result of each query is stored along with a bit-packed copy of
+        each label array it was computed from. Repeating the query only
+        packs the current label arrays and compares them to these copies,
+        which is much cheaper than recomputing the result, so in-place
+        changes (i.e. ``obj['pore.left'][0] = False``) are always seen.
+        The returned arrays are shared with the cache and must not be
+        modified.
+        """
         # Parse and validate all input values.
         element = self._parse_element(element, single=True)
         labels = self._parse_labels(labels=labels, element=element)
+        key = (element, tuple(labels), mode)
+        N = self._count(element)
+        propnames = [element+'.'+item.split('.', 1)[-1] for item in labels]
+
+        # Read the arrays, which can only be cached if they are stored on
+        # this object or are default ones
+        arrays, cacheable = [], True
+        for propname in propnames:
+            info = dict.get(self, propname)
+            if info is None:
+                cacheable &= propname.split('.', 1)[1] in [self.name, 'all']
+            info = self[propname]
+            arrays.append(info)
+        if cacheable:
+            # The default labels depend only on N so need no checking
+            stamp = (N, [None if dict.get(self, k) is None
+                         else np.packbits(a) for k, a in zip(propnames, arrays)])
+            hit = self._label_cache.get(key)
+            if (hit is not None) and _same_stamp(hit[0], stamp):
+                return hit[1], hit[2]
 
         # Begin computing label array
         if mode in ['or', 'any', 'union']:
-            union = np.zeros([self._count(element), ], dtype=bool)
-            for item in labels:  # Iterate over labels and collect all indices
-                union = union + self[element+'.'+item.split('.', 1)[-1]]
-            ind = union
+            union = np.zeros([N, ], dtype=bool)
+            for info in arrays:  # Iterate over labels and collect all indices
+                union = union + info
+            mask = union
         elif mode in ['and', 'all', 'intersection']:
-            intersect = np.ones([self._count(element), ], dtype=bool)
-            for item in labels:  # Iterate over labels and collect all indices
-                intersect = intersect*self[element+'.'+item.split('.', 1)[-1]]
-            ind = intersect
+            intersect = np.ones([N, ], dtype=bool)
+            for info in arrays:  # Iterate over labels and collect all indices
+                intersect = intersect*info
+            mask = intersect
         elif mode in ['xor', 'exclusive_or']:
-            xor = np.zeros([self._count(element), ], dtype=int)
-            for item in labels:  # Iterate over labels and collect all indices
-                info = self[element+'.'+item.split('.', 1)[-1]]
+            xor = np.zeros([N, ], dtype=int)
+            for info in arrays:  # Iterate over labels and collect all indices
                 xor = xor + np.int8(info)
-            ind = (xor == 1)
+            mask = (xor == 1)
         elif mode in ['nor', 'not', 'none']:
-            nor = np.zeros([self._count(element), ], dtype=int)
-            for item in labels:  # Iterate over labels and collect all indices
-                info = self[element+'.'+item.split('.', 1)[-1]]
+            nor = np.zeros([N, ], dtype=int)
+            for info in arrays:  # Iterate over labels and collect all indices
                 nor = nor + np.int8(info)
-            ind = (nor == 0)
+            mask = (nor == 0)
         elif mode in ['nand']:
-            nand = np.zeros([self._count(element), ], dtype=int)
-            for item in labels:  # Iterate over labels and collect all indices
-                info = self[element+'.'+item.split('.', 1)[-1]]
+            nand = np.zeros([N, ], dtype=int)
+            for info in arrays:  # Iterate over labels and collect all indices
                 nand = nand + np.int8(info)
-            ind = (nand < len(labels)) * (nand > 0)
+            mask = (nand < len(labels)) * (nand > 0)
         elif mode in ['xnor', 'nxor']:
-            xnor = np.zeros([self._count(element), ], dtype=int)
-            for item in labels:  # Iterate over labels and collect all indices
-                info = self[element+'.'+item.split('.', 1)[-1]]
+            xnor = np.zeros([N, ], dtype=int)
+            for info in arrays:  # Iterate over labels and collect all indices
                 xnor = xnor + np.int8(info)
-            ind = (xnor > 1)
+            mask = (xnor > 1)
         else:
             raise Exception('Unsupported mode: '+mode)
+        mask = mask.astype(bool)
         # Extract indices from boolean mask
-        ind = np.where(ind)[0]
+        ind = np.where(mask)[0]
         ind = ind.astype(dtype=int)
-        return ind
+
+        if cacheable:
+            if len(self._label_cache) >= _LABEL_CACHE_SIZE:
+                self._label_cache.pop(next(iter(self._label_cache)))
+            self._label_cache[key] = (stamp, mask, ind)
+        return mask, ind
 
     def pores(self, labels=None, mode='or', asmask=False):
         r"""
@@ -473,10 +529,10 @@ class LabelMixin:
         """
         if labels is None:
             labels = self.name
-        ind = self._get_indices(element='pore', labels=labels, mode=mode)
+        mask, ind = self._query_labels(element='pore', labels=labels, mode=mode)
         if asmask:
-            ind = self.to_mask(pores=ind)
-        return ind
+            return mask.copy()
+        return ind.copy()
 
     def throats(self, labels=None, mode='or', asmask=False):
         r"""
@@ -525,10 +581,11 @@ class LabelMixin:
         """
         if labels is None:
             labels = self.name
-        ind = self._get_indices(element='throat', labels=labels, mode=mode)
+        mask, ind = self._query_labels(element='throat', labels=labels,
+                                       mode=mode)
         if asmask:
-            ind = self.to_mask(throats=ind)
-        return ind
+            return mask.copy()
+        return ind.copy()
 
     def filter_by_label(self, pores=[], throats=[], labels=None, mode='or'):
         r"""
@@ -587,8 +644,7 @@ class LabelMixin:
             return np.array([], dtype=int)
         labels = self._parse_labels(labels=labels, element=element)
         labels = [element+'.'+item.split('.', 1)[-1] for item in labels]
-        all_locs = self._get_indices(element=element, labels=labels, mode=mode)
-        mask = self._tomask(indices=all_locs, element=element)
+        mask, _ = self._query_labels(element=element, labels=labels, mode=mode)
         ind = mask[locations]
         return locations[ind]
 
@@ -641,7 +697,7 @@ class LabelMixin:
 
         """
         # Count number of pores of specified type
-        Ps = self._get_indices(labels=labels, mode=mode, element='pore')
+        _, Ps = self._query_labels(labels=labels, mode=mode, element='pore')
         Np = np.shape(Ps)[0]
         return Np
 
@@ -692,6 +748,6 @@ class LabelMixin:
 
         """
         # Count number of pores of specified type
-        Ts = self._get_indices(labels=labels, mode=mode, element='throat')
+        _, Ts = self._query_labels(labels=labels, mode=mode, element='throat')
         Nt = np.shape(Ts)[0]
         return Nt
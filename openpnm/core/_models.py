@@ -1,5 +1,6 @@
 import logging
 import inspect
+import weakref
 import openpnm as op
 import numpy as np
 from copy import deepcopy
@@ -40,13 +41,159 @@ class ModelsDict(PrintableDict):
         Finds and returns the target object to which this ModelsDict is
         associated.
         """
+        ref = getattr(self, '_owner_ref', None)
+        obj = ref() if ref is not None else None
+        if (obj is not None) and (getattr(obj, 'models', None) is self):
+            return obj
         for proj in ws.values():
             for obj in proj:
                 if hasattr(obj, "models"):
                     if obj.models is self:
+                        self._owner_ref = weakref.ref(obj)
                         return obj
         raise Exception("No target object found!")
 
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if isinstance(value, ModelWrapper):
+            # Let the model find its way back here without a workspace scan
+            value._models_ref = weakref.ref(self)
+        self._invalidate()
+
+    def _invalidate(self):
+        r"""
+        Clears the cached dependency graph and orderings. This is called
+        whenever a model is added, removed, or has its arguments changed.
+        """
+        self._dependency_cache = {}
+
+    def _get_cached(self, key, func):
+        cache = self.__dict__.setdefault('_dependency_cache', {})
+        if key not in cache:
+            cache[key] = func()
+        return cache[key]
+
+    def _get_lazy(self):
+        r"""
+        Returns a dict of the properties computed by models with
+        ``regen_mode='lazy'``, with the keys of those models as values
+        """
+        # This is called on every __getitem__ so avoid _get_cached overhead
+        try:
+            return self._dependency_cache['lazy']
+        except (AttributeError, KeyError):
+            pass
+        d = {}
+        for k, v in self.items():
+            if v.get('regen_mode', None) == 'lazy':
+                d.setdefault(k.split('@')[0], []).append(k)
+        self.__dict__.setdefault('_dependency_cache', {})['lazy'] = d
+        return d
+
+    def _get_inputs(self, key):
+        r"""
+        Returns the properties (including the domain label) that the
+        model stored under ``key`` takes as arguments
+        """
+        def inputs():
+            args = op.utils.flat_list(super(ModelsDict, self).__getitem__(
+                key).values())
+            props = [arg for arg in args if is_valid_propname(arg)]
+            element, _, domain = key.partition('@')
+            props.append(element.split('.', 1)[0] + '.' + domain)
+            return props
+        return list(self._get_cached(('inputs', key), inputs))
+
+    def _build_dependency_graph(self):
+        import networkx as nx
+
+        dtree = nx.DiGraph()
+        models = list(self.keys())
+
+        for model in models:
+            propname = model.split("@")[0]
+            dtree.add_node(propname)
+            # Filter pore/throat props only
+            args = op.utils.flat_list(self[model].values())
+            dependencies = [arg for arg in args if is_valid_propname(arg)]
+            # Add dependency from model's parameters
+            for d in dependencies:
+                dtree.add_edge(d, propname)
+
+        return dtree
+
+    def _build_dependency_list(self):
+        import networkx as nx
+
+        dtree = self._get_cached('graph', self._build_dependency_graph)
+        cycles = list(nx.simple_cycles(dtree))
+        if cycles:
+            msg = 'Cyclic dependency: ' + ' -> '.join(cycles[0] + [cycles[0][0]])
+            raise Exception(msg)
+        d = nx.algorithms.dag.lexicographical_topological_sort(dtree, sorted)
+        return list(d)
+
+    def _build_downstream(self, propnames):
+        import networkx as nx
+
+        dtree = self._get_cached('graph', self._build_dependency_graph)
+        dtree = nx.DiGraph(nx.edge_dfs(dtree, source=list(propnames)))
+        if len(dtree.nodes) == 0:
+            return []
+        return list(nx.dag.lexicographical_topological_sort(dtree))
+
+    def downstream(self, propnames):
+        r"""
+        Returns the properties which depend on the given properties, either
+        directly or through other models, in the order they should be
+        computed
+
+        Parameters
+        ----------
+        propnames : str or list of str
+            The properties whose dependents are sought
+
+        Returns
+        -------
+        props : list of str
+            The given properties plus all those downstream of them, sorted
+            according to the dependency graph. Properties which have no
+            dependents and are not computed by a model are not included.
+
+        Notes
+        -----
+        The result is cached until the models on the object are changed, so
+        this can be called repeatedly (e.g. every iteration of a nonlinear
+        solver) without rebuilding the dependency graph.
+        """
+        propnames = tuple(sorted(set(np.atleast_1d(propnames).tolist())))
+        props = self._get_cached(('downstream', propnames),
+                                 lambda: self._build_downstream(propnames))
+        return list(props)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_owner_ref', None)
+        state.pop('_dependency_cache', None)
+        return state
+
+    def pop(self, *args):
+        self._invalidate()
+        return super().pop(*args)
+
+    def popitem(self):
+        self._invalidate()
+        return super().popitem()
+
+    def clear(self):
+        self._invalidate()
+        super().clear()
+
+    def setdefault(self, key, default=None):
+        if key not in self.keys():
+            self[key] = default
+        return self[key]
+
     def dependency_list(self):
         r"""
         Returns a list of dependencies in the order with which they should
@@ -66,15 +213,7 @@ class ModelsDict(PrintableDict):
         dependency_map
 
         """
-        import networkx as nx
-
-        dtree = self.dependency_graph()
-        cycles = list(nx.simple_cycles(dtree))
-        if cycles:
-            msg = 'Cyclic dependency: ' + ' -> '.join(cycles[0] + [cycles[0][0]])
-            raise Exception(msg)
-        d = nx.algorithms.dag.lexicographical_topological_sort(dtree, sorted)
-        return list(d)
+        return list(self._get_cached('list', self._build_dependency_list))
 
     def dependency_graph(self, deep=False):
         """
@@ -93,22 +232,8 @@ class ModelsDict(PrintableDict):
         dependency_map
 
         """
-        import networkx as nx
-
-        dtree = nx.DiGraph()
-        models = list(self.keys())
-
-        for model in models:
-            propname = model.split("@")[0]
-            dtree.add_node(propname)
-            # Filter pore/throat props only
-            args = op.utils.flat_list(self[model].values())
-            dependencies = [arg for arg in args if is_valid_propname(arg)]
-            # Add dependency from model's parameters
-            for d in dependencies:
-                dtree.add_edge(d, propname)
-
-        return dtree
+        # Return a copy so the cached graph cannot be altered by the caller
+        return self._get_cached('graph', self._build_dependency_graph).copy()
 
     def dependency_map(self,
                        ax=None,
@@ -217,6 +342,7 @@ class ModelsDict(PrintableDict):
             for item in list(self.keys()):
                 if item.startswith(key):
                     super().__delitem__(item)
+        self._invalidate()
 
     def __getitem__(self, key):
         try:
@@ -254,14 +380,73 @@ class ModelWrapper(dict):
                 kwargs[k] = v
         return model(self.target, **kwargs)
 
-    @property
-    def name(self):
+    def _get_models(self):
+        # Returns the ModelsDict holding this model, if it is still in it
+        ref = getattr(self, '_models_ref', None)
+        models = ref() if ref is not None else None
+        if models is not None:
+            if any(mod is self for mod in models.values()):
+                return models
         for proj in ws.values():
             for obj in proj:
                 if hasattr(obj, 'models'):
-                    for key, mod in obj.models.items():
-                        if mod is self:
-                            return key
+                    if any(mod is self for mod in obj.models.values()):
+                        self._models_ref = weakref.ref(obj.models)
+                        return obj.models
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_models_ref', None)
+        return state
+
+    def _invalidate(self):
+        # Changing a model's arguments may change the dependency graph, and
+        # means the model must be rerun
+        self._inputs_seen = None
+        ref = getattr(self, '_models_ref', None)
+        models = ref() if ref is not None else None
+        if models is not None:
+            models._invalidate()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if key != 'regen_mode':
+            self._invalidate()
+        else:  # Only the list of lazy models needs updating
+            models = getattr(self, '_models_ref', lambda: None)()
+            if models is not None:
+                models._invalidate()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._invalidate()
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        self._invalidate()
+
+    def pop(self, *args):
+        self._invalidate()
+        return super().pop(*args)
+
+    @property
+    def _accepts_domain(self):
+        # Inspecting the signature is slow, so cache it until the model
+        # function is replaced
+        model = self['model']
+        sig = self.__dict__.get('_signature', None)
+        if (sig is None) or (sig[0] is not model):
+            sig = (model, 'domain' in inspect.getfullargspec(model).args)
+            self._signature = sig
+        return sig[1]
+
+    @property
+    def name(self):
+        models = self._get_models()
+        if models is not None:
+            for key, mod in models.items():
+                if mod is self:
+                    return key
 
     @property
     def propname(self):
@@ -294,13 +479,26 @@ class ModelWrapper(dict):
         """
         Finds and returns the object to which this model is assigned
         """
-        for proj in ws.values():
-            for obj in proj:
-                if hasattr(obj, "models"):
-                    for mod in obj.models.values():
-                        if mod is self:
-                            return obj
-        raise Exception("No target object found!")
+        models = self._get_models()
+        if models is None:
+            raise Exception("No target object found!")
+        return models._find_target()
+
+
+def _same_model(a, b):
+    # Checks if two ModelWrappers would produce the same result
+    keys = set(a.keys()).union(b.keys()) - {'regen_mode'}
+    for k in keys:
+        if (k not in a.keys()) or (k not in b.keys()):
+            return False
+        if a[k] is b[k]:
+            continue
+        try:
+            if not np.array_equal(a[k], b[k]):
+                return False
+        except Exception:
+            return False
+    return True
 
 
 class ModelsMixin2:
@@ -313,6 +511,58 @@ class ModelsMixin2:
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.models = ModelsDict()
+        self.models._owner_ref = weakref.ref(self)
+
+    def __getitem__(self, key):
+        # Compute properties from lazy models on first access, or when their
+        # inputs have changed since they were last computed
+        models = self.__dict__.get('models', None)
+        if models and isinstance(key, str):
+            lazy = models._get_lazy()
+            if lazy:
+                parts = key.split('@')[0].split('.')
+                for i in range(2, len(parts)+1):
+                    name = '.'.join(parts[:i])
+                    if name in lazy:
+                        self._refresh_lazy(name, lazy)
+                        break
+        return super().__getitem__(key)
+
+    def _refresh_lazy(self, propname, lazy):
+        running = self.__dict__.setdefault('_lazy_running', set())
+        if propname in running:  # Model is reading its own output
+            return
+        running.add(propname)
+        try:
+            for key in lazy[propname]:
+                # Bring any lazy upstream properties up to date first so
+                # their versions reflect changes further upstream
+                inputs = [item.split('@')[0]
+                          for item in self.models._get_inputs(key)]
+                for item in inputs:
+                    if item in lazy:
+                        self._refresh_lazy(item, lazy)
+                if self._is_stale(key):
+                    self._resolve_inputs(key, inputs, lazy)
+                    self.run_model(key)
+        finally:
+            running.discard(propname)
+
+    def _resolve_inputs(self, key, inputs, lazy):
+        # Runs the models for any missing inputs of a lazy model, which
+        # happens when they are deferred or their results were deleted.  A
+        # KeyError would be caught by the look-ups in __getitem__ so a plain
+        # Exception is raised if an input cannot be produced.
+        for item in inputs:
+            if item in lazy:
+                continue
+            try:
+                self[item]
+            except KeyError:
+                if not any(k.startswith(item+'@') for k in self.models.keys()):
+                    raise Exception(f'{key} cannot be computed since {item}'
+                                    ' is missing and no model produces it')
+                self.run_model(item)
 
     def add_model(self, propname, model, domain='all', regen_mode='normal',
                   **kwargs):
@@ -346,6 +596,12 @@ class ModelsMixin2:
             constant     The model is run immediately upon being added, but is
                          is not run when ``regenerate_models`` is called,
                          effectively turning the property into a constant.
+            lazy         The model is NOT run when added or when
+                         ``regenerate_models`` is called. Instead it is run
+                         when its property is first requested, along with any
+                         lazy models it depends on and the models of any
+                         other inputs which are missing, and rerun on later
+                         requests only if its inputs have changed.
             ============ =====================================================
 
         kwargs : keyword arguments
@@ -400,13 +656,15 @@ class ModelsMixin2:
         # Insepct model to extract arguments and default values
         kwargs.update(self._inspect_model(model, kwargs))
         self.models[propname+'@'+domain] = ModelWrapper(**kwargs)
-        if regen_mode != 'deferred':
+        _ = self.models[propname+'@'+domain]._accepts_domain  # Cache it now
+        if regen_mode not in ['deferred', 'lazy']:
             self.run_model(propname+'@'+domain)
 
     def _inspect_model(self, model, kwargs={}):
         if model.__defaults__:
-            vals = list(inspect.getfullargspec(model).defaults)
-            keys = inspect.getfullargspec(model).args[-len(vals):]
+            spec = inspect.getfullargspec(model)
+            vals = list(spec.defaults)
+            keys = spec.args[-len(vals):]
             for k, v in zip(keys, vals):  # Put defaults into kwargs
                 if k not in kwargs:  # Skip if argument was given in kwargs
                     kwargs.update({k: v})
@@ -441,7 +699,7 @@ class ModelsMixin2:
                 v['regen_mode'] = regen_mode
             self.add_model(propname=k, **v)
 
-    def regenerate_models(self, propnames=None, exclude=[]):
+    def regenerate_models(self, propnames=None, exclude=[], changed_only=False):
         r"""
         Runs all the models stored in the object's ``models`` attribute
 
@@ -451,12 +709,24 @@ class ModelsMixin2:
             If given then only the specified models are run
         exclude : list of strings
             If given then these models will *not* be run
+        changed_only : bool
+            If ``True`` then only models whose inputs have changed since
+            they were last run are regenerated. The default is ``False``
+            which runs all models. See Notes for more details.
 
         Notes
         -----
         This function will ensure that models are called in the correct order
         such that 'pore.diameter' will be run before 'pore.volume', since
         the diameter is required to compute the volume.
+
+        When ``changed_only=True`` each model is compared against the
+        version of each of its input properties that it saw on its last run.
+        Since models are run in dependency order, a change to
+        'pore.temperature' will trigger only the models which depend on it,
+        directly or indirectly. Data is considered changed when it is
+        written with ``obj[propname] = values``, so in-place edits such as
+        ``obj[propname][0] = 1.0`` are not detected.
         """
         all_models = self.models.dependency_list()
         # Regenerate all properties by default
@@ -467,18 +737,58 @@ class ModelsMixin2:
         # Remove any that are specifically excluded
         propnames = np.setdiff1d(propnames, exclude).tolist()
         # Reorder given propnames according to dependency tree
-        tmp = [e.split("@")[0] for e in propnames]
-        idx_sorted = [all_models.index(e) for e in tmp]
+        order = {e: i for i, e in enumerate(all_models)}
+        idx_sorted = [order[e.split("@")[0]] for e in propnames]
         propnames = [elem for i, elem in sorted(zip(idx_sorted, propnames))]
+        # Lazy models are run on demand so skip them
+        lazy = self.models._get_lazy()
         # Now run each on in sequence
         for item in propnames:
-            try:
-                self.run_model(item)
-            except KeyError as e:
-                msg = (f"{item} was not run since the following property"
-                       f" is missing: {e}")
-                logger.warning(msg)
-                self.models[item]['regen_mode'] = 'deferred'
+            name = item.split('@')[0]
+            if name in lazy:
+                # Only skip the domains whose models are lazy
+                if '@' in item:
+                    keys = [] if item in lazy[name] else [item]
+                else:
+                    keys = [k for k in self.models.keys()
+                            if k.startswith(name+'@') and k not in lazy[name]]
+            else:
+                keys = [item]
+            for key in keys:
+                if changed_only and not self._is_stale(key):
+                    continue
+                try:
+                    self.run_model(key)
+                except KeyError as e:
+                    msg = (f"{key} was not run since the following property"
+                           f" is missing: {e}")
+                    logger.warning(msg)
+                    self.models[key]['regen_mode'] = 'deferred'
+
+    def _get_input_versions(self, key):
+        # The current versions of the properties used by the model
+        return {k: self._get_version(k) for k in self.models._get_inputs(key)}
+
+    def _is_stale(self, propname):
+        r"""
+        Determines if any of the models which compute ``propname`` must be
+        rerun because their inputs changed, or they have never been run
+        """
+        if '@' in propname:
+            keys = [propname]
+        else:
+            keys = [k for k in self.models.keys()
+                    if k.startswith(propname+'@')]
+        for key in keys:
+            seen = getattr(self.models[key], '_inputs_seen', None)
+            if (seen is None) or (seen != self._get_input_versions(key)):
+                return True
+            # Rerun if the result has been deleted since
+            name = key.split('@')[0]
+            if name not in self.keys():
+                if not any(k.startswith(name+'.') for k in self.keys()):
+                    return True
+        return False
 
     def run_model(self, propname, domain=None):
         r"""
@@ -495,51 +805,101 @@ class ModelsMixin2:
             equivalent to passing ``propname='pore.diameter`` and
             ``domain=domain1``. Passing ``domain=None`` will regenerate
             all models starting with ``propname``.
+
+        Notes
+        -----
+        When ``propname`` is defined on several domains, consecutive domains
+        whose models use the same function and identical arguments, and
+        which do not accept a ``domain`` argument, are run with a single
+        call to the model rather than computing the full result once per
+        domain. Domains whose models differ in any argument, such as a
+        per-domain scaling factor, are still run one call each, and each
+        call still computes values for every location since models cannot
+        be restricted to a subset of them.
         """
         if domain is None:
             if '@' in propname:  # Get domain from propname if present
                 propname, _, domain = propname.partition('@')
                 self.run_model(propname=propname, domain=domain)
             else:  # No domain means run model for ALL domains
-                for item in self.models.keys():
-                    if item.startswith(propname+"@"):
-                        _, _, domain = item.partition("@")
-                        self.run_model(propname=propname, domain=domain)
+                domains = [item.partition('@')[2] for item in self.models.keys()
+                           if item.startswith(propname+"@")]
+                for group in self._group_domains(propname, domains):
+                    self._run_model_on(propname, group)
         else:  # domain was given explicitly
             domain = domain.split('.', 1)[-1]
-            element, prop = propname.split('@')[0].split('.', 1)
-            propname = f'{element}.{prop}'
-            mod_dict = self.models[propname+'@'+domain]
-            # Collect kwargs
-            kwargs = {'domain': f'{element}.{domain}'}
-            for item in mod_dict.keys():
-                if item not in ['model', 'regen_mode']:
-                    kwargs[item] = mod_dict[item]
-            # Deal with models that don't have domain argument yet
-            if 'domain' not in inspect.getfullargspec(mod_dict['model']).args:
-                _ = kwargs.pop('domain', None)
-                vals = mod_dict['model'](self, **kwargs)
-                if isinstance(vals, dict):  # Handle models that return a dict
-                    for k, v in vals.items():
-                        v = np.atleast_1d(v)
-                        if v.shape[0] == 1:  # Returned item was a scalar
-                            v = np.tile(v, self._count(element))
-                        vals[k] = v[self[f'{element}.{domain}']]
-                elif isinstance(vals, (int, float)):  # Handle models that return a float
-                    vals = np.atleast_1d(vals)
-                else:  # Index into full domain result for use below
-                    vals = vals[self[f'{element}.{domain}']]
-            else:  # Model that accepts domain arg
-                vals = mod_dict['model'](self, **kwargs)
-            # Finally add model results to self
-            if isinstance(vals, np.ndarray):  # If model returns single array
-                if propname not in self.keys():
-                    temp = self._initialize_empty_array_like(vals, element)
-                    self[f'{element}.{prop}'] = temp
-                self[propname][self[f'{element}.{domain}']] = vals
-            elif isinstance(vals, dict):  # If model returns a dict of arrays
+            self._run_model_on(propname, [domain])
+
+    def _group_domains(self, propname, domains):
+        r"""
+        Splits the domains of ``propname`` into runs of consecutive domains
+        whose models can be computed with a single call, which requires the
+        same function and identical values for every argument
+        """
+        groups = []
+        for domain in domains:
+            mod = self.models[f'{propname}@{domain}']
+            if groups and not mod._accepts_domain:
+                prev = self.models[f'{propname}@{groups[-1][0]}']
+                if _same_model(mod, prev):
+                    groups[-1].append(domain)
+                    continue
+            groups.append([domain])
+        return groups
+
+    def _run_model_on(self, propname, domains):
+        r"""
+        Runs the model for ``propname`` on the given domains, which must all
+        use the same model (see ``_group_domains``)
+        """
+        element, prop = propname.split('@')[0].split('.', 1)
+        propname = f'{element}.{prop}'
+        domain = domains[0]
+        mod_dict = self.models[propname+'@'+domain]
+        # Fetch the locations once; 'all' needs no masking
+        if domains == ['all']:
+            locs = slice(None)
+        elif len(domains) == 1:
+            locs = self[f'{element}.{domain}']
+        else:
+            locs = np.zeros(self._count(element), dtype=bool)
+            for item in domains:
+                locs = locs | self[f'{element}.{item}']
+        # Collect kwargs
+        kwargs = {'domain': f'{element}.{domain}'}
+        kwargs.update({k: v for k, v in mod_dict.items()
+                       if k not in ['model', 'regen_mode']})
+        # Deal with models that don't have domain argument yet
+        if not mod_dict._accepts_domain:
+            _ = kwargs.pop('domain', None)
+            vals = mod_dict['model'](self, **kwargs)
+            if isinstance(vals, dict):  # Handle models that return a dict
                 for k, v in vals.items():
-                    if f'{propname}.{k}' not in self.keys():
-                        temp = self._initialize_empty_array_like(v, element)
-                        self[f'{propname}.{k}'] = temp
-                    self[f'{propname}.{k}'][self[f'{element}.{domain}']] = v
+                    v = np.atleast_1d(v)
+                    if v.shape[0] == 1:  # Returned item was a scalar
+                        v = np.tile(v, self._count(element))
+                    vals[k] = v[locs]
+            elif isinstance(vals, (int, float)):  # Handle models that return a float
+                vals = np.atleast_1d(vals)
+            else:  # Index into full domain result for use below
+                vals = vals[locs]
+        else:  # Model that accepts domain arg
+            vals = mod_dict['model'](self, **kwargs)
+        # Finally add model results to self
+        if isinstance(vals, np.ndarray):  # If model returns single array
+            if propname not in self.keys():
+                temp = self._initialize_empty_array_like(vals, element)
+                self[f'{element}.{prop}'] = temp
+            self[propname][locs] = vals
+        elif isinstance(vals, dict):  # If model returns a dict of arrays
+            for k, v in vals.items():
+                if f'{propname}.{k}' not in self.keys():
+                    temp = self._initialize_empty_array_like(v, element)
+                    self[f'{propname}.{k}'] = temp
+                self[f'{propname}.{k}'][locs] = v
+                self._touch(f'{propname}.{k}')
+        # Record the inputs the model saw to detect later changes
+        self._touch(propname)
+        for item in domains:
+            self.models[propname+'@'+item]._inputs_seen = \
+                self._get_input_versions(propname+'@'+item)
@@ -48,34 +48,43 @@ def from_neighbor_throats(target, prop, mode='min', ignore_nans=True):
 
     """
     network = target.network
-    data = target[prop]
+    data = np.array(target[prop], dtype=float)  # Copy to leave prop intact
     nans = np.isnan(data)
-    im = network.create_incidence_matrix()
+    # Rows of the csr incidence matrix list the throats of each pore, and
+    # only its structure is used so the stored one can be reused
+    im = network.get_incidence_matrix(fmt='csr')
     if mode == 'min':
         if ignore_nans:
             data[nans] = np.inf
-        values = np.ones((network.Np, ))*np.inf
-        np.minimum.at(values, im.row, data[im.col])
+        values = _reduce_rows(np.minimum, data[im.indices], im.indptr, np.inf)
     if mode == 'max':
         if ignore_nans:
             data[nans] = -np.inf
-        values = np.ones((network.Np, ))*-np.inf
-        np.maximum.at(values, im.row, data[im.col])
+        values = _reduce_rows(np.maximum, data[im.indices], im.indptr, -np.inf)
     if mode == 'mean':
         if ignore_nans:
             data[nans] = 0
-        values = np.zeros((network.Np, ))
-        np.add.at(values, im.row, data[im.col])
-        counts = np.zeros((network.Np, ))
-        np.add.at(counts, im.row, np.ones((network.Nt, ))[im.col])
+        values = _reduce_rows(np.add, data[im.indices], im.indptr, 0.0)
+        counts = np.diff(im.indptr).astype(float)
         if ignore_nans:
-            np.subtract.at(counts, im.row, nans[im.col])
+            counts -= _reduce_rows(np.add, nans[im.indices].astype(float),
+                                   im.indptr, 0.0)
         values = values/counts
     if mode == 'sum':
         if ignore_nans:
             data[nans] = 0
-        values = np.zeros((network.Np, ))
-        np.add.at(values, im.row, data[im.col])
+        values = _reduce_rows(np.add, data[im.indices], im.indptr, 0.0)
+    return values
+
+
+def _reduce_rows(ufunc, vals, indptr, empty):
+    # Applies ufunc over the entries of each row of a csr matrix, giving
+    # rows without entries the value of empty
+    counts = np.diff(indptr)
+    values = np.full(counts.size, empty, dtype=float)
+    hits = counts > 0
+    if np.any(hits):
+        values[hits] = ufunc.reduceat(vals, indptr[:-1][hits])
     return values
 
 
@@ -124,15 +124,10 @@ def count_coincident_pores(network, thresh=1e-6):
     """
     # This needs to be a bit complicated because it cannot be assumed
     # the coincident pores are topologically connected
-    import scipy.spatial as sptl
-    coords = network.coords
-    tree = sptl.KDTree(coords)
-    hits = tree.query_pairs(r=thresh)
-    arr = np.array(list(hits)).flatten()
-    v, n = np.unique(arr, return_counts=True)
-    values = np.zeros(network.Np, dtype=int)
-    values[v.astype(int)] = n
-    return values
+    tree = network.get_kdtree()
+    hits = tree.query_pairs(r=thresh, output_type='ndarray')
+    values = np.bincount(hits.flatten(), minlength=network.Np)
+    return values.astype(int)
 
 
 def find_coincident_pores(network, thresh=1e-6):
@@ -156,17 +151,16 @@ def find_coincident_pores(network, thresh=1e-6):
     """
     # This needs to be a bit complicated because it cannot be assumed
     # the coincident pores are topologically connected
-    import scipy.spatial as sptl
-    coords = network['pore.coords']
-    tree = sptl.KDTree(coords)
-    a = tree.sparse_distance_matrix(tree, max_distance=thresh,
-                                    output_type='coo_matrix')
-    a.data += 1.0
-    a.setdiag(0)
-    a.eliminate_zeros()
-    a.data -= 1.0
-    a = a.tolil()
-    return a.rows
+    tree = network.get_kdtree()
+    hits = tree.query_pairs(r=thresh, output_type='ndarray')
+    i = np.hstack((hits[:, 0], hits[:, 1]))
+    j = np.hstack((hits[:, 1], hits[:, 0]))
+    j = j[np.lexsort((j, i))]
+    counts = np.bincount(i, minlength=network.Np)
+    rows = np.empty(network.Np, dtype=object)
+    for k, row in enumerate(np.split(j, np.cumsum(counts)[:-1])):
+        rows[k] = row.tolist()
+    return rows
 
 
 def bidirectional_throats(network):
@@ -6,7 +6,6 @@ Pore-scale models related to topology of the network.
 """
 from numpy.linalg import norm
 import numpy as np
-import scipy.spatial as sptl
 
 
 __all__ = [  # Keep this alphabetical for easier inspection of what's imported
@@ -48,8 +47,8 @@ def gabriel_edges(network):
     m = (c[:, 0, :] + c[:, 1, :])/2
     # Find the radius the sphere between each pair of nodes
     r = np.sqrt(np.sum((c[:, 0, :] - c[:, 1, :])**2, axis=1))/2
-    # Use the kd-tree function in Scipy's spatial module
-    tree = sptl.cKDTree(dn['pore.coords'])
+    # Use the kd-tree of the network, made with Scipy's spatial module
+    tree = dn.get_kdtree()
     # Find the nearest point for each midpoint
     n = tree.query(x=m, k=1)[0]
     # If nearest point to m is at distance r, then the edge is a Gabriel edge
@@ -110,9 +109,6 @@ def distance_to_nearest_pore(network):
     Find distance to and index of nearest pore even if not topologically
     connected
     """
-    import scipy.spatial as sptl
-    coords = network.coords
-    tree = sptl.KDTree(coords)
-    ds, ids = tree.query(coords, k=2)
+    ds, ids = network.find_nearest_pores(coords=network.coords, k=2)
     values = ds[:, 1]
     return values
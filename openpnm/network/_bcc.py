@@ -93,12 +93,14 @@ class BodyCenteredCubic(Network):
         spacing = np.array(spacing)
         if spacing.size == 1:
             spacing = np.ones(3)*spacing
-        for item in labels:
-            Ps = self.pores(item)
-            coords = np.absolute(self['pore.coords'][Ps])
-            axis = np.count_nonzero(np.diff(coords, axis=0), axis=0) == 0
-            offset = np.array(axis, dtype=int)/2
-            if np.amin(coords) == np.amin(coords[:, np.where(axis)[0]]):
-                offset = -1*offset
-            topotools.add_boundary_pores(network=self, pores=Ps, offset=offset,
-                                         apply_label=item + '_boundary')
+        with self.transaction():
+            for item in labels:
+                Ps = self.pores(item)
+                coords = np.absolute(self['pore.coords'][Ps])
+                axis = np.count_nonzero(np.diff(coords, axis=0), axis=0) == 0
+                offset = np.array(axis, dtype=int)/2
+                if np.amin(coords) == np.amin(coords[:, np.where(axis)[0]]):
+                    offset = -1*offset
+                topotools.add_boundary_pores(network=self, pores=Ps,
+                                             offset=offset,
+                                             apply_label=item + '_boundary')
@@ -114,17 +114,18 @@ class Cubic(Network):
         scale["front"] = scale["back"] = [1, 0, 1]
         scale["bottom"] = scale["top"] = [1, 1, 0]
 
-        for label in labels:
-            try:
-                Ps = self.pores(label)
-                topotools.clone_pores(network=self, pores=Ps,
-                                      labels=f"{label}_boundary",
-                                      mode='parents')
-                # Translate cloned pores
-                ind = self.pores(label + "_boundary")
-                coords = self["pore.coords"][ind]
-                coords = coords * scale[label] + offset[label]
-                self["pore.coords"][ind] = coords
-            except KeyError:
-                msg = f"No pores labelled {label} found, skipping boundary addition"
-                logger.warning(msg)
+        # All faces are added together so the arrays are only extended once
+        with self.transaction() as edits:
+            for label in labels:
+                try:
+                    Ps = self.pores(label)
+                    # Translate cloned pores and connect them to their parents
+                    coords = self["pore.coords"][Ps]
+                    coords = coords * scale[label] + offset[label]
+                    newPs = np.arange(edits.Np, edits.Np + Ps.size)
+                    topotools.extend(network=self, coords=coords,
+                                     conns=np.vstack((Ps, newPs)).T,
+                                     labels=f"{label}_boundary")
+                except KeyError:
+                    msg = f"No pores labelled {label} found, skipping boundary addition"
+                    logger.warning(msg)
@@ -1,7 +1,13 @@
 import logging
+from collections import namedtuple
+from contextlib import contextmanager
+from itertools import chain
+
 import numpy as np
 import scipy.sparse as sprs
+from scipy.sparse import csgraph
 import scipy.spatial as sptl
+from openpnm._skgraph.queries._funcs import _filter_ragged
 from openpnm.core import Domain
 from openpnm import topotools
 from openpnm.utils import Docorator
@@ -12,6 +18,366 @@ ws = Workspace()
 docstr = Docorator()
 
 
+class _TopologyIndex:
+    r"""
+    A CSR style lookup of the pores and throats neighboring each pore
+
+    Each pore's neighbors are found at ``indptr[i]:indptr[i+1]`` in
+    ``pores`` (sorted by pore index, with the connecting throats in
+    ``throats``) and in ``im_throats`` (sorted by throat index). It is
+    made once per topology and shared by the neighbor queries and the
+    matrix builders of ``Network``, so the entries never need sorting
+    again.
+    """
+
+    def __init__(self, conns, coords, version):
+        self.conns = conns
+        self.coords = coords
+        self.version = version
+        Np = coords.shape[0]
+        Nt = conns.shape[0]
+        self.Np, self.Nt = Np, Nt
+        c1 = conns[:, 0].astype(np.int64)
+        c2 = conns[:, 1].astype(np.int64)
+        self.indptr = np.zeros(Np + 1, dtype=np.int64)
+        np.cumsum(np.bincount(np.hstack((c1, c2)), minlength=Np),
+                  out=self.indptr[1:])
+        # Entries of the adjacency matrix are ordered as upper then lower
+        # triangle (i.e. as in create_adjacency_matrix), those of the
+        # incidence matrix as conns[:, 1] then conns[:, 0]
+        key = np.hstack((c1*Np + c2, c2*Np + c1))
+        self.am_order = np.argsort(key, kind='stable')
+        self.pores = np.hstack((c2, c1))[self.am_order]
+        self.throats = self.am_order % max(Nt, 1)
+        self.am_dupes = bool(np.any(np.diff(key[self.am_order]) == 0))
+        key = np.hstack((c2, c1))*Nt + np.tile(np.arange(Nt), 2)
+        self.im_order = np.argsort(key, kind='stable')
+        self.im_throats = self.im_order % max(Nt, 1)
+        self.im_dupes = bool(np.any(np.diff(key[self.im_order]) == 0))
+        self._keys = None  # Made on demand by connecting_throats
+        self._clusters = None  # Made on demand by clusters
+        self._spanned = None
+
+    def take(self, Pkeep, Tkeep, conns, coords, version):
+        # Returns the index of the network left after keeping the given
+        # pores and throats. The kept indices are renumbered in order, so
+        # the sorted order of the entries is unchanged and the new index
+        # is made by filtering this one rather than sorting again.
+        new = _TopologyIndex.__new__(_TopologyIndex)
+        new.conns, new.coords, new.version = conns, coords, version
+        Np, Nt = coords.shape[0], conns.shape[0]
+        new.Np, new.Nt = Np, Nt
+        Pmap = np.cumsum(Pkeep) - 1
+        Tmap = np.cumsum(Tkeep) - 1
+        new.indptr = np.zeros(Np + 1, dtype=np.int64)
+        np.cumsum(np.bincount(conns.flatten(), minlength=Np),
+                  out=new.indptr[1:])
+        keep = Tkeep[self.throats]
+        new.pores = Pmap[self.pores[keep]]
+        new.throats = Tmap[self.throats[keep]]
+        new.am_order = new.throats + Nt*(self.am_order[keep] >= self.Nt)
+        rows = None
+        if self.am_dupes or self.im_dupes:
+            rows = np.repeat(np.arange(Np), np.diff(new.indptr))
+        new.am_dupes = self.am_dupes and bool(np.any(
+            np.diff(rows*Np + new.pores) == 0))
+        keep = Tkeep[self.im_throats]
+        new.im_throats = Tmap[self.im_throats[keep]]
+        new.im_order = new.im_throats + Nt*(self.im_order[keep] >= self.Nt)
+        new.im_dupes = self.im_dupes and bool(np.any(
+            np.diff(rows*Nt + new.im_throats) == 0))
+        new._keys = None
+        new._clusters = None
+        new._spanned = None
+        return new
+
+    def gather(self, pores):
+        # Returns the locations in the index of the entries of all given
+        # pores, in order
+        starts = self.indptr[pores]
+        counts = self.indptr[pores + 1] - starts
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        return offsets + np.arange(counts.sum())
+
+    def neighbor_pores(self, pores, logic='or', flatten=True,
+                       include_input=False):
+        # Follows the logic of _skgraph.queries.find_neighbor_nodes
+        if logic not in ['or', 'union', 'any', 'xor', 'exclusive_or',
+                         'xnor', 'nxor', 'and', 'all', 'intersection']:
+            raise Exception('Specified logic is not implemented')
+        inputs = np.unique(pores)
+        neighbors = self.pores[self.gather(inputs)]
+        if logic in ['or', 'union', 'any']:
+            neighbors = np.unique(neighbors)
+        elif logic in ['xor', 'exclusive_or']:
+            neighbors = np.where(np.bincount(neighbors) == 1)[0]
+        elif logic in ['xnor', 'nxor']:
+            neighbors = np.where(np.bincount(neighbors) > 1)[0]
+        else:
+            # Count each neighbor once per input, so shared by all inputs
+            # means a count equal to the number of inputs
+            temp = np.unique(neighbors + self.Np*np.repeat(
+                np.arange(inputs.size), np.diff(self.indptr)[inputs]))
+            counts = np.bincount(temp % self.Np)
+            neighbors = np.where(counts == inputs.size)[0]
+        mask = np.zeros(self.Np, dtype=bool)
+        mask[neighbors] = True
+        if not include_input:
+            mask[pores] = False
+        if flatten:
+            return np.where(mask)[0]
+        indptr, indices = self.ragged(pores, self.pores)
+        return _filter_ragged(indptr, indices, mask[indices])
+
+    def neighbor_throats(self, pores, logic='or', flatten=True):
+        # Follows the logic of _skgraph.queries.find_neighbor_edges
+        if flatten:
+            if logic not in ['or', 'union', 'any', 'xor', 'exclusive_or',
+                             'xnor', 'shared']:
+                raise Exception('Specified logic is not implemented')
+            throats = self.im_throats[self.gather(np.unique(pores))]
+            throats, counts = np.unique(throats, return_counts=True)
+            if logic in ['xor', 'exclusive_or']:
+                throats = throats[counts == 1]
+            elif logic in ['xnor', 'shared']:
+                throats = throats[counts > 1]
+            return throats
+        if logic not in ['or', 'union', 'any', 'xor', 'exclusive_or',
+                         'xnor', 'shared', 'and', 'all', 'intersection']:
+            raise Exception('Specified logic is not implemented')
+        indptr, neighbors = self.ragged(pores, self.im_throats)
+        if logic in ['or', 'union', 'any']:
+            return indptr, neighbors
+        counts = np.bincount(neighbors, minlength=self.Nt)
+        if logic in ['xor', 'exclusive_or']:
+            mask = counts == 1
+        elif logic in ['xnor', 'shared']:
+            mask = counts > 1
+        else:
+            mask = counts == len(pores)
+        return _filter_ragged(indptr, neighbors, mask[neighbors])
+
+    def ragged(self, pores, values):
+        # Returns the unique entries of values for each given pore as a CSR
+        # style indptr and indices, relying on the entries of each pore
+        # being sorted
+        vals = values[self.gather(pores)]
+        indptr = np.zeros(len(pores) + 1, dtype=np.int64)
+        np.cumsum(np.diff(self.indptr)[pores], out=indptr[1:])
+        keep = np.ones(vals.size, dtype=bool)
+        keep[1:] = vals[1:] != vals[:-1]
+        keep[indptr[:-1][indptr[:-1] < vals.size]] = True  # Row starts
+        return _filter_ragged(indptr, vals, keep)
+
+    def clusters(self):
+        # Returns the number of clusters and the cluster of each pore,
+        # found once per topology
+        if self._clusters is None:
+            am = sprs.csr_matrix((np.ones(self.pores.size), self.pores,
+                                  self.indptr), shape=(self.Np, self.Np))
+            self._clusters = csgraph.connected_components(am, directed=False)
+        return self._clusters
+
+    def spans_clusters(self, pores):
+        # Checks if every cluster contains at least one of the given pores.
+        # The last result is kept, so repeating the check with the same
+        # pores (e.g. on every run of an algorithm) does no work.
+        pores = np.unique(pores)
+        key = pores.tobytes()
+        if (self._spanned is None) or (self._spanned[0] != key):
+            N, labels = self.clusters()
+            hits = np.zeros(N, dtype=bool)
+            hits[labels[pores]] = True
+            self._spanned = (key, bool(np.all(hits)))
+        return self._spanned[1]
+
+    def connecting_throats(self, P1, P2):
+        # The entries are sorted by pore then neighbor, so the pair keys are
+        # already sorted for use with searchsorted
+        if self._keys is None:
+            rows = np.repeat(np.arange(self.Np, dtype=np.int64),
+                             np.diff(self.indptr))
+            self._keys = rows*self.Np + self.pores
+        query = np.array(P1, dtype=np.int64)*self.Np \
+            + np.array(P2, dtype=np.int64)
+        loc = np.searchsorted(self._keys, query)
+        loc[loc == self._keys.size] = 0
+        hits = self._keys[loc] == query
+        Ts = self.throats[loc]
+        if not np.all(hits):
+            Ts = Ts.astype(float)
+            Ts[~hits] = np.nan
+        return Ts
+
+    def to_csr(self, data, kind='am'):
+        # Builds a csr matrix directly from the sorted entries, copying the
+        # index arrays since scipy modifies them in place in some methods
+        if kind == 'am':
+            shape = (self.Np, self.Np)
+            temp = (data[self.am_order], self.pores, self.indptr)
+            dupes = self.am_dupes
+        else:
+            shape = (self.Np, self.Nt)
+            temp = (data[self.im_order], self.im_throats, self.indptr)
+            dupes = self.im_dupes
+        temp = sprs.csr_matrix(temp, shape=shape, copy=True)
+        if dupes:
+            temp.sum_duplicates()
+        return temp
+
+
+def _rewrite_all_labels(obj):
+    # The 'all' labels are resized with dict.update since their length
+    # defines the object's size, so they are written again through
+    # __setitem__ to apply the memory settings and update their versions
+    for key in ['pore.all', 'throat.all']:
+        obj[key] = dict.__getitem__(obj, key)
+
+
+def _grow_arrays(obj, Np, Nt):
+    # Extends all arrays on obj to the given number of pores and throats,
+    # filling the new locations with nan, or False for labels
+    obj.update({'pore.all': np.ones([Np, ], dtype=bool),
+                'throat.all': np.ones([Nt, ], dtype=bool)})
+    _rewrite_all_labels(obj)
+    obj._resize_columns(pores=Np, throats=Nt)
+    for item in list(obj.keys()):
+        N = obj._count(element=item.split('.', 1)[0])
+        if obj[item].shape[0] < N:
+            arr = obj.pop(item)
+            s = arr.shape
+            if arr.dtype == bool:
+                obj[item] = np.zeros(shape=(N, *s[1:]), dtype=bool)
+            else:
+                obj[item] = np.ones(shape=(N, *s[1:]), dtype=float)*np.nan
+            obj[item][:arr.shape[0]] = arr
+
+
+class _PendingEdits:
+    r"""
+    Records the pores and throats added to or removed from a network within
+    ``Network.transaction`` so they can be applied together
+
+    Added pores and throats are numbered as if they were appended to the
+    network in the order they were added, and nothing is renumbered by
+    the removals until the edits are applied.
+    """
+
+    def __init__(self, network):
+        self.network = network
+        self.Np = network.Np
+        self.Nt = network.Nt
+        self.parts = []
+        self.labels = []
+        self.pores = []
+        self.throats = []
+        self.phases = False
+
+    def add(self, coords, conns, labels=[], donor=None, phases=True):
+        # The conns must be numbered to include the pending pores, and the
+        # arrays of a donor network are also appended when applied.  The
+        # phases are only extended if at least one addition asks for it.
+        Ps = np.arange(self.Np, self.Np + coords.shape[0])
+        Ts = np.arange(self.Nt, self.Nt + conns.shape[0])
+        self.parts.append((coords, conns, donor))
+        self.phases = self.phases or phases
+        self.Np += Ps.size
+        self.Nt += Ts.size
+        if isinstance(labels, str):
+            labels = [labels]
+        if len(labels):
+            self.labels.append((labels, Ps, Ts))
+        return Ps, Ts
+
+    def remove(self, pores, throats):
+        for locs, N, store in ((pores, self.Np, self.pores),
+                               (throats, self.Nt, self.throats)):
+            locs = np.array(locs, ndmin=1)
+            if locs.dtype == bool:
+                if locs.size != N:
+                    raise Exception('Mask of locations has the wrong length')
+                locs = np.where(locs)[0]
+            store.append(locs.astype(np.int64))
+
+    def apply(self):
+        net = self.network
+        if len(self.parts):
+            self._append()
+        for labels, Ps, Ts in self.labels:
+            for label in labels:
+                # Remove pore or throat from label, if present
+                label = label.split('.', 1)[-1]
+                if Ps.size:
+                    net.set_label(label=label, pores=Ps)
+                if Ts.size:
+                    net.set_label(label=label, throats=Ts)
+        pores = np.unique(np.hstack(self.pores)) if self.pores else []
+        throats = np.unique(np.hstack(self.throats)) if self.throats else []
+        if np.size(pores) or np.size(throats):
+            topotools.trim(network=net, pores=pores, throats=throats)
+
+    def _append(self):
+        # Every array is assembled from its pieces and written once
+        net = self.network
+        N0 = {'pore': net.Np, 'throat': net.Nt}
+        N = {'pore': self.Np, 'throat': self.Nt}
+        sizes = {'pore': [c.shape[0] for c, _, _ in self.parts],
+                 'throat': [c.shape[0] for _, c, _ in self.parts]}
+        coords = np.vstack([net['pore.coords']]
+                           + [c for c, _, _ in self.parts])
+        conns = np.vstack([net['throat.conns']]
+                          + [c for _, c, _ in self.parts])
+        net.update({'pore.all': np.ones([self.Np, ], dtype=bool),
+                    'throat.all': np.ones([self.Nt, ], dtype=bool)})
+        net._resize_columns(pores=self.Np, throats=self.Nt)
+        net['pore.coords'] = coords
+        net['throat.conns'] = conns
+        _rewrite_all_labels(net)
+        donors = [d for _, _, d in self.parts]
+        keys = list(net.keys())
+        for d in donors:
+            if d is not None:
+                keys.extend([k for k in d.keys() if k not in keys])
+        skip = ['pore.coords', 'throat.conns', 'pore.all', 'throat.all']
+        for key in keys:
+            if key in skip:
+                continue
+            element = key.split('.', 1)[0]
+            pieces = [net[key] if key in net.keys() else None]
+            pieces += [d[key] if (d is not None) and (key in d.keys())
+                       else None for d in donors]
+            ends = np.cumsum([N0[element]] + sizes[element])
+            if (pieces[0] is not None) \
+                    and (pieces[0].shape[0] == N[element]):
+                # Columnar properties have already been resized in place
+                arr = pieces[0]
+            elif all([p is not None for p in pieces]):
+                net[key] = np.concatenate(pieces)
+                continue
+            else:
+                first = [p for p in pieces if p is not None][0]
+                shape = (N[element], *first.shape[1:])
+                if first.dtype == bool:
+                    arr = np.zeros(shape, dtype=bool)
+                else:
+                    arr = np.ones(shape, dtype=float)*np.nan
+                if pieces[0] is not None:
+                    arr[:ends[0]] = pieces[0]
+            for i, p in enumerate(pieces[1:]):
+                if p is not None:
+                    arr[ends[i]:ends[i+1]] = p
+            net[key] = arr
+        if not self.phases:
+            return
+        # Increase size of any prop or label arrays already on phases
+        for obj in net.project.phases:
+            _grow_arrays(obj, Np=self.Np, Nt=self.Nt)
+        # Regenerate models on all phases to fill new elements
+        for obj in net.project.phases:
+            if hasattr(obj, 'models'):
+                obj.regenerate_models()
+
+
 @docstr.get_sections(base='NetworkSettings', sections=['Parameters'])
 @docstr.dedent
 class NetworkSettings:
@@ -84,9 +450,11 @@ class Network(Domain):
     >>> print(pn.num_neighbors(2))
     [1]
 
-    All of the topological queries are accomplished by inspecting the
-    adjacency and incidence matrices. They are created on demand, and are
-    stored for future use to save construction time.
+    All of the topological queries are accomplished using an index of
+    the neighbors of each pore, from which the adjacency and incidence
+    matrices are also built. The index and matrices are created on
+    demand, and are stored for future use until 'throat.conns' or
+    'pore.coords' is reassigned.
 
     """
 
@@ -95,6 +463,9 @@ class Network(Domain):
         self.settings._update(NetworkSettings())
         self._am = {}
         self._im = {}
+        self._topology = None
+        self._kdtree = None
+        self._edits = None
 
         if coords is not None:
             coords = np.array(coords)
@@ -127,6 +498,108 @@ class Network(Domain):
                 value = np.sort(value, axis=1)
         super().__setitem__(key, value)
 
+    def __getstate__(self):
+        state = super().__getstate__()
+        # These are rebuilt on demand so need not be stored
+        state['_am'] = {}
+        state['_im'] = {}
+        state['_topology'] = None
+        state['_kdtree'] = None
+        state['_edits'] = None
+        return state
+
+    @contextmanager
+    def transaction(self):
+        r"""
+        Groups several additions and deletions of pores and throats so they
+        are applied together when the block ends
+
+        Notes
+        -----
+        Within the ``with`` block, calls to ``topotools.extend``, ``trim``,
+        ``merge_networks`` and the functions built on them (e.g.
+        ``clone_pores``, ``connect_pores``, ``stitch`` and
+        ``add_boundary_pores``) are recorded rather than applied. When the
+        block ends every array on the network and its phases is
+        reallocated only once, the phase models are regenerated once, and
+        then a single ``trim`` is performed. As outside of a transaction,
+        the phases are left unchanged if the only additions were made by
+        ``merge_networks``. If an exception is raised in
+        the block the recorded edits are discarded.
+
+        New pores and throats are numbered as if appended to the network
+        in the order they were added, but the network itself is not
+        changed until the block ends, so queries such as ``Np`` or
+        ``find_neighbor_pores`` only see the existing pores. Removed
+        pores and throats are referred to by these same numbers.
+        Transactions can be nested, in which case the edits are applied
+        when the outermost block ends.
+
+        Examples
+        --------
+        >>> import openpnm as op
+        >>> pn = op.network.Cubic(shape=[5, 5, 5])
+        >>> with pn.transaction():
+        ...     for face in ['left', 'right', 'front', 'back']:
+        ...         op.topotools.add_boundary_pores(
+        ...             network=pn, pores=pn.pores(face), offset=[0, 0, 0],
+        ...             apply_label=face + '_boundary')
+        ...     print(pn.Np)
+        125
+        >>> print(pn.Np)
+        225
+
+        """
+        edits = getattr(self, '_edits', None)
+        if edits is not None:
+            yield edits
+            return
+        edits = self._edits = _PendingEdits(self)
+        try:
+            yield edits
+        finally:
+            self._edits = None
+        edits.apply()
+
+    def _get_topology(self, rebuild=True):
+        r"""
+        Returns the neighbor index of the network, rebuilding it if
+        'throat.conns' or 'pore.coords' has been reassigned since it was
+        made, in which case the stored matrices are also cleared. If
+        ``rebuild`` is ``False`` then ``None`` is returned instead of
+        building a new index.
+
+        Notes
+        -----
+        Changes made in-place (i.e. ``net['throat.conns'][0] = [1, 2]``)
+        are not detected, so the arrays should be reassigned instead.
+        """
+        conns = self['throat.conns']
+        coords = self['pore.coords']
+        version = (self._get_version('throat.conns'),
+                   self._get_version('pore.coords'))
+        topo = getattr(self, '_topology', None)
+        if (topo is None) or (topo.conns is not conns) \
+                or (topo.coords is not coords) or (topo.version != version):
+            if not rebuild:
+                return None
+            topo = _TopologyIndex(conns=conns, coords=coords, version=version)
+            self._topology = topo
+            self._am.clear()
+            self._im.clear()
+        return topo
+
+    def _trim_topology(self, topo, Pkeep, Tkeep):
+        # Called by topotools.trim after the arrays have been reindexed, so
+        # the neighbor index is updated rather than rebuilt from scratch
+        self._topology = topo.take(
+            Pkeep=Pkeep, Tkeep=Tkeep, conns=self['throat.conns'],
+            coords=self['pore.coords'],
+            version=(self._get_version('throat.conns'),
+                     self._get_version('pore.coords')))
+        self._am.clear()
+        self._im.clear()
+
     def get_adjacency_matrix(self, fmt='coo'):
         r"""
         Adjacency matrix in the specified sparse format, with throat IDs
@@ -156,6 +629,7 @@ class Network(Domain):
 
         """
         # Retrieve existing matrix if available
+        self._get_topology()  # Clears stored matrices if they are stale
         if fmt in self._am.keys():
             am = self._am[fmt]
         else:
@@ -188,6 +662,7 @@ class Network(Domain):
         non-zero location use ``create_incidence_matrix``.
 
         """
+        self._get_topology()  # Clears stored matrices if they are stale
         if fmt in self._im.keys():
             im = self._im[fmt]
         elif self._im.keys():
@@ -202,6 +677,66 @@ class Network(Domain):
 
     im = property(fget=get_incidence_matrix)
 
+    def get_kdtree(self):
+        r"""
+        A ``scipy.spatial.cKDTree`` of the pore coordinates
+
+        Notes
+        -----
+        The tree is stored for future use, and is rebuilt when
+        'pore.coords' is reassigned, including by ``trim`` and ``extend``.
+        The tree keeps a copy of the coordinates which is compared to
+        'pore.coords' on each call, so changes made in-place (i.e.
+        ``net['pore.coords'][0] = [1, 2, 3]``) are also detected. This
+        comparison is much faster than building the tree.
+
+        """
+        coords = self['pore.coords']
+        version = self._get_version('pore.coords')
+        tree = getattr(self, '_kdtree', None)
+        if (tree is None) or (tree[0] != version) \
+                or (not np.array_equal(tree[1].data, coords)):
+            tree = (version, sptl.cKDTree(coords, copy_data=True))
+            self._kdtree = tree
+        return tree[1]
+
+    def find_nearest_pores(self, coords, k=1, workers=1):
+        r"""
+        Finds the ``k`` pores nearest to each of the given points
+
+        Parameters
+        ----------
+        coords : array_like
+            An N-by-3 array of points
+        k : int
+            The number of nearest pores to find for each point. The default
+            is 1.
+        workers : int
+            The number of threads used to query the points. -1 uses all
+            available cores. The default is 1.
+
+        Returns
+        -------
+        A namedtuple with ``distances`` and ``pores`` attributes, each an
+        N-by-``k`` array sorted by distance. If there are fewer than ``k``
+        pores the missing entries have a distance of ``inf`` and an index
+        of ``Np``.
+
+        Examples
+        --------
+        >>> import openpnm as op
+        >>> pn = op.network.Cubic(shape=[3, 3, 3])
+        >>> hits = pn.find_nearest_pores(coords=[[0.5, 0.5, 1.2]], k=2)
+        >>> print(hits.pores)
+        [[1 0]]
+
+        """
+        coords = np.array(coords, dtype=float, ndmin=2)
+        d, i = self.get_kdtree().query(coords, k=[k] if k == 1 else k,
+                                       workers=workers)
+        tup = namedtuple('nearest', ('distances', 'pores'))
+        return tup(np.array(d, ndmin=2), np.array(i, dtype=np.int64, ndmin=2))
+
     am = property(fget=get_adjacency_matrix)
 
     def create_adjacency_matrix(self, weights=None, fmt='coo', triu=False,
@@ -274,20 +809,24 @@ class Network(Domain):
         conn = self['throat.conns']
         row = conn[:, 0]
         col = conn[:, 1]
-        if weights.shape == (2 * self.Nt):
-            # The flip is necessary since we want [conns.T, reverse(conns).T].T
-            row = np.append(row, conn[:, 1])
-            col = np.append(col, conn[:, 0])
-        elif weights.shape == (self.Nt, 2):
-            # The flip is necessary since we want [conns.T, reverse(conns).T].T
-            row = np.append(row, conn[:, 1])
-            col = np.append(col, conn[:, 0])
+        if weights.shape == (self.Nt, 2):
             weights = weights.flatten(order='F')
-        elif not triu:
+        elif weights.shape == (self.Nt, ) and not triu:
+            weights = np.append(weights, weights)
+        if weights.shape == (2 * self.Nt, ):
+            if fmt in ['csr', 'lil', 'dok']:
+                # Use the sorted entries of the index to skip the conversion
+                temp = self._get_topology().to_csr(weights, kind='am')
+                if drop_zeros:
+                    temp.eliminate_zeros()
+                if fmt == 'lil':
+                    temp = temp.tolil()
+                elif fmt == 'dok':
+                    temp = temp.todok()
+                return temp
             # The flip is necessary since we want [conns.T, reverse(conns).T].T
             row = np.append(row, conn[:, 1])
             col = np.append(col, conn[:, 0])
-            weights = np.append(weights, weights)
 
         # Generate sparse adjacency matrix in 'coo' format
         temp = sprs.coo_matrix((weights, (row, col)), (self.Np, self.Np))
@@ -364,6 +903,17 @@ class Network(Domain):
         elif np.shape(weights)[0] != 2*self.Nt:
             raise Exception('Received dataset of incorrect length')
 
+        if fmt in ['csr', 'lil', 'dok']:
+            # Use the sorted entries of the index to skip the conversion
+            temp = self._get_topology().to_csr(np.array(weights), kind='im')
+            if drop_zeros:
+                temp.eliminate_zeros()
+            if fmt == 'lil':
+                temp = temp.tolil()
+            elif fmt == 'dok':
+                temp = temp.todok()
+            return temp
+
         conn = self['throat.conns']
         row = conn[:, 1]
         row = np.append(row, conn[:, 0])
@@ -479,12 +1029,16 @@ class Network(Domain):
         [nan  1. nan]
 
         """
-        sites = np.vstack((P1, P2)).T
-        Ts = topotools.find_connecting_bonds(sites=sites, network=self)
+        P1 = np.array(P1, ndmin=1)
+        P2 = np.array(P2, ndmin=1)
+        if (P1.size == 0) or (self.Nt == 0):
+            sites = np.vstack((P1, P2)).T
+            return topotools.find_connecting_bonds(sites=sites, network=self)
+        Ts = self._get_topology().connecting_throats(P1, P2)
         return Ts
 
     def find_neighbor_pores(self, pores, mode='or', flatten=True,
-                            include_input=False, asmask=False):
+                            include_input=False, asmask=False, ragged=False):
         r"""
         Returns a list of pores that are direct neighbors to the given pore(s)
 
@@ -528,13 +1082,21 @@ class Network(Domain):
             If ``False`` (default), the returned result is a list of the
             neighboring pores as indices. If ``True``, the returned result is a
             boolean mask. (Useful for labelling)
+        ragged : bool
+            If ``True`` the neighbors of each input pore are returned as a
+            CSR style ragged array (see Returns), which avoids creating a
+            separate array for each pore. ``flatten`` is ignored in this
+            case. The default is ``False``.
 
         Returns
         -------
         If ``flatten`` is ``True``, returns a 1D array of pore indices
         filtered according to the specified mode.  If ``flatten`` is
         ``False``, returns a list of lists, where each list contains the
-        neighbors of the corresponding input pores.
+        neighbors of the corresponding input pores. If ``ragged`` is
+        ``True``, returns a namedtuple with ``indptr`` and ``indices``
+        attributes, such that the neighbors of the i-th input pore are
+        ``indices[indptr[i]:indptr[i+1]]``.
 
         Notes
         -----
@@ -569,25 +1131,32 @@ class Network(Domain):
         >>> Ps = pn.find_neighbor_pores(pores=[0, 2], mode='xor')
         >>> print(Ps)
         [ 3  5  7 25 27]
+        >>> Ps = pn.find_neighbor_pores(pores=[0, 2], ragged=True)
+        >>> print(Ps.indptr, Ps.indices)
+        [0 3 7] [ 1  5 25  1  3  7 27]
 
         """
         pores = self._parse_indices(pores)
+        if asmask and (ragged or not flatten):
+            raise Exception('Cannot create mask on an unflattened output')
         if np.size(pores) == 0:
+            if ragged:
+                return self._ragged_neighbors([0], [])
             return np.array([], ndmin=1, dtype=int)
-        neighbors = topotools.find_neighbor_sites(sites=pores, logic=mode,
-                                                  network=self,
-                                                  flatten=flatten,
-                                                  include_input=include_input)
-        if asmask is False:
-            return neighbors
-        elif flatten is True:
+        neighbors = self._get_topology().neighbor_pores(
+            pores=pores, logic=mode, flatten=flatten and not ragged,
+            include_input=include_input)
+        if ragged:
+            return self._ragged_neighbors(*neighbors)
+        elif not flatten:
+            # The list is made of views into the ragged array
+            return np.split(neighbors[1], neighbors[0][1:-1])
+        elif asmask:
             neighbors = self._tomask(element='pore', indices=neighbors)
-            return neighbors
-        else:
-            raise Exception('Cannot create mask on an unflattened output')
+        return neighbors
 
     def find_neighbor_throats(self, pores, mode='or', flatten=True,
-                              asmask=False):
+                              asmask=False, ragged=False):
         r"""
         Returns a list of throats neighboring the given pore(s)
 
@@ -625,13 +1194,20 @@ class Network(Domain):
             If ``False`` (default), the returned result is a list of the
             neighboring throats as indices. If ``True``, the returned result is a
             boolean mask. (Useful for labelling)
+        ragged : bool
+            If ``True`` the neighbors of each input pore are returned as a
+            CSR style ragged array (see Returns). ``flatten`` is ignored in
+            this case. The default is ``False``.
 
         Returns
         -------
         If ``flatten`` is ``True``, returns a 1D array of throat indices
         filtered according to the specified mode.  If ``flatten`` is
         ``False``, returns a list of lists, where each list contains the
-        neighbors of the corresponding input pores.
+        neighbors of the corresponding input pores. If ``ragged`` is
+        ``True``, returns a namedtuple with ``indptr`` and ``indices``
+        attributes, such that the neighbors of the i-th input pore are
+        ``indices[indptr[i]:indptr[i+1]]``.
 
         Notes
         -----
@@ -656,22 +1232,26 @@ class Network(Domain):
 
         """
         pores = self._parse_indices(pores)
+        if asmask and (ragged or not flatten):
+            raise Exception('Cannot create mask on an unflattened output')
         if np.size(pores) == 0:
+            if ragged:
+                return self._ragged_neighbors([0], [])
             return np.array([], ndmin=1, dtype=int)
-        if flatten is False:
-            neighbors = topotools.find_neighbor_bonds(sites=pores, logic=mode,
-                                                      network=self,
-                                                      flatten=flatten)
-        else:
-            neighbors = topotools.find_neighbor_bonds(sites=pores, logic=mode,
-                                                      network=self, flatten=True)
-        if asmask is False:
-            return neighbors
-        elif flatten is True:
+        neighbors = self._get_topology().neighbor_throats(
+            pores=pores, logic=mode, flatten=flatten and not ragged)
+        if ragged:
+            return self._ragged_neighbors(*neighbors)
+        elif not flatten:
+            return np.split(neighbors[1], neighbors[0][1:-1])
+        elif asmask:
             neighbors = self._tomask(element='throat', indices=neighbors)
-            return neighbors
-        else:
-            raise Exception('Cannot create mask on an unflattened output')
+        return neighbors
+
+    def _ragged_neighbors(self, indptr, indices):
+        tup = namedtuple('neighbors', ('indptr', 'indices'))
+        return tup(np.array(indptr, dtype=np.int64),
+                   np.array(indices, dtype=np.int64))
 
     def num_neighbors(self, pores, mode='or', flatten=False):
         r"""
@@ -744,12 +1324,12 @@ class Network(Domain):
             num = self.find_neighbor_pores(pores, flatten=flatten,
                                            mode=mode, include_input=True)
             num = np.size(num)
-        else:   # Could be done much faster if flatten == False
-            am = self.create_adjacency_matrix(fmt="csr")
-            num = am[pores].sum(axis=1).A1
+        else:
+            num = np.diff(self._get_topology().indptr)[pores]
         return num
 
-    def find_nearby_pores(self, pores, r, flatten=False, include_input=False):
+    def find_nearby_pores(self, pores, r, flatten=False, include_input=False,
+                          ragged=False, workers=1):
         r"""
         Find all pores within a given radial distance of the input pore(s)
         regardless of whether or not they are toplogically connected.
@@ -772,6 +1352,13 @@ class Network(Domain):
             criteria, otherwise returns an array containing a sub-array for
             each input pore, where each sub-array contains the pores that
             are nearby to each given input pore.  The default is False.
+        ragged : bool
+            If ``True`` the nearby pores of each input pore are returned as
+            a CSR style ragged array, as in ``find_neighbor_pores``.
+            ``flatten`` is ignored in this case. The default is ``False``.
+        workers : int
+            The number of threads used to query the pores. -1 uses all
+            available cores. The default is 1.
 
         Returns
         -------
@@ -795,40 +1382,44 @@ class Network(Domain):
         >>> Ps = pn.find_nearby_pores(pores=[0, 1], r=1, flatten=True)
         >>> print(Ps)
         [ 2  3  4  9 10]
+        >>> Ps = pn.find_nearby_pores(pores=[0, 1], r=1, ragged=True)
+        >>> print(Ps.indptr, Ps.indices)
+        [0 2 5] [ 3  9  2  4 10]
+
+        Notes
+        -----
+        The pores are found using the tree returned by ``get_kdtree``, so
+        repeated searches do not rebuild it.
 
         """
         pores = self._parse_indices(pores)
         # Handle an empty array if given
         if np.size(pores) == 0:
+            if ragged:
+                return self._ragged_neighbors([0], [])
             return np.array([], dtype=np.int64)
         if r <= 0:
             raise Exception('Provided distances should be greater than 0')
-        # Create kdTree objects
-        kd = sptl.cKDTree(self['pore.coords'])
-        kd_pores = sptl.cKDTree(self['pore.coords'][pores])
-        # Perform search
-        Ps_within_r = kd_pores.query_ball_tree(kd, r=r)
-        # Remove self from each list
-        for i, P in enumerate(Ps_within_r):
-            Ps_within_r[i].remove(pores[i])
-        # Convert to flattened list by default
-        temp = np.concatenate((Ps_within_r))
-        Pn = np.unique(temp).astype(np.int64)
-        # Remove inputs if necessary
+        # Perform search, with each list sorted by pore index
+        hits = self.get_kdtree().query_ball_point(
+            self['pore.coords'][pores], r=r, workers=workers,
+            return_sorted=True)
+        counts = np.fromiter(map(len, hits), dtype=np.int64, count=len(hits))
+        Pn = np.fromiter(chain.from_iterable(hits), dtype=np.int64,
+                         count=counts.sum())
+        indptr = np.zeros(len(hits) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        # Remove self from each list, and inputs if necessary
+        keep = Pn != np.repeat(pores, counts)
         if include_input is False:
-            Pn = Pn[~np.in1d(Pn, pores)]
-        # Convert list of lists to a list of ndarrays
-        if flatten is False:
-            if len(Pn) == 0:  # Deal with no nearby neighbors
-                Pn = [np.array([], dtype=np.int64) for i in pores]
-            else:
-                mask = np.zeros(shape=np.amax((Pn.max(), pores.max())) + 1, dtype=bool)
-                mask[Pn] = True
-                temp = []
-                for item in Ps_within_r:
-                    temp.append(np.array(item, dtype=np.int64)[mask[item]])
-                Pn = temp
-        return Pn
+            keep &= ~np.isin(Pn, pores)
+        indptr, Pn = _filter_ragged(indptr, Pn, keep)
+        if ragged:
+            return self._ragged_neighbors(indptr, Pn)
+        elif flatten:
+            return np.unique(Pn)
+        # Convert to a list of arrays, which are views into the ragged array
+        return np.split(Pn, indptr[1:-1])
 
     @property
     def info(self):
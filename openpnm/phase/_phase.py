@@ -68,6 +68,19 @@ class Phase(Domain):
             # Insert values into masked locations
             mask = self.project._get_locations(element + '.' + domain)
             temp[mask] = value
+            self._touch(element + '.' + prop)
+
+    def _count(self, element):
+        # Sizes come from the network, just as __getitem__ falls back to it
+        key = {'pore': 'pore.coords', 'throat': 'throat.conns'}.get(element)
+        if (key is not None) and (key not in self.keys()):
+            try:
+                network = self.network
+            except AttributeError:  # Not yet part of a project
+                network = None
+            if (network is not None) and (key in network.keys()):
+                return network[key].shape[0]
+        return super()._count(element)
 
     def __getitem__(self, key):
         try:  # If key exists, just get it
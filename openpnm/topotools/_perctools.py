@@ -18,6 +18,7 @@ __all__ = [
     'bond_percolation',
     'find_clusters',
     'find_path',
+    'find_shortest_paths',
 ]
 
 
@@ -28,6 +29,14 @@ def find_path(network, pore_pairs, weights=None):
 find_path.__doc__ = queries.find_path.__doc__
 
 
+def find_shortest_paths(network, sources, targets=None, weights=None):
+    return queries.find_shortest_paths(network=network, sources=sources,
+                                       targets=targets, weights=weights)
+
+
+find_shortest_paths.__doc__ = queries.find_shortest_paths.__doc__
+
+
 def ispercolating(network, inlets, outlets):
     if np.array(inlets).dtype == bool:
         inlets = np.where(inlets)[0]
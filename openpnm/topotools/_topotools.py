@@ -1,4 +1,5 @@
 import logging
+from itertools import chain
 import numpy as np
 import scipy as sp
 from scipy.spatial import cKDTree
@@ -154,7 +155,7 @@ def dimensionality(network):
     return skgr.tools.dimensionality(network)
 
 
-def trim(network, pores=[], throats=[]):
+def trim(network, pores=[], throats=[], workers=1):
     """
     Remove pores or throats from the network
 
@@ -165,8 +166,26 @@ def trim(network, pores=[], throats=[]):
     pores (or throats) : array_like
         The indices of the of the pores or throats to be removed from the
         network.
+    workers : int, optional
+        The number of threads used to reindex the arrays of each object,
+        which can help on very large networks. The default is 1, and
+        ``None`` lets ``ThreadPoolExecutor`` decide.
+
+    Notes
+    -----
+    The pores and throats to keep are found once, then every array on
+    every object in the project is reindexed in a single pass. If the
+    neighbor index of the network is up to date it is filtered to match,
+    rather than being rebuilt the next time it is needed.
+
+    If called within ``Network.transaction`` the pores and throats are
+    only removed when the transaction ends.
 
     """
+    edits = getattr(network, '_edits', None)
+    if edits is not None:
+        edits.remove(pores=pores, throats=throats)
+        return
     pores = network._parse_indices(pores)
     throats = network._parse_indices(throats)
     Pkeep = np.copy(network['pore.all'])
@@ -175,15 +194,8 @@ def trim(network, pores=[], throats=[]):
         Pkeep[pores] = False
         if not np.any(Pkeep):
             raise Exception('Cannot delete ALL pores')
-        # # Performing customized find_neighbor_throats which is much faster,
-        # # but not general for other types of queries
-        # temp = np.in1d(network['throat.conns'].flatten(), pores)
-        # temp = np.reshape(temp, (network.Nt, 2))
-        # Ts = np.any(temp, axis=1)
-        # Ts = network.Ts[Ts]
-        Ts = network.find_neighbor_throats(pores=~Pkeep, mode='union')
-        if len(Ts) > 0:
-            Tkeep[Ts] = False
+        # Throats connected to any deleted pore are deleted too
+        Tkeep &= np.all(Pkeep[network['throat.conns']], axis=1)
     if np.size(throats) > 0:
         Tkeep[throats] = False
         # The following IF catches the special case of deleting ALL throats
@@ -196,36 +208,25 @@ def trim(network, pores=[], throats=[]):
             network['throat.all'] = np.array([], ndmin=1)
             return
 
-    # Temporarily store throat conns and pore map for processing later
+    topo = network._get_topology(rebuild=False)
     Np_old = network.Np
     Nt_old = network.Nt
     Pkeep_inds = np.where(Pkeep)[0]
     Tkeep_inds = np.where(Tkeep)[0]
-    Pmap = np.ones((network.Np,), dtype=int)*-1
-    tpore1 = network['throat.conns'][:, 0]
-    tpore2 = network['throat.conns'][:, 1]
 
     # Delete specified pores and throats from all objects
     for obj in network.project:
         if (obj.Np == Np_old) and (obj.Nt == Nt_old):
             Ps = Pkeep_inds
             Ts = Tkeep_inds
-        for key in list(obj.keys()):
-            temp = obj.pop(key)
-            if key.split('.', 1)[0] == 'throat':
-                obj.update({key: temp[Ts]})
-            if key.split('.', 1)[0] == 'pore':
-                obj.update({key: temp[Ps]})
+        obj._take(pores=Ps, throats=Ts, workers=workers)
 
     # Remap throat connections
-    Pmap[Pkeep] = np.arange(0, np.sum(Pkeep))
-    Tnew1 = Pmap[tpore1[Tkeep]]
-    Tnew2 = Pmap[tpore2[Tkeep]]
-    network.update({'throat.conns': np.vstack((Tnew1, Tnew2)).T})
-
-    # Clear adjacency and incidence matrices which will be out of date now
-    network._am.clear()
-    network._im.clear()
+    Pmap = np.ones((Np_old,), dtype=int)*-1
+    Pmap[Pkeep] = np.arange(0, Pkeep_inds.size)
+    network['throat.conns'] = Pmap[network['throat.conns']]
+    if topo is not None:
+        network._trim_topology(topo, Pkeep=Pkeep, Tkeep=Tkeep)
 
 
 def extend(network, coords=[], conns=[], labels=[], **kwargs):
@@ -247,73 +248,23 @@ def extend(network, coords=[], conns=[], labels=[], **kwargs):
     labels : str, or list[str], optional
         A list of labels to apply to the new pores and throats
 
+    Notes
+    -----
+    If called within ``Network.transaction`` the new pores and throats are
+    only added when the transaction ends, and ``conns`` may refer to pores
+    added earlier in the same transaction.
+
     """
     if 'throat_conns' in kwargs.keys():
         conns = kwargs['throat_conns']
     if 'pore_coords' in kwargs.keys():
         coords = kwargs['pore_coords']
-    coords = np.array(coords)
-    conns = np.array(conns)
-    Np_old = network.num_pores()
-    Nt_old = network.num_throats()
-    Np = Np_old + coords.shape[0]
-    Nt = Nt_old + conns.shape[0]
-    if np.any(conns > Np):
-        raise Exception('Some throat conns point to non-existent pores')
-    network.update({'pore.all': np.ones([Np, ], dtype=bool),
-                    'throat.all': np.ones([Nt, ], dtype=bool)})
-    # Add coords and conns
-    if np.size(coords) > 0:
-        coords = np.vstack((network['pore.coords'], coords))
-        network['pore.coords'] = coords
-    if np.size(conns) > 0:
-        conns = np.vstack((network['throat.conns'], conns))
-        network['throat.conns'] = conns
-
-    # Increase size of any prop or label arrays already on network and phases
-    objs = list(network.project.phases)
-    objs.append(network)
-    for obj in objs:
-        obj.update({'pore.all': np.ones([Np, ], dtype=bool),
-                    'throat.all': np.ones([Nt, ], dtype=bool)})
-        for item in list(obj.keys()):
-            N = obj._count(element=item.split('.', 1)[0])
-            if obj[item].shape[0] < N:
-                arr = obj.pop(item)
-                s = arr.shape
-                if arr.dtype == bool:
-                    obj[item] = np.zeros(shape=(N, *s[1:]), dtype=bool)
-                else:
-                    obj[item] = np.ones(shape=(N, *s[1:]), dtype=float)*np.nan
-                obj[item][:arr.shape[0]] = arr
-
-    # Regenerate models on all objects to fill new elements
-    for obj in network.project.phases:
-        if hasattr(obj, 'models'):
-            obj.regenerate_models()
-
-    # Apply labels, if supplied
-    if labels != []:
-        # Convert labels to list if necessary
-        if isinstance(labels, str):
-            labels = [labels]
-        for label in labels:
-            # Remove pore or throat from label, if present
-            label = label.split('.', 1)[-1]
-            if np.size(coords) > 0:
-                Ps = np.r_[Np_old:Np]
-                if 'pore.'+label not in network.labels():
-                    network['pore.'+label] = False
-                network['pore.'+label][Ps] = True
-            if np.size(conns) > 0:
-                Ts = np.r_[Nt_old:Nt]
-                if 'throat.'+label not in network.labels():
-                    network['throat.'+label] = False
-                network['throat.'+label][Ts] = True
-
-    # Clear adjacency and incidence matrices which will be out of date now
-    network._am.clear()
-    network._im.clear()
+    coords = np.array(coords, dtype=float).reshape(-1, 3)
+    conns = np.array(conns, dtype=int).reshape(-1, 2)
+    with network.transaction() as edits:
+        if np.any(conns > edits.Np + coords.shape[0]):
+            raise Exception('Some throat conns point to non-existent pores')
+        edits.add(coords=coords, conns=conns, labels=labels)
 
 
 def label_faces(network, tol=0.0, label='surface'):
@@ -480,39 +431,28 @@ def clone_pores(network, pores, labels=['clone'], mode='parents'):
     if isinstance(labels, str):
         labels = [labels]
     network._parse_indices(pores)
-    Np = network.Np
-    Nt = network.Nt
-    # Clone pores
     parents = np.array(pores, ndmin=1)
-    pcurrent = network['pore.coords']
-    pclone = pcurrent[pores, :]
-    pnew = np.concatenate((pcurrent, pclone), axis=0)
-    Npnew = np.shape(pnew)[0]
-    clones = np.arange(Np, Npnew)
-    # Create cloned pores first
-    extend(network=network, pore_coords=pclone)
-    # Apply provided labels to cloned pores
-    for item in labels:
-        network.set_label(label=item, pores=range(Np, Npnew))
-    # Add connections between parents and clones
-    if mode == 'parents':
-        tclone = np.vstack((parents, clones)).T
-        extend(network=network, conns=tclone)
-    elif mode == 'siblings':
-        ts = network.find_neighbor_throats(pores=pores, mode='xnor')
-        mapping = np.zeros([network.Np, ], dtype=int)
-        mapping[pores] = np.arange(Np, network.Np)
-        tclone = mapping[network['throat.conns'][ts]]
-        extend(network=network, throat_conns=tclone)
-    elif mode == 'isolated':
-        pass
-    Ntnew = network.Nt
-    for item in labels:
-        network.set_label(label=item, throats=range(Nt, Ntnew))
-
-    # Clear adjacency and incidence matrices which will be out of date now
-    network._am.clear()
-    network._im.clear()
+    pclone = network['pore.coords'][pores, :]
+    with network.transaction() as edits:
+        # Clones are numbered after any pores already pending
+        clones = np.arange(edits.Np, edits.Np + pclone.shape[0])
+        # Add connections between parents and clones
+        tclone = np.zeros([0, 2], dtype=int)
+        if mode == 'parents':
+            tclone = np.vstack((parents, clones)).T
+        elif mode == 'siblings':
+            ts = network.find_neighbor_throats(pores=pores, mode='xnor')
+            mapping = np.zeros([edits.Np + clones.size, ], dtype=int)
+            mapping[pores] = clones
+            tclone = mapping[network['throat.conns'][ts]]
+        elif mode == 'isolated':
+            pass
+        # The labels are created even if no pores or throats are added
+        for item in labels:
+            network.set_label(label=item, pores=[])
+            network.set_label(label=item, throats=[])
+        # Add the clones and their connections together
+        extend(network=network, coords=pclone, conns=tclone, labels=labels)
 
 
 def merge_networks(network, donor=[]):
@@ -539,58 +479,13 @@ def merge_networks(network, donor=[]):
     else:
         donors = [donor]
 
-    for donor in donors:
-        network['throat.conns'] = np.vstack((network['throat.conns'],
-                                             donor['throat.conns']
-                                             + network.Np))
-        network['pore.coords'] = np.vstack((network['pore.coords'],
-                                            donor['pore.coords']))
-        p_all = np.ones((np.shape(network['pore.coords'])[0],), dtype=bool)
-        t_all = np.ones((np.shape(network['throat.conns'])[0],), dtype=bool)
-        network.update({'pore.all': p_all})
-        network.update({'throat.all': t_all})
-        for key in set(network.keys()).union(set(donor.keys())):
-            if key.split('.')[1] not in ['conns', 'coords', '_id', 'all']:
-                if key in network.keys():
-                    pop_flag = False
-                    # If key not on donor add it first with dummy values to
-                    # simplify merging later
-                    if key not in donor.keys():
-                        logger.debug('Adding ' + key + ' to donor')
-                        if network[key].dtype == bool:  # Deal with labels
-                            donor[key] = False
-                        else:  # Deal with numerical data
-                            element = key.split('.', 1)[0]
-                            shape = list(network[key].shape)
-                            N = donor._count(element)
-                            shape[0] = N
-                            donor[key] = np.empty(shape=shape)*np.nan
-                        pop_flag = True
-                    # Then merge it with existing array on network
-                    if len(network[key].shape) == 1:
-                        temp = np.hstack((network[key], donor[key]))
-                    else:
-                        temp = np.vstack((network[key], donor[key]))
-                    network[key] = temp
-                    if pop_flag:
-                        donor.pop(key, None)
-                else:
-                    # If key not on network add it first
-                    logger.debug('Adding ' + key + ' to network')
-                    if donor[key].dtype == bool:
-                        network[key] = False
-                    else:
-                        data_shape = list(donor[key].shape)
-                        pore_prop = True if key.split(".")[0] == "pore" else False
-                        data_shape[0] = network.Np if pore_prop else network.Nt
-                        network[key] = np.empty(data_shape) * np.nan
-                    # Then append donor values to network
-                    s = np.shape(donor[key])[0]
-                    network[key][-s:] = donor[key]
-
-    # Clear adjacency and incidence matrices which will be out of date now
-    network._am.clear()
-    network._im.clear()
+    # All donors are appended together, so each array on the network is
+    # only reallocated once
+    with network.transaction() as edits:
+        for donor in donors:
+            edits.add(coords=donor['pore.coords'],
+                      conns=donor['throat.conns'] + edits.Np,
+                      donor=donor, phases=False)
 
 
 def stitch(network, donor, P_network, P_donor, method='nearest',
@@ -645,10 +540,10 @@ def stitch(network, donor, P_network, P_donor, method='nearest',
     for s in label_stitches:
         if s not in network.keys():
             network['throat.' + s] = False
-    # Get the initial number of pores and throats
+    edits = getattr(network, '_edits', None)
+    # Get the initial number of pores, including any pending additions
     N_init = {}
-    N_init['pore'] = network.Np
-    N_init['throat'] = network.Nt
+    N_init['pore'] = network.Np if edits is None else edits.Np
     if method == 'nearest':
         P1 = P_network
         P2 = P_donor + N_init['pore']  # Increment pores on donor
@@ -661,17 +556,26 @@ def stitch(network, donor, P_network, P_donor, method='nearest',
         P1 = P_network
         P2 = P_donor + N_init['pore']  # Increment pores on donor
         C1 = network['pore.coords'][P_network]
-        C2 = donor['pore.coords'][P_donor]
-        D = sp.spatial.distance.cdist(C1, C2)
-        [P1_ind, P2_ind] = np.where(D <= len_max)
+        # Search the kd-tree of the donor, keeping only hits in P_donor
+        hits = donor.get_kdtree().query_ball_point(C1, r=len_max)
+        counts = np.fromiter(map(len, hits), dtype=int, count=len(hits))
+        hits = np.fromiter(chain.from_iterable(hits), dtype=int,
+                           count=counts.sum())
+        loc = -np.ones(donor.Np, dtype=int)
+        loc[P_donor] = np.arange(np.size(P_donor))
+        P1_ind = np.repeat(np.arange(np.size(P_network)), counts)
+        P2_ind = loc[hits]
+        P1_ind, P2_ind = P1_ind[P2_ind >= 0], P2_ind[P2_ind >= 0]
+        order = np.lexsort((P2_ind, P1_ind))
+        P1_ind, P2_ind = P1_ind[order], P2_ind[order]
         conns = np.vstack((P1[P1_ind], P2[P2_ind])).T
     else:
         raise Exception('<{}> method not supported'.format(method))
 
-    merge_networks(network, donor)
-
-    # Add the new stitch throats to the Network
-    extend(network=network, throat_conns=conns, labels=label_stitches)
+    with network.transaction():
+        merge_networks(network, donor)
+        # Add the new stitch throats to the Network
+        extend(network=network, throat_conns=conns, labels=label_stitches)
 
     # Remove donor from Workspace, if present
     # This check allows for the reuse of a donor Network multiple times
@@ -808,6 +712,10 @@ def merge_pores(network, pores, labels=['merged'], include_neighbors=True):
     certain distance of a given pore, and these can then be merged without
     causing any abnormal connections.
 
+    (3) The neighbors of all groups, and which groups neighbor each other,
+    are found together by sorting, so merging many groups scales nearly
+    linearly with the number of groups.
+
     """
     # Assert that `pores` is list of lists
     try:
@@ -816,45 +724,63 @@ def merge_pores(network, pores, labels=['merged'], include_neighbors=True):
         pores = [pores]
 
     N = len(pores)
-    NBs, XYZs = [], []
-
-    for Ps in pores:
-        temp = network.find_neighbor_pores(pores=Ps,
-                                           mode='union',
-                                           flatten=True,
-                                           include_input=False)
-        NBs.append(temp)
-        if len(Ps) == 2:
-            XYZs.append(np.mean(network["pore.coords"][Ps], axis=0))
-        else:
-            if include_neighbors:
-                points = np.concatenate((temp, Ps))
-            else:
-                points = Ps
-            XYZs.append(hull_centroid(network["pore.coords"][points]))
-
-    extend(network, pore_coords=XYZs, labels=labels)
-    Pnew = network.Ps[-N::]
+    sizes = np.array([np.size(Ps) for Ps in pores], dtype=np.int64)
+    group = np.repeat(np.arange(N), sizes)
+    members = np.concatenate(pores).astype(np.int64)
+    Np = network.Np
+
+    # Find the neighbors of each group, excluding the group itself, sorted
+    # by group then pore
+    am = network.get_adjacency_matrix(fmt='csr')
+    starts = am.indptr[members]
+    counts = am.indptr[members + 1] - starts
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    nb_keys = np.repeat(group, counts)*Np \
+        + am.indices[offsets + np.arange(counts.sum())]
+    nb_keys = np.unique(nb_keys)
+    nb_keys = nb_keys[~np.isin(nb_keys, group*Np + members)]
+    nb_group, nb_pores = np.divmod(nb_keys, Np)
+    nb_indptr = np.zeros(N + 1, dtype=np.int64)
+    np.cumsum(np.bincount(nb_group, minlength=N), out=nb_indptr[1:])
+
+    # Find the location of each new pore
+    coords = network["pore.coords"]
+    XYZs = np.zeros((N, 3))
+    ends = np.cumsum(sizes)
+    pairs = np.where(sizes == 2)[0]
+    XYZs[pairs] = (coords[members[ends[pairs] - 2]]
+                   + coords[members[ends[pairs] - 1]])/2
+    for i in np.where(sizes != 2)[0]:
+        points = members[ends[i] - sizes[i]:ends[i]]
+        if include_neighbors:
+            temp = nb_pores[nb_indptr[i]:nb_indptr[i+1]]
+            points = np.concatenate((temp, points))
+        XYZs[i] = hull_centroid(coords[points])
 
     # Possible throats between new pores: This only happens when running in
-    # batch mode, i.e. multiple groups of pores are to be merged. In case
-    # some of these groups share elements, possible throats between the
-    # intersecting elements is not captured and must be added manually.
-    pores_set = [set(items) for items in pores]
-    NBs_set = [set(items) for items in NBs]
-    ps1, ps2 = [], []
-    from itertools import combinations
-    for i, j in combinations(range(N), 2):
-        if not NBs_set[i].isdisjoint(pores_set[j]):
-            ps1.append([network.Ps[-N+i]])
-            ps2.append([network.Ps[-N+j]])
-
-    # Add (possible) connections between the new pores
-    connect_pores(network, pores1=ps1, pores2=ps2, labels=labels)
-    # Add connections between the new pores and the rest of the network
-    connect_pores(network, pores2=np.split(Pnew, N), pores1=NBs, labels=labels)
-    # Trim merged pores from the network
-    trim(network=network, pores=np.concatenate(pores))
+    # batch mode, i.e. multiple groups of pores are to be merged. Group i is
+    # connected to a later group j if any neighbor of i is a member of j,
+    # found by joining the neighbors with the members sorted by pore.
+    order = np.argsort(members, kind='stable')
+    lo = np.searchsorted(members[order], nb_pores, side='left')
+    hits = np.searchsorted(members[order], nb_pores, side='right') - lo
+    offsets = np.repeat(lo - np.cumsum(hits) + hits, hits)
+    gi = np.repeat(nb_group, hits)
+    gj = group[order][offsets + np.arange(hits.sum())]
+    pair_keys = np.unique(gi[gi < gj]*N + gj[gi < gj])
+
+    with network.transaction() as edits:
+        Pnew = np.arange(edits.Np, edits.Np + N)
+        extend(network, pore_coords=XYZs, labels=labels)
+        # Add (possible) connections between the new pores
+        gi, gj = np.divmod(pair_keys, N)
+        conns = np.vstack((Pnew[gi], Pnew[gj])).T
+        extend(network, throat_conns=conns, labels=labels)
+        # Add connections between the new pores and the rest of the network
+        conns = np.vstack((nb_pores, Pnew[nb_group])).T
+        extend(network, throat_conns=conns, labels=labels)
+        # Trim merged pores from the network
+        trim(network=network, pores=members)
 
 
 def hull_centroid(points):
@@ -883,8 +809,8 @@ def hull_centroid(points):
 def add_boundary_pores(network, pores, offset=None, move_to=None,
                        apply_label='boundary'):
     r"""
-    This method uses ``clone_pores`` to clone the input pores, then shifts
-    them the specified amount and direction, then applies the given label.
+    This method clones the input pores, shifts them the specified amount
+    and direction, then applies the given label.
 
     Parameters
     ----------
@@ -907,32 +833,28 @@ def add_boundary_pores(network, pores, offset=None, move_to=None,
     """
     # Parse the input pores
     Ps = np.array(pores, ndmin=1)
-    if Ps.dtype is bool:
-        Ps = network.to_indices(Ps)
+    if Ps.dtype == bool:
+        Ps = np.where(Ps)[0]
     if np.size(pores) == 0:  # Handle an empty array if given
         return np.array([], dtype=np.int64)
-    # Clone the specifed pores
-    clone_pores(network=network, pores=Ps)
-    newPs = network.pores('pore.clone')
-    del network['pore.clone']
-    newTs = network.throats('clone')
-    del network['throat.clone']
+    # Find the locations of the boundary pores
+    coords = network['pore.coords'][Ps]
     if offset is not None:  # Offset the cloned pores
-        network['pore.coords'][newPs] += offset
+        coords = coords + offset
     if move_to is not None:  # Move the cloned pores
         for i, d in enumerate(move_to):
             if d is not None:
-                temp = network['pore.coords'][newPs]
-                temp[:, i] = d
-                network['pore.coords'][newPs] = temp
+                coords[:, i] = d
     # Apply labels to boundary pores (trim leading 'pores' if present)
     label = apply_label.split('.', 1)[-1]
-    plabel = 'pore.' + label
-    tlabel = 'throat.' + label
-    network[plabel] = False
-    network[plabel][newPs] = True
-    network[tlabel] = False
-    network[tlabel][newTs] = True
+    with network.transaction() as edits:
+        network['pore.' + label] = False
+        network['throat.' + label] = False
+        # Add the boundary pores, each connected to the pore it was cloned
+        # from
+        newPs = np.arange(edits.Np, edits.Np + Ps.size)
+        extend(network=network, coords=coords,
+               conns=np.vstack((Ps, newPs)).T, labels=label)
 
 
 def iscoplanar(coords):
@@ -1009,18 +931,21 @@ def is_fully_connected(network, pores_BC=None):
         ``pores_BC`` is given, then returns ``True`` only if all clusters
         are connected to the given boundary condition pores.
 
+    Notes
+    -----
+    The clusters are found once from the neighbor index of the network and
+    reused until the topology changes, and the result for the last set of
+    ``pores_BC`` is kept, so repeated checks (e.g. on every run of a
+    transport algorithm) are nearly free.
+
     """
-    am = network.get_adjacency_matrix(fmt='lil').copy()
-    temp = csgraph.connected_components(am, directed=False)[1]
-    is_connected = np.unique(temp).size == 1
+    topo = network._get_topology()
+    N, labels = topo.clusters()
+    is_connected = N == 1
     # Ensure all clusters are part of pores, if given
     if not is_connected and pores_BC is not None:
-        am.resize(network.Np + 1, network.Np + 1)
         pores_BC = network._parse_indices(pores_BC)
-        am.rows[-1] = pores_BC.tolist()
-        am.data[-1] = np.arange(network.Nt, network.Nt + len(pores_BC)).tolist()
-        temp = csgraph.connected_components(am, directed=False)[1]
-        is_connected = np.unique(temp).size == 1
+        is_connected = topo.spans_clusters(pores_BC)
     return is_connected
 
 
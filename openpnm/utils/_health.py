@@ -1,10 +1,17 @@
+import time
+from collections import namedtuple
+
 import numpy as np
+import scipy.sparse as sprs
+from numba import njit
+from scipy.sparse import csgraph
 from openpnm.utils import HealthDict
 
 
 __all__ = [
     'check_data_health',
     'check_network_health',
+    'network_health_report',
 ]
 
 
@@ -66,33 +73,133 @@ def check_network_health(network):
     - This is just a 'check' and does not 'fix' the problems it finds
 
     """
-    import openpnm.models.network as mods
-
+    report = network_health_report(network)
     health = HealthDict()
+    for k, v in report.health.items():
+        health[k] = v.tolist()
+    return health
 
-    # Check for headless throats
-    headless = mods.headless_throats(network)
-    health['headless_throats'] = np.where(headless)[0].tolist()
 
-    # Check for throats that loop back onto the same pore
-    looped = mods.looped_throats(network)
-    health['looped_throats'] = np.where(looped)[0].tolist()
+def network_health_report(network):
+    r"""
+    Checks the topological health of the network in a single pass over the
+    throat connections
 
-    # Check for individual isolated pores
-    isolated = mods.isolated_pores(network)
-    health['isolated_pores'] = np.where(isolated)[0].tolist()
+    Parameters
+    ----------
+    network : Network
+        The network to check
 
-    # Check for separated clusters of pores
-    size = mods.cluster_size(network)
-    mx = np.max(size)
-    health['disconnected_pores'] = np.where(size < mx)[0].tolist()
+    Returns
+    -------
+    report : namedtuple
+        A namedtuple with the following attributes:
+
+        ================ ====================================================
+        Attribute        Description
+        ================ ====================================================
+        health           A ``HealthDict`` with the same keys as
+                         ``check_network_health``, but with the offending
+                         pore or throat indices as arrays
+        cluster_number   The cluster number of each pore
+        timings          A dict with the time in seconds spent scanning the
+                         throats ('throats') and finding the clusters
+                         ('clusters')
+        ================ ====================================================
 
-    # Check for duplicate throats
-    dupes = mods.duplicate_throats(network)
-    health['duplicate_throats'] = np.where(dupes)[0].tolist()
+    Notes
+    -----
+    The checks are the same as those of the separate functions in
+    ``openpnm.models.network``, but the looped, headless, bidirectional
+    and duplicate throats and the coordination of each pore are found in
+    one compiled scan of 'throat.conns', without pandas, followed by one
+    call to ``connected_components``. Throats are grouped by their first
+    pore in linear time, so duplicates are found without sorting, which
+    makes it suitable for very large networks. Headless throats are left
+    out when finding clusters, rather than causing an error.
+
+    Examples
+    --------
+    >>> import openpnm as op
+    >>> pn = op.network.Cubic(shape=[3, 3, 3])
+    >>> op.topotools.trim(network=pn, throats=pn.find_neighbor_throats(0))
+    >>> report = op.utils.network_health_report(pn)
+    >>> print(report.health['isolated_pores'])
+    [0]
+    >>> print(report.health.health)
+    False
 
-    # Check for bidirectional throats
-    bidir = mods.bidirectional_throats(network)
-    health['bidirectional_throats'] = np.where(bidir)[0].tolist()
+    """
+    conns = network['throat.conns']
+    Np = network.Np
+    t0 = time.perf_counter()
+    flags, degree, indptr, indices = _scan_conns(conns, Np)
+    t1 = time.perf_counter()
+    am = sprs.csr_matrix((np.ones(indices.size), indices, indptr),
+                         shape=(Np, Np))
+    _, cluster_num = csgraph.connected_components(am, directed=False)
+    size = np.bincount(cluster_num)[cluster_num]
+    t2 = time.perf_counter()
 
-    return health
+    health = HealthDict()
+    health['headless_throats'] = np.where(flags & 1)[0]
+    health['looped_throats'] = np.where(flags & 2)[0]
+    health['isolated_pores'] = np.where(degree == 0)[0]
+    health['disconnected_pores'] = np.where(size < size.max())[0] \
+        if Np else np.array([], dtype=int)
+    health['duplicate_throats'] = np.where(flags & 8)[0]
+    health['bidirectional_throats'] = np.where(flags & 4)[0]
+    timings = {'throats': t1 - t0, 'clusters': t2 - t1}
+    tup = namedtuple('health_report', ('health', 'cluster_number',
+                                       'timings'))
+    return tup(health, cluster_num, timings)
+
+
+@njit
+def _scan_conns(conns, Np):  # pragma: no cover
+    # Flags are 1 for headless, 2 for looped, 4 for bidirectional and 8 for
+    # duplicate throats. Valid throats are grouped by their first pore in
+    # their original order, so a repeat of (i, j) is found by marking each j
+    # while scanning the throats of pore i.
+    Nt = conns.shape[0]
+    flags = np.zeros(Nt, dtype=np.uint8)
+    degree = np.zeros(Np, dtype=np.int64)
+    indptr = np.zeros(Np + 1, dtype=np.int64)
+    for t in range(Nt):
+        i, j = conns[t, 0], conns[t, 1]
+        if (i < 0) or (j < 0) or (i >= Np) or (j >= Np):
+            flags[t] = 1
+            # A pore on a headless throat is still not isolated
+            if (i >= 0) and (i < Np):
+                degree[i] += 1
+            if (j >= 0) and (j < Np):
+                degree[j] += 1
+            continue
+        if i == j:
+            flags[t] |= 2
+        elif i > j:
+            flags[t] |= 4
+        degree[i] += 1
+        degree[j] += 1
+        indptr[i + 1] += 1
+    for i in range(Np):
+        indptr[i + 1] += indptr[i]
+    pos = indptr[:-1].copy()
+    indices = np.empty(indptr[Np], dtype=np.int64)
+    throats = np.empty(indptr[Np], dtype=np.int64)
+    for t in range(Nt):
+        if flags[t] & 1:
+            continue
+        i = conns[t, 0]
+        indices[pos[i]] = conns[t, 1]
+        throats[pos[i]] = t
+        pos[i] += 1
+    seen = -np.ones(Np, dtype=np.int64)
+    for i in range(Np):
+        for k in range(indptr[i], indptr[i + 1]):
+            j = indices[k]
+            if seen[j] == i:
+                flags[throats[k]] |= 8
+            else:
+                seen[j] = i
+    return flags, degree, indptr, indices
@@ -2,6 +2,7 @@ import logging
 import pickle
 import re
 import uuid
+import weakref
 from copy import deepcopy
 from datetime import datetime
 
@@ -71,8 +72,63 @@ class Project(list):
         self.settings['uuid'] = str(uuid.uuid4())
         self.settings['original_uuid'] = self.settings['uuid']
         super().__init__(*args, **kwargs)
+        for item in self:
+            self._attach(item)
         ws[self.settings['name']] = self
 
+    def _attach(self, obj):
+        # Give the object a direct reference back to this project so that
+        # obj.project does not need to scan the workspace
+        try:
+            obj._project_ref = weakref.ref(self)
+        except (AttributeError, TypeError):
+            pass
+
+    def _detach(self, obj):
+        ref = getattr(obj, '_project_ref', None)
+        if (ref is not None) and (ref() is self) and not any(o is obj for o in self):
+            obj._project_ref = None
+
+    def append(self, obj):
+        super().append(obj)
+        self._attach(obj)
+
+    def extend(self, objs):
+        objs = list(objs)
+        super().extend(objs)
+        for obj in objs:
+            self._attach(obj)
+
+    def insert(self, index, obj):
+        super().insert(index, obj)
+        self._attach(obj)
+
+    def remove(self, obj):
+        super().remove(obj)
+        self._detach(obj)
+
+    def pop(self, *args):
+        obj = super().pop(*args)
+        self._detach(obj)
+        return obj
+
+    def __delitem__(self, index):
+        objs = self[index] if isinstance(index, slice) else [self[index]]
+        super().__delitem__(index)
+        for obj in objs:
+            self._detach(obj)
+
+    def clear(self):
+        objs = list(self)
+        super().clear()
+        for obj in objs:
+            self._detach(obj)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_network_ref', None)
+        return state
+
     def __getitem__(self, key):
         try:
             return super().__getitem__(key)
@@ -162,8 +218,18 @@ class Project(list):
 
     @property
     def network(self):
+        # Use the cached network if it is still part of this project
+        ref = getattr(self, '_network_ref', None)
+        net = ref() if ref is not None else None
+        if net is not None:
+            owner = getattr(net, '_project_ref', None)
+            if (owner is not None) and (owner() is self) \
+                    and (('throat.conns' in net.keys())
+                         or ('pore.coords' in net.keys())):
+                return net
         for item in self:
             if ('throat.conns' in item.keys()) or ('pore.coords' in item.keys()):
+                self._network_ref = weakref.ref(item)
                 return item
 
     @property
@@ -0,0 +1,38 @@
+import time
+import numpy as np
+import openpnm as op
+
+
+# Look up the throats connecting many random pairs of pores, comparing the
+# vectorized search against the previous lookup through a DOK matrix
+np.random.seed(0)
+pn = op.network.Cubic(shape=[60, 60, 60])
+Ts = np.random.randint(0, pn.Nt, 1_000_000)
+P1, P2 = pn.conns[Ts].T
+P2[::2] = np.random.randint(0, pn.Np, P2[::2].size)  # Some unconnected
+pn.find_connecting_throat(P1[:10], P2[:10])  # Build the cached index
+
+t0 = time.perf_counter()
+am = pn.create_adjacency_matrix(weights=pn.Ts, fmt='dok')
+N = 100_000
+old = np.array([am.get(tuple(p), None) for p in zip(P1[:N], P2[:N])],
+               dtype=float)
+t_dok = time.perf_counter() - t0
+
+t0 = time.perf_counter()
+new = pn.find_connecting_throat(P1, P2)
+t_vec = time.perf_counter() - t0
+
+t0 = time.perf_counter()
+conns = pn.conns
+sk = op._skgraph.queries.find_connecting_edges(
+    np.vstack((P1, P2)).T, network={'edge.conns': conns,
+                                    'node.coords': pn.coords})
+t_sk = time.perf_counter() - t0
+
+assert np.allclose(old, new[:N], equal_nan=True)
+assert np.allclose(sk, new, equal_nan=True)
+print(f'Np: {pn.Np}, Nt: {pn.Nt}')
+print(f'DOK lookup of {N} pairs: {t_dok:.3f} s')
+print(f'Network.find_connecting_throat on {P1.size} pairs: {t_vec:.3f} s')
+print(f'find_connecting_edges on {P1.size} pairs: {t_sk:.3f} s')
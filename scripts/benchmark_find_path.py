@@ -0,0 +1,58 @@
+import sys
+import time
+import numpy as np
+import openpnm as op
+
+
+# Tortuosity style analysis: shortest paths between many pairs of pores
+np.random.seed(0)
+pn = op.network.Cubic(shape=[50, 50, 40])
+Ns = 20  # Number of distinct inlet pores
+inlets = np.random.choice(pn.pores('left'), Ns, replace=False)
+outlets = pn.pores('right')
+N = 100_000
+pairs = np.vstack((np.random.choice(inlets, N),
+                   np.random.choice(outlets, N))).T
+op.topotools.find_shortest_paths(pn, sources=[0], targets=[1])  # Compile
+
+t0 = time.perf_counter()
+paths = op.topotools.find_shortest_paths(pn, sources=pairs[:, 0],
+                                         targets=pairs[:, 1])
+t_ragged = time.perf_counter() - t0
+L = np.diff(paths.node_indptr)
+
+t0 = time.perf_counter()
+d = op.topotools.find_path(pn, pore_pairs=pairs)
+t_lists = time.perf_counter() - t0
+
+t0 = time.perf_counter()
+one = op.topotools.find_shortest_paths(pn, sources=inlets[:2])
+t_all = time.perf_counter() - t0
+
+print(f'Np: {pn.Np}, Nt: {pn.Nt}, pairs: {N}, sources: {Ns}')
+print(f'find_shortest_paths (ragged arrays): {t_ragged:.3f} s')
+print(f'find_path (lists of arrays): {t_lists:.3f} s')
+print(f'One-to-all paths from 2 sources: {t_all:.3f} s')
+print(f'Mean path length: {L.mean():.1f} pores')
+if '--old' in sys.argv:
+    # The previous implementation traced each path in Python and looked up
+    # the edges through a DOK matrix, only time a subset of the pairs
+    from scipy.sparse import csgraph
+    M = 2000
+    t0 = time.perf_counter()
+    am = pn.create_adjacency_matrix(fmt='coo', triu=False)
+    pred = csgraph.dijkstra(am, indices=pairs[:M, 0],
+                            return_predecessors=True)[1]
+    am.data = np.hstack(2*[np.arange(am.data.size/2)]).astype(int)
+    dok = am.todok()
+    for row in range(M):
+        j = pairs[row][1]
+        ans = []
+        while pred[row][j] > -9999:
+            ans.append(j)
+            j = pred[row][j]
+        ans.append(pairs[row][0])
+        ans.reverse()
+        [dok[(ans[i], ans[i+1])] for i in range(len(ans)-1)]
+    t_old = time.perf_counter() - t0
+    print(f'Previous approach on {M} pairs: {t_old:.3f} s')
@@ -0,0 +1,42 @@
+import timeit
+import numpy as np
+import openpnm as op
+
+
+# Micro-benchmarks of dictionary access on networks and phases, covering
+# the different styles of keys that pore-scale models use
+pn = op.network.Cubic(shape=[20, 20, 20])
+pn.add_model_collection(op.models.collections.geometry.spheres_and_cylinders)
+pn.regenerate_models()
+pn['pore.domain1'] = pn.coords[:, 0] < pn.coords[:, 0].mean()
+pn['param.foo'] = 1.0
+water = op.phase.Water(network=pn)
+water['pore.nested.a'] = 1.0
+water['pore.nested.b'] = 2.0
+water['param.foo'] = 1.0
+vals = np.random.rand(pn.Np)
+
+cases = {
+    'network get plain': lambda: pn['pore.diameter'],
+    'network get @domain': lambda: pn['pore.diameter@domain1'],
+    'network get param': lambda: pn['param.foo'],
+    'phase get plain': lambda: water['pore.viscosity'],
+    'phase get from network': lambda: water['pore.diameter'],
+    'phase get @domain': lambda: water['pore.viscosity@domain1'],
+    'phase get nested dict': lambda: water['pore.nested'],
+    'phase get param': lambda: water['param.foo'],
+    'phase Np': lambda: water.Np,
+    'network set array': lambda: pn.__setitem__('pore.bar', vals),
+    'network set scalar': lambda: pn.__setitem__('pore.bar', 1.0),
+    'network set @domain': lambda: pn.__setitem__('pore.bar@domain1', 2.0),
+    'phase set array': lambda: water.__setitem__('pore.bar', vals),
+    'phase set scalar': lambda: water.__setitem__('pore.bar', 1.0),
+    'phase set nested dict': lambda: water.__setitem__('pore.nested',
+                                                       {'a': 1.0, 'b': 2.0}),
+    'phase set param': lambda: water.__setitem__('param.foo', 2.0),
+}
+
+N = 20000
+for name, func in cases.items():
+    t = min(timeit.repeat(func, number=N, repeat=3))/N
+    print(f'{name:<28s} {1e6*t:8.2f} us')
@@ -0,0 +1,24 @@
+import time
+import numpy as np
+import openpnm as op
+
+
+# The check done at the start of every run of a transport algorithm, on a
+# network with an isolated cluster so the boundary pores must be checked
+pn = op.network.Cubic(shape=[100, 100, 100])
+Ts = pn.find_neighbor_throats(pores=pn.Ps[:10])
+op.topotools.trim(network=pn, throats=Ts)
+BCs = np.zeros(pn.Np, dtype=bool)
+BCs[pn.pores(['left', 'right'])] = True
+BCs[:10] = True
+print(f'Np: {pn.Np}, Nt: {pn.Nt}')
+
+times = []
+for i in range(5):
+    t0 = time.perf_counter()
+    flag = op.topotools.is_fully_connected(network=pn, pores_BC=BCs)
+    times.append(time.perf_counter() - t0)
+
+print(f'Connected to BCs: {flag}')
+print(f'First call: {times[0]:.4f} s')
+print(f'Repeated calls (mean): {np.mean(times[1:]):.4f} s')
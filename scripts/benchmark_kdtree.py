@@ -0,0 +1,32 @@
+import time
+import numpy as np
+import openpnm as op
+
+
+# Repeated spatial queries on a large network reuse the cached kd-tree
+np.random.seed(0)
+pn = op.network.Cubic(shape=[100, 100, 50])
+pn['pore.coords'] = pn['pore.coords'] + np.random.rand(pn.Np, 3)*0.2
+Ps = np.random.choice(pn.Ps, 100, replace=False)
+
+t0 = time.perf_counter()
+for P in Ps:
+    pn.find_nearby_pores(pores=P, r=1.5)
+t_single = time.perf_counter() - t0
+
+t0 = time.perf_counter()
+hits = pn.find_nearby_pores(pores=pn.Ps, r=1.5, include_input=True,
+                            ragged=True, workers=-1)
+t_all = time.perf_counter() - t0
+
+t0 = time.perf_counter()
+for i in range(5):
+    op.models.network.count_coincident_pores(pn)
+    op.models.network.distance_to_nearest_pore(pn)
+t_health = time.perf_counter() - t0
+
+print(f'Np: {pn.Np}, Nt: {pn.Nt}')
+print(f'find_nearby_pores, 100 single pore calls: {t_single:.3f} s')
+print(f'find_nearby_pores, all pores at once (ragged): {t_all:.3f} s, '
+      f'{hits.indices.size} hits')
+print(f'5 x coincident and nearest pore checks: {t_health:.3f} s')
@@ -0,0 +1,20 @@
+import time
+import numpy as np
+import openpnm as op
+
+
+# Merge 50k neighboring pairs of pores in a cubic network, as after
+# extraction when many small clusters are combined into single pores
+pn = op.network.Cubic(shape=[100, 100, 10])
+x, y, z = np.unravel_index(pn.Ps, [100, 100, 10])
+P1 = pn.Ps[x % 2 == 0]
+P2 = np.ravel_multi_index((x[P1] + 1, y[P1], z[P1]), [100, 100, 10])
+groups = np.vstack((P1, P2)).T
+print(f'Np: {pn.Np}, Nt: {pn.Nt}, groups: {len(groups)}')
+
+t0 = time.perf_counter()
+op.topotools.merge_pores(network=pn, pores=groups)
+t_merge = time.perf_counter() - t0
+
+print(f'Np after: {pn.Np}, Nt after: {pn.Nt}')
+print(f'merge_pores: {t_merge:.3f} s')
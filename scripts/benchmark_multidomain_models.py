@@ -0,0 +1,37 @@
+import time
+import numpy as np
+import openpnm as op
+
+
+# A network split into 50 slabs, with the same models assigned to each slab
+# as would happen when a collection is applied domain by domain
+n_domains = 50
+pn = op.network.Cubic(shape=[50, 50, 50])
+x = pn.coords[:, 0]
+edges = np.linspace(x.min(), x.max() + 1e-12, n_domains + 1)
+for i in range(n_domains):
+    Ps = np.where((x >= edges[i])*(x < edges[i+1]))[0]
+    Ts = pn.find_neighbor_throats(pores=Ps, mode='xnor')
+    pn.set_label(label=f'slab_{i}', pores=Ps, throats=Ts)
+
+f = op.models.collections.geometry.spheres_and_cylinders
+for i in range(n_domains):
+    pn.add_model_collection(f, domain=f'slab_{i}')
+pn.regenerate_models()
+
+t0 = time.perf_counter()
+pn.regenerate_models()
+t_grouped = time.perf_counter() - t0
+
+# The same models run one domain at a time
+t0 = time.perf_counter()
+for item in pn.models.dependency_list():
+    for key in pn.models.keys():
+        if key.startswith(item + '@'):
+            pn.run_model(key)
+t_separate = time.perf_counter() - t0
+
+print(f'Np: {pn.Np}, Nt: {pn.Nt}, domains: {n_domains}, '
+      f'models: {len(pn.models)}')
+print(f'One call per domain: {t_separate:.3f} s')
+print(f'Grouped domains: {t_grouped:.3f} s')
@@ -0,0 +1,22 @@
+import time
+import numpy as np
+import openpnm as op
+
+
+# Check the health of a large network with a few defects added
+np.random.seed(0)
+pn = op.network.Cubic(shape=[150, 150, 150])
+conns = pn['throat.conns']
+Ts = np.random.choice(pn.Nt, 1000, replace=False)
+pn['throat.conns'] = np.vstack((conns, conns[Ts]))  # Duplicates
+print(f'Np: {pn.Np}, Nt: {pn.Nt}')
+
+op.utils.network_health_report(pn)  # First call compiles the numba kernel
+t0 = time.perf_counter()
+report = op.utils.network_health_report(pn)
+t_report = time.perf_counter() - t0
+
+print(f'network_health_report: {t_report:.3f} s')
+for k, v in report.timings.items():
+    print(f'  {k}: {v:.3f} s')
+print(f"  duplicate throats found: {report.health['duplicate_throats'].size}")
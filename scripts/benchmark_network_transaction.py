@@ -0,0 +1,44 @@
+import time
+import openpnm as op
+
+
+# Stitches many small blocks onto a network, with several phases present,
+# one at a time and then as a single transaction
+def build():
+    op.Workspace().clear()
+    pn = op.network.Cubic(shape=[40, 40, 40])
+    pn.add_model_collection(op.models.collections.geometry.spheres_and_cylinders)
+    pn.regenerate_models()
+    for _ in range(3):
+        op.phase.Water(network=pn)
+    blocks = []
+    for i in range(20):
+        d = op.network.Cubic(shape=[4, 4, 4])
+        d['pore.coords'] += [i*4, 0, 40]
+        blocks.append(d)
+    return pn, blocks
+
+
+def stitch_all(pn, blocks):
+    top = pn.pores('top')
+    for d in blocks:
+        op.topotools.stitch(pn, d, P_network=top, P_donor=d.pores('bottom'),
+                            method='radius', len_max=1.0)
+
+
+pn, blocks = build()
+t0 = time.perf_counter()
+stitch_all(pn, blocks)
+t_loop = time.perf_counter() - t0
+Np, Nt = pn.Np, pn.Nt
+
+pn, blocks = build()
+t0 = time.perf_counter()
+with pn.transaction():
+    stitch_all(pn, blocks)
+t_tx = time.perf_counter() - t0
+assert (pn.Np, pn.Nt) == (Np, Nt)
+
+print(f'Np: {Np}, Nt: {Nt}')
+print(f'Stitching one at a time: {t_loop:.3f} s')
+print(f'Stitching in a transaction: {t_tx:.3f} s')
@@ -0,0 +1,40 @@
+import time
+import openpnm as op
+
+
+# Time attribute lookups that used to scan every object in the workspace,
+# while the number of open projects grows
+ws = op.Workspace()
+N = 2000
+for n_projects in [1, 10, 100, 500]:
+    ws.clear()
+    for i in range(n_projects):
+        pn = op.network.Demo(shape=[3, 3, 1])
+        air = op.phase.Air(network=pn)
+    model = air.models['pore.density@all']
+
+    t0 = time.perf_counter()
+    for _ in range(N):
+        air.project
+    t_project = (time.perf_counter() - t0)/N
+
+    t0 = time.perf_counter()
+    for _ in range(N):
+        air.network
+    t_network = (time.perf_counter() - t0)/N
+
+    t0 = time.perf_counter()
+    for _ in range(N):
+        model.target
+    t_target = (time.perf_counter() - t0)/N
+
+    t0 = time.perf_counter()
+    for _ in range(N):
+        model.name
+    t_name = (time.perf_counter() - t0)/N
+
+    print(f'{n_projects:>4d} projects: '
+          f'project {1e6*t_project:.2f} us, '
+          f'network {1e6*t_network:.2f} us, '
+          f'model.target {1e6*t_target:.2f} us, '
+          f'model.name {1e6*t_name:.2f} us')
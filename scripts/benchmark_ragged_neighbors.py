@@ -0,0 +1,41 @@
+import time
+import numpy as np
+import openpnm as op
+from openpnm._skgraph import queries
+
+
+# Neighbors of every pore, as a ragged array and as a list of arrays
+pn = op.network.Cubic(shape=[50, 50, 40])
+Ps = pn.Ps
+pn.find_neighbor_pores(pores=[0])  # Build the cached index
+
+t0 = time.perf_counter()
+r = pn.find_neighbor_pores(pores=Ps, ragged=True, include_input=True)
+t_ragged = time.perf_counter() - t0
+
+t0 = time.perf_counter()
+a = pn.find_neighbor_pores(pores=Ps, flatten=False, include_input=True)
+t_list = time.perf_counter() - t0
+
+t0 = time.perf_counter()
+rt = pn.find_neighbor_throats(pores=Ps, ragged=True)
+t_throats = time.perf_counter() - t0
+
+t0 = time.perf_counter()
+rs = queries.find_neighbor_nodes(pn, Ps, include_input=True, ragged=True)
+t_sk = time.perf_counter() - t0
+
+# The per-pore loop used previously
+t0 = time.perf_counter()
+am = pn.get_adjacency_matrix(fmt='lil')
+rows = [np.array(am.rows[i], dtype=np.int64) for i in Ps]
+t_loop = time.perf_counter() - t0
+
+assert np.all(r.indices == np.hstack(rows))
+assert np.all(rs.indices == r.indices)
+print(f'Np: {pn.Np}, Nt: {pn.Nt}')
+print(f'find_neighbor_pores, ragged: {t_ragged:.3f} s')
+print(f'find_neighbor_pores, list of views: {t_list:.3f} s')
+print(f'find_neighbor_throats, ragged: {t_throats:.3f} s')
+print(f'find_neighbor_nodes, ragged: {t_sk:.3f} s')
+print(f'Per-pore Python loop: {t_loop:.3f} s')
@@ -0,0 +1,34 @@
+import time
+import numpy as np
+import openpnm as op
+
+
+# Repeated neighbor queries and matrix builds on a fixed topology, as done
+# inside algorithms and pore-scale models
+pn = op.network.Cubic(shape=[60, 60, 60])
+pn['throat.g'] = np.random.rand(pn.Nt)
+Ps = np.random.randint(0, pn.Np, 1000)
+
+
+def timeit(f, n=10):
+    f()  # The first call builds the index
+    t0 = time.perf_counter()
+    for _ in range(n):
+        f()
+    return (time.perf_counter() - t0)/n
+
+
+print(f'Np: {pn.Np}, Nt: {pn.Nt}')
+t = timeit(lambda: pn.create_adjacency_matrix(weights=pn['throat.g'],
+                                              fmt='csr'))
+print(f'create_adjacency_matrix (csr): {t*1e3:.1f} ms')
+t = timeit(lambda: pn.create_incidence_matrix(fmt='csr'))
+print(f'create_incidence_matrix (csr): {t*1e3:.1f} ms')
+t = timeit(lambda: pn.find_neighbor_pores(Ps))
+print(f'find_neighbor_pores (1000 pores): {t*1e3:.1f} ms')
+t = timeit(lambda: pn.find_neighbor_throats(Ps))
+print(f'find_neighbor_throats (1000 pores): {t*1e3:.1f} ms')
+t = timeit(lambda: pn.num_neighbors(Ps))
+print(f'num_neighbors (1000 pores): {t*1e3:.1f} ms')
+t = timeit(lambda: op.models.misc.from_neighbor_throats(pn, prop='throat.g'))
+print(f'from_neighbor_throats: {t*1e3:.1f} ms')
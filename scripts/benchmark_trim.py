@@ -0,0 +1,32 @@
+import time
+import numpy as np
+import openpnm as op
+
+
+# Trim a few thousand pores from a large network with several properties
+np.random.seed(0)
+pn = op.network.Cubic(shape=[100, 100, 100])
+for i in range(10):
+    pn[f'pore.prop_{i}'] = np.random.rand(pn.Np)
+    pn[f'throat.prop_{i}'] = np.random.rand(pn.Nt)
+water = op.phase.Phase(network=pn)
+for i in range(5):
+    water[f'pore.prop_{i}'] = np.random.rand(pn.Np)
+    water[f'throat.prop_{i}'] = np.random.rand(pn.Nt)
+pn.find_neighbor_pores(pores=0)  # Build the neighbor index
+
+times = []
+for workers in [1, 4]:
+    Ps = np.random.choice(pn.Ps, 5000, replace=False)
+    t0 = time.perf_counter()
+    op.topotools.trim(network=pn, pores=Ps, workers=workers)
+    t_trim = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    pn.find_neighbor_pores(pores=0)
+    t_query = time.perf_counter() - t0
+    times.append((workers, t_trim, t_query))
+
+print(f'Np: {pn.Np}, Nt: {pn.Nt}')
+for workers, t_trim, t_query in times:
+    print(f'trim with {workers} worker(s): {t_trim:.3f} s, '
+          f'first neighbor query after: {t_query:.4f} s')
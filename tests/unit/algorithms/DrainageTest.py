@@ -36,6 +36,77 @@ class DrainageTest:
         data = drn.pc_curve(np.linspace(0, 5000, 10))
         assert max(data[1]) < 1.0
 
+    def test_pccurve_matches_direct_summation(self):
+        drn = op.algorithms.Drainage(network=self.pn, phase=self.air)
+        drn.set_inlet_BC(pores=self.pn.pores('left'), mode='add')
+        drn.set_outlet_BC(pores=self.pn.pores('right'), mode='add')
+        drn.run()
+        pressures = np.linspace(0, 50000, 1000)
+        data = drn.pc_curve(pressures)
+        Vp = self.pn['pore.volume']
+        Vt = self.pn['throat.volume']
+        s = []
+        for p in pressures:
+            Snwp_p = drn['pore.invasion_pressure'] <= p
+            Snwp_t = drn['throat.invasion_pressure'] <= p
+            s.append(((Snwp_p*Vp).sum() + (Snwp_t*Vt).sum())/(Vp.sum() + Vt.sum()))
+        assert np.allclose(data.snwp, s)
+        assert np.all(data.pc == pressures)
+        data = drn.pc_curve(25)
+        assert len(data.pc) == 25
+        assert np.all(np.diff(data.snwp) >= 0)
+
+    def test_run_realizations(self):
+        drn = op.algorithms.Drainage(network=self.pn, phase=self.air)
+        drn.set_inlet_BC(pores=self.pn.pores('left'), mode='add')
+        pressures = np.logspace(3, 4.5, 30)
+        drn.run(pressures)
+        Pe = self.air['throat.entry_pressure']
+        np.random.seed(0)
+        Pes = np.vstack((Pe, Pe*np.random.rand(self.pn.Nt)))
+        res = drn.run_realizations(Pes, pressures=pressures, workers=2)
+        assert res.pore_invasion_pressure.shape == (2, self.pn.Np)
+        assert res.throat_invasion_sequence.shape == (2, self.pn.Nt)
+        assert np.all(res.pore_invasion_pressure[0]
+                      == drn['pore.invasion_pressure'])
+        assert np.all(res.throat_invasion_pressure[0]
+                      == drn['throat.invasion_pressure'])
+        assert np.all(res.pore_invasion_sequence[0]
+                      == drn['pore.invasion_sequence'])
+        assert np.allclose(res.snwp[0], drn.pc_curve(pressures).snwp)
+        # Second realization should match a regular run with those values
+        self.air['throat.entry_pressure'] = Pes[1]
+        drn.reset()
+        drn.run(pressures)
+        self.air.regenerate_models('throat.entry_pressure')
+        assert np.all(res.throat_invasion_pressure[1]
+                      == drn['throat.invasion_pressure'])
+        assert res.pc.shape == res.snwp.shape == (2, 30)
+
+    def test_find_percolation_threshold(self):
+        drn = op.algorithms.Drainage(network=self.pn, phase=self.air)
+        drn.set_inlet_BC(pores=self.pn.pores('left'), mode='add')
+        with pytest.raises(Exception):
+            drn.find_percolation_threshold()
+        drn.set_outlet_BC(pores=self.pn.pores('right'), mode='add')
+        Pc = drn.find_percolation_threshold()
+        Pe = self.air['throat.entry_pressure']
+        assert Pc in Pe
+        drn.run(pressures=[0.999*Pc, Pc])
+        outlets = self.pn.pores('right')
+        assert np.any(drn['pore.invasion_sequence'][outlets] == 1)
+        assert np.all(drn['pore.invasion_sequence'][outlets] != 0)
+
+    def test_find_percolation_threshold_isolated_pores(self):
+        pn = op.network.Cubic(shape=[5, 5, 1])
+        op.topotools.extend(network=pn, coords=[[9, 9, 9], [9, 9, 10]])
+        water = op.phase.Phase(network=pn)
+        water['throat.entry_pressure'] = 1.0
+        drn = op.algorithms.Drainage(network=pn, phase=water)
+        drn.set_inlet_BC(pores=pn.pores('left'))
+        drn.set_outlet_BC(pores=[pn.Np - 1])
+        assert drn.find_percolation_threshold() == np.inf
+
     def test_apply_trapping(self):
         drn = op.algorithms.Drainage(network=self.pn, phase=self.air)
         drn.set_inlet_BC(pores=self.pn.pores('left'), mode='add')
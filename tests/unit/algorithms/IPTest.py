@@ -60,6 +60,67 @@ class IPTest:
         assert_approx_equal(alg['pore.invasion_pressure'].max(), 1967.22314587)
         assert alg['pore.invasion_pressure'].min() == 0
 
+    def test_run_with_correction(self):
+        alg1 = op.algorithms.InvasionPercolation(network=self.net, phase=self.water)
+        alg1.set_inlet_BC(pores=self.net.pores("top"))
+        alg1.run()
+        # A uniform correction should shift pressures but not change the order
+        alg2 = op.algorithms.InvasionPercolation(network=self.net, phase=self.water)
+        alg2.set_inlet_BC(pores=self.net.pores("top"))
+        alg2.run(correction=100.0)
+        assert np.all(alg1['throat.invasion_sequence']
+                      == alg2['throat.invasion_sequence'])
+        assert np.allclose(alg1['throat.invasion_pressure'] + 100.0,
+                           alg2['throat.invasion_pressure'])
+        # A callable receives throat centers and gives the same as an array
+        z = self.net.coords[self.net.conns][:, :, 2].mean(axis=1)
+        alg3 = op.algorithms.InvasionPercolation(network=self.net, phase=self.water)
+        alg3.set_inlet_BC(pores=self.net.pores("bottom"))
+        alg3.run(correction=lambda xyz: 1e7*xyz[:, 2])
+        alg4 = op.algorithms.InvasionPercolation(network=self.net, phase=self.water)
+        alg4.set_inlet_BC(pores=self.net.pores("bottom"))
+        alg4.run(correction=1e7*z)
+        assert np.all(alg3['pore.invasion_sequence']
+                      == alg4['pore.invasion_sequence'])
+        # A strong gravity correction fills the column layer by layer
+        zp = self.net.coords[:, 2]
+        seq = alg3['pore.invasion_sequence']
+        layers = np.unique(zp)
+        for lo, hi in zip(layers[:-1], layers[1:]):
+            assert seq[zp == lo].max() < seq[zp == hi].min()
+        with pytest.raises(Exception):
+            alg4.run(correction=np.ones(3))
+
+    def test_run_realizations(self):
+        alg = op.algorithms.InvasionPercolation(network=self.net, phase=self.water)
+        alg.set_inlet_BC(pores=self.net.pores("top"))
+        alg.run()
+        Pe = self.water['throat.entry_pressure']
+        res = alg.run_realizations(np.vstack((Pe, Pe[::-1], Pe)))
+        assert res.pore_invasion_sequence.shape == (3, self.net.Np)
+        assert np.all(res.pore_invasion_sequence[0]
+                      == alg['pore.invasion_sequence'])
+        assert np.all(res.throat_invasion_sequence[2]
+                      == alg['throat.invasion_sequence'])
+        assert np.allclose(res.pore_invasion_pressure[0],
+                           alg['pore.invasion_pressure'])
+        assert not np.all(res.throat_invasion_sequence[1]
+                          == alg['throat.invasion_sequence'])
+        with pytest.raises(Exception):
+            alg.run_realizations(np.ones((2, 3)))
+
+    def test_find_percolation_threshold(self):
+        alg = op.algorithms.InvasionPercolation(network=self.net, phase=self.water)
+        alg.set_inlet_BC(pores=self.net.pores("top"))
+        alg.set_outlet_BC(pores=self.net.pores("bottom"))
+        Pc = alg.find_percolation_threshold()
+        alg.run()
+        # Breakthrough is the highest pressure met before an outlet is reached
+        seq = alg['throat.invasion_sequence']
+        Pe = alg['throat.invasion_pressure']
+        first = alg['pore.invasion_sequence'][self.net.pores("bottom")].min()
+        assert Pc == Pe[(seq > 0)*(seq <= first)].max()
+
     def test_trapping(self):
         alg = op.algorithms.InvasionPercolation(network=self.net, phase=self.water)
         alg.set_inlet_BC(pores=self.net.pores("top"))
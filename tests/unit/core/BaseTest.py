@@ -245,6 +245,126 @@ class BaseTest:
         with pytest.raises(Exception):
             self.net._count()
 
+    def test_count_on_phase_uses_network(self):
+        pn = op.network.Cubic([3, 3, 3])
+        air = op.phase.Phase(network=pn)
+        assert air._count('pore') == pn.Np
+        assert air._count('throat') == pn.Nt
+        assert air._count('foo') is None
+
+    def test_memory_policy(self):
+        import pickle
+        pn = op.network.Cubic([4, 4, 4])
+        pn['pore.diameter'] = np.random.rand(pn.Np)
+        Ps = pn.pores('left')
+        pn.settings['compact_conns'] = True
+        pn.settings['pack_labels'] = True
+        pn.settings['float32_props'].add('pore.diameter')
+        pn.apply_memory_policy()
+        assert pn['throat.conns'].dtype == np.int32
+        assert pn['pore.diameter'].dtype == np.float32
+        assert np.all(pn.pores('left') == Ps)
+        assert 'pore.left' in pn.labels()
+        # In-place changes survive even after the label is repacked
+        pn['pore.left'][0:2] = False
+        for label in pn.labels():
+            pn[label]
+        assert np.all(pn.pores('left') == Ps[2:])
+        pn2 = pickle.loads(pickle.dumps(pn))
+        assert np.all(pn2['pore.left'] == pn['pore.left'])
+        # A held reference still writes through after many other labels
+        # are read and after pickling
+        left = pn['pore.left']
+        for i in range(12):
+            pn[f'pore.label_{i}'] = False
+        for label in pn.labels():
+            pn[label]
+        pickle.dumps(pn)
+        left[:] = True
+        assert pn['pore.left'].sum() == pn.Np
+        # Only labels which are still referenced are kept unpacked
+        assert list(pn._unpacked.keys()) == ['pore.left']
+        del left
+        assert len(pn._unpacked) == 0
+        assert pn['pore.left'].sum() == pn.Np
+        pn['pore.left'] = False
+        pn['pore.left'][Ps[2:]] = True
+        # Turning packing off restores plain boolean arrays
+        pn.settings['pack_labels'] = False
+        pn.apply_memory_policy()
+        assert isinstance(dict.__getitem__(pn, 'pore.left'), np.ndarray)
+        assert np.all(pn.pores('left') == Ps[2:])
+
+    def test_memory_policy_kept_by_topology_edits(self):
+        pn = op.network.Cubic([3, 3, 3])
+        pn.settings['compact_conns'] = True
+        pn.settings['pack_labels'] = True
+        pn.apply_memory_policy()
+        op.topotools.trim(network=pn, pores=[0])
+        assert pn['throat.conns'].dtype == np.int32
+        op.topotools.extend(network=pn, coords=[[5, 5, 5]], conns=[[0, 26]])
+        assert pn['throat.conns'].dtype == np.int32
+        for key in ['pore.all', 'throat.all']:
+            assert not isinstance(dict.__getitem__(pn, key), np.ndarray)
+        assert pn['pore.all'].sum() == pn.Np == 27
+        assert pn['throat.all'].sum() == pn.Nt
+
+    def test_columnar_storage(self):
+        import pickle
+        pn = op.network.Cubic([4, 4, 4])
+        pn.settings['columnar'] = True
+        for i in range(8):
+            pn[f'pore.p{i}'] = np.arange(pn.Np, dtype=float) + i
+        keys, data = pn.get_column_block('pore')
+        assert np.shares_memory(pn['pore.p3'], data)
+        # Arrays already obtained still write through once the block is full
+        p3 = pn['pore.p3']
+        for i in range(8, 10):
+            pn[f'pore.p{i}'] = np.arange(pn.Np, dtype=float) + i
+        p3[0] = -1.0
+        assert pn['pore.p3'][0] == -1.0
+        pn['pore.p3'] = np.arange(pn.Np, dtype=float) + 3
+        pn['throat.t'] = 1.0
+        keys, data = pn.get_column_block('pore')
+        assert keys == [f'pore.p{i}' for i in range(10)]
+        assert np.all(data[3] == pn['pore.p3'])
+        # Non-float values leave the block
+        pn['pore.p0'] = 1
+        del pn['pore.p1']
+        keys, data = pn.get_column_block('pore')
+        assert keys == [f'pore.p{i}' for i in range(2, 10)]
+        assert pn['pore.p0'].dtype == int
+        held = pn['pore.p5']
+        op.topotools.trim(network=pn, pores=[0, 1])
+        assert np.all(pn['pore.p5'] == np.arange(2, 64) + 5)
+        keys, data = pn.get_column_block('pore')
+        assert np.shares_memory(pn['pore.p5'], data)
+        # The old block is not kept alive, and held arrays are unchanged
+        assert data.base is None or data.base.shape[1] == pn.Np
+        assert np.all(held == np.arange(64) + 5)
+        op.topotools.extend(network=pn, coords=[[9, 9, 9]])
+        assert np.isnan(pn['pore.p5'][-1])
+        assert pn['throat.t'].shape == (pn.Nt, )
+        pn2 = pickle.loads(pickle.dumps(pn))
+        keys, data = pn2.get_column_block('pore')
+        assert np.shares_memory(pn2['pore.p5'], data)
+        assert np.all(pn2['pore.p9'][:-1] == pn['pore.p9'][:-1])
+
+    def test_setitem_broadcast_and_length_check(self):
+        pn = op.network.Cubic([3, 3, 3])
+        pn['pore.int'] = 2
+        assert pn['pore.int'].shape == (pn.Np, )
+        assert pn['pore.int'].dtype == int
+        pn['throat.bool'] = [True]
+        assert pn['throat.bool'].dtype == bool
+        assert pn['throat.bool'].all()
+        with pytest.raises(Exception):
+            pn['pore.bad'] = np.ones(pn.Np + 1)
+        with pytest.raises(Exception):
+            pn['foo.bar'] = 1.0
+        # Non-string keys are returned directly
+        assert pn[1.0] == 1.0
+
     def test_num_pores(self):
         a = self.net.num_pores()
         assert a == 27
@@ -858,6 +978,44 @@ class BaseTest:
         pn.set_label(label='tester', mode='purge')
         # Should only issue warning
 
+    def test_label_queries_reflect_label_changes(self):
+        pn = op.network.Cubic(shape=[5, 5, 5])
+        Ps = pn.pores('left')
+        assert np.all(pn.pores('left') == Ps)
+        # Returned arrays are copies so callers can't corrupt the cache
+        Ps[0] = 100
+        assert pn.pores('left')[0] == 0
+        # In-place edits and reassignment are both picked up
+        pn['pore.left'][0] = False
+        assert pn.num_pores('left') == 24
+        assert 0 not in pn.pores('left')
+        pn['pore.left'] = True
+        assert pn.num_pores('left') == 125
+        pn.set_label(label='left', pores=[0], mode='overwrite')
+        assert np.all(pn.filter_by_label(pores=[0, 1], labels='left') == [0])
+        assert pn.pores('left', asmask=True).sum() == 1
+        # Default labels follow the number of pores
+        assert pn.num_pores('all') == 125
+        op.topotools.trim(network=pn, pores=[1, 2])
+        assert pn.num_pores('all') == 123
+        assert np.all(pn.pores(pn.name) == pn.Ps)
+
+    def test_label_queries_see_edits_through_held_arrays(self):
+        for packed in [False, True]:
+            pn = op.network.Cubic(shape=[5, 5, 5])
+            pn.settings['pack_labels'] = packed
+            pn.apply_memory_policy()
+            left = pn['pore.left']
+            assert pn.num_pores('left') == 25
+            left[:5] = False
+            assert pn.num_pores('left') == 20
+            assert np.all(pn.pores('left') == np.where(left)[0])
+            assert pn.num_pores(['left', 'right'], mode='or') == 45
+            left[:5] = True
+            assert pn.num_pores(['left', 'right'], mode='or') == 50
+            Ps = pn.filter_by_label(pores=[0, 1, 2], labels='left')
+            assert np.all(Ps == [0, 1, 2])
+
     def test_renaming_to_current_name_is_allowed(self):
         obj = op.core.Base2(name="temp")
         obj.name = "temp"
@@ -21,6 +21,13 @@ class ModelsTest:
         a = 'pore.diameter@all'
         assert a == self.net.models['pore.diameter@all'].name
 
+    def test_find_target_after_copy(self):
+        proj = self.net.project.copy()
+        net = proj.network
+        assert net.models._find_target() is net
+        assert net.models['pore.diameter@all'].target is net
+        assert self.net.models['pore.diameter@all'].target is self.net
+
     def test_propname(self):
         a = 'pore.diameter'
         assert a == self.net.models['pore.diameter@all'].propname
@@ -41,6 +48,164 @@ class ModelsTest:
         e = self.net['pore.diameter'].copy()
         assert not np.any(b == e)
 
+    def test_dependency_cache_invalidation(self):
+        pn = op.network.Demo([4, 4, 1])
+        a = pn.models.dependency_list()
+        assert pn.models.dependency_list() == a
+        assert 'pore.diameter' in pn.models.downstream('pore.seed')
+        pn.add_model(propname='pore.foo',
+                     model=op.models.misc.scaled,
+                     prop='pore.volume', factor=2.0)
+        b = pn.models.dependency_list()
+        assert b[-1] == 'pore.foo'
+        assert 'pore.foo' in pn.models.downstream('pore.seed')
+        # Rewiring a model's arguments should also refresh the cache
+        pn.models['pore.foo@all']['prop'] = 'pore.seed'
+        assert pn.models.dependency_graph().has_edge('pore.seed', 'pore.foo')
+        assert not pn.models.dependency_graph().has_edge('pore.volume',
+                                                         'pore.foo')
+        del pn.models['pore.foo@all']
+        assert pn.models.dependency_list() == a
+        assert 'pore.foo' not in pn.models.downstream('pore.seed')
+
+    def test_regenerate_changed_only(self):
+        pn = op.network.Demo([4, 4, 1])
+        pn.regenerate_models()
+        seen = {k: v._inputs_seen for k, v in pn.models.items()}
+        # Nothing has changed so nothing should be rerun
+        pn.regenerate_models(changed_only=True)
+        assert all(pn.models[k]._inputs_seen is seen[k] for k in seen)
+        # Changing the seed should rerun only its downstream models
+        v = pn['pore.volume'].copy()
+        pn['pore.seed'] = 0.5
+        pn.regenerate_models(changed_only=True)
+        assert np.allclose(pn['pore.diameter'], pn['pore.diameter'][0])
+        assert not np.allclose(pn['pore.volume'], v)
+        # The seed model itself has not changed so the new value is kept
+        downstream = set(pn.models.downstream('pore.seed')) - {'pore.seed'}
+        for k in seen:
+            rerun = pn.models[k]._inputs_seen is not seen[k]
+            assert rerun == (k.split('@')[0] in downstream)
+        # Changing a model's arguments marks it as stale
+        assert not pn._is_stale('pore.volume@all')
+        pn.models['pore.volume@all']['pore_diameter'] = 'pore.diameter'
+        assert pn._is_stale('pore.volume@all')
+
+    def test_lazy_models(self):
+        pn = op.network.Demo([4, 4, 1])
+        water = op.phase.Phase(network=pn)
+        water['pore.temperature'] = 300.0
+        water.add_model(propname='pore.foo',
+                        model=op.models.misc.scaled,
+                        prop='pore.temperature', factor=2.0,
+                        regen_mode='lazy')
+        water.add_model(propname='throat.foo',
+                        model=op.models.misc.from_neighbor_pores,
+                        prop='pore.foo', regen_mode='lazy')
+        water.add_model(propname='pore.bar',
+                        model=op.models.misc.scaled,
+                        prop='pore.temperature', factor=3.0,
+                        regen_mode='lazy')
+        assert 'throat.foo' not in water.keys()
+        assert 'pore.foo' not in water.keys()
+        # Requesting a property computes it along with its dependencies only
+        assert np.allclose(water['throat.foo'], 600.0)
+        assert 'pore.foo' in water.keys()
+        assert 'pore.bar' not in water.keys()
+        # Changes upstream are picked up on the next access
+        water['pore.temperature'] = 350.0
+        assert np.allclose(water['throat.foo'], 700.0)
+        assert np.allclose(water['throat.foo@all'], 700.0)
+        # Lazy models are skipped by regenerate_models
+        water.regenerate_models()
+        assert 'pore.bar' not in water.keys()
+
+    def test_lazy_and_normal_domains_of_one_property(self):
+        pn = op.network.Cubic([3, 3, 1])
+        water = op.phase.Phase(network=pn)
+        water['pore.temperature'] = 300.0
+        water.add_model(propname='pore.foo', domain='left',
+                        model=op.models.misc.scaled,
+                        prop='pore.temperature', factor=2.0,
+                        regen_mode='lazy')
+        water.add_model(propname='pore.foo', domain='right',
+                        model=op.models.misc.scaled,
+                        prop='pore.temperature', factor=3.0)
+        assert np.allclose(water['pore.foo@right'], 900.0)
+        water['pore.temperature'] = 400.0
+        water.regenerate_models()
+        assert np.allclose(water['pore.foo@right'], 1200.0)
+        assert np.allclose(water['pore.foo@left'], 800.0)
+
+    def test_lazy_model_resolves_missing_inputs(self):
+        pn = op.network.Cubic([3, 3, 1])
+        water = op.phase.Phase(network=pn)
+        water['pore.temperature'] = 300.0
+        water.add_model(propname='pore.foo',
+                        model=op.models.misc.scaled,
+                        prop='pore.temperature', factor=2.0,
+                        regen_mode='deferred')
+        water.add_model(propname='pore.bar',
+                        model=op.models.misc.scaled,
+                        prop='pore.foo', factor=2.0,
+                        regen_mode='lazy')
+        assert np.allclose(water['pore.bar'], 1200.0)
+        water.add_model(propname='pore.baz',
+                        model=op.models.misc.scaled,
+                        prop='pore.blah', regen_mode='lazy')
+        with pytest.raises(Exception, match='pore.blah'):
+            water['pore.baz']
+
+    def test_cached_signature(self):
+        pn = op.network.Demo([4, 4, 1])
+
+        def with_domain(target, domain):
+            return target[domain].sum()*np.ones(target[domain].sum())
+
+        pn.add_model(propname='pore.foo', model=op.models.misc.constant,
+                     value=2.0)
+        mod = pn.models['pore.foo@all']
+        assert mod._accepts_domain is False
+        pn.set_label(pores=[0, 1], label='corner')
+        mod['model'] = with_domain
+        assert mod._accepts_domain is True
+        del pn['pore.foo']
+        pn.add_model(propname='pore.foo@corner', model=with_domain)
+        assert np.all(pn['pore.foo@corner'] == 2)
+        assert np.isnan(pn['pore.foo'][2:]).all()
+
+    def test_run_model_grouped_domains(self):
+        pn = op.network.Cubic([6, 1, 1])
+        for i in range(3):
+            pn.set_label(label=f'd{i}', pores=[2*i, 2*i+1])
+        calls = []
+
+        def count(target, prop, factor):
+            calls.append(1)
+            return target[prop][:, 0]*factor
+
+        for i, f in enumerate([2.0, 2.0, 3.0]):
+            pn.add_model(propname='pore.foo', domain=f'd{i}', model=count,
+                         prop='pore.coords', factor=f, regen_mode='deferred')
+        groups = pn._group_domains('pore.foo', ['d0', 'd1', 'd2'])
+        assert groups == [['d0', 'd1'], ['d2']]
+        pn.run_model('pore.foo')
+        assert len(calls) == 2
+        x = pn.coords[:, 0]
+        assert np.allclose(pn['pore.foo'], x*np.array([2, 2, 2, 2, 3, 3]))
+        # Running a single domain still works
+        pn.run_model('pore.foo@d1')
+        assert len(calls) == 3
+
+    def test_downstream_matches_edge_dfs(self):
+        import networkx as nx
+        pn = op.network.Demo([4, 4, 1])
+        dg = nx.DiGraph(nx.edge_dfs(pn.models.dependency_graph(),
+                                    source=['pore.seed']))
+        a = list(nx.dag.lexicographical_topological_sort(dg))
+        assert pn.models.downstream(['pore.seed']) == a
+        assert pn.models.downstream('pore.foo') == []
+
 
 
 
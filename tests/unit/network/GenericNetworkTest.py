@@ -120,6 +120,27 @@ class NetworkTest:
                                            mode='exclusive_or')
         assert np.all(a == [0, 1, 2, 900, 902, 1800, 1802])
 
+    def test_find_neighbors_ragged(self):
+        r = self.net.find_neighbor_pores(pores=[0, 2, 0], ragged=True)
+        assert np.all(r.indptr == [0, 3, 7, 10])
+        assert np.all(r.indices == [1, 10, 100, 1, 3, 12, 102, 1, 10, 100])
+        a = self.net.find_neighbor_pores(pores=[0, 2, 0], flatten=False)
+        assert np.all(np.hstack(a) == r.indices)
+        r = self.net.find_neighbor_pores(pores=[0, 2], mode='xnor',
+                                         ragged=True)
+        assert np.all(r.indptr == [0, 1, 2])
+        assert np.all(r.indices == [1, 1])
+        r = self.net.find_neighbor_throats(pores=[0, 1], ragged=True)
+        assert np.all(r.indptr == [0, 3, 7])
+        assert np.all(r.indices == [0, 900, 1800, 0, 1, 901, 1801])
+        r = self.net.find_neighbor_throats(pores=[0, 1], mode='xor',
+                                           ragged=True)
+        assert np.all(r.indices == [900, 1800, 1, 901, 1801])
+        r = self.net.find_neighbor_throats(pores=[], ragged=True)
+        assert np.all(r.indptr == [0]) and r.indices.size == 0
+        with pytest.raises(Exception):
+            self.net.find_neighbor_pores(pores=[0], ragged=True, asmask=True)
+
     def test_num_neighbors_empty(self):
         a = self.net.num_neighbors(pores=[])
         assert np.size(a) == 0
@@ -203,6 +224,107 @@ class NetworkTest:
         assert len(am.keys()) == 48
         assert len(net._am) == 2
 
+    def test_matrices_updated_when_topology_reassigned(self):
+        net = op.network.Cubic([3, 3, 1])
+        am = net.get_adjacency_matrix(fmt='csr')
+        assert am.nnz == 24
+        assert net.num_neighbors(4) == [4]
+        # Reassigning conns clears the stored matrices and neighbor index
+        net['throat.conns'] = net['throat.conns'][:-2]
+        assert net.get_adjacency_matrix(fmt='csr').nnz == 20
+        assert net.get_incidence_matrix(fmt='csr').shape == (9, 10)
+        assert net.num_neighbors(4) == [3]
+        assert np.all(net.find_neighbor_throats(8) == [5])
+        # Reindexing through trim is also caught
+        op.topotools.trim(network=net, pores=[0])
+        assert net.get_adjacency_matrix(fmt='coo').shape == (8, 8)
+        assert np.all(net.find_neighbor_pores(0) == [1, 3])
+
+    def test_csr_matrices_match_coo(self):
+        net = op.network.Cubic([4, 3, 2])
+        w = np.random.rand(net.Nt)
+        am = net.create_adjacency_matrix(weights=w, fmt='csr')
+        assert am.has_canonical_format
+        assert np.allclose(am.toarray(),
+                           net.create_adjacency_matrix(weights=w).toarray())
+        w2 = np.random.rand(net.Nt, 2)
+        am = net.create_adjacency_matrix(weights=w2, fmt='csr')
+        assert np.allclose(am.toarray(),
+                           net.create_adjacency_matrix(weights=w2).toarray())
+        im = net.create_incidence_matrix(weights=w, fmt='csr')
+        assert np.allclose(im.toarray(),
+                           net.create_incidence_matrix(weights=w).toarray())
+        # Modifying a returned matrix leaves the index intact
+        im.indices[:] = 0
+        im = net.create_incidence_matrix(fmt='csr')
+        assert np.all(np.diff(im.indices[:im.indptr[1]]) > 0)
+
+    def test_find_connecting_throat_many_pairs(self):
+        net = op.network.Cubic([6, 5, 4])
+        np.random.seed(0)
+        Ts = np.random.randint(0, net.Nt, 500)
+        P1, P2 = net.conns[Ts].T
+        # Both orientations of each pair are found
+        assert np.all(net.find_connecting_throat(P1, P2) == Ts)
+        assert np.all(net.find_connecting_throat(P2, P1) == Ts)
+        a = net.find_connecting_throat([0, 0, 5], [1, 7, 4])
+        assert np.all(np.isnan(a) == [False, True, False])
+        am = net.get_adjacency_matrix(fmt='coo')
+        b = op._skgraph.queries.find_connecting_edges(
+            np.vstack((P2, P1)).T, am=am)
+        assert np.all(b == Ts)
+
+    def test_kdtree_cached_and_updated(self):
+        net = op.network.Cubic(shape=[5, 5, 5])
+        tree = net.get_kdtree()
+        assert net.get_kdtree() is tree
+        net['pore.coords'] = net['pore.coords'] + 10
+        assert net.get_kdtree() is not tree
+        hits = net.find_nearest_pores(coords=[[10.5, 10.5, 10.5]], k=1)
+        assert hits.pores[0, 0] == 0
+        op.topotools.trim(network=net, pores=[0])
+        hits = net.find_nearest_pores(coords=[[10.5, 10.5, 10.5]], k=3)
+        assert np.all(hits.distances == 1)
+        assert set(hits.pores[0]) == {0, 4, 24}
+
+    def test_find_nearby_pores_ragged(self):
+        net = op.network.Cubic(shape=[5, 5, 5])
+        Ps = [0, 1, 62]
+        a = net.find_nearby_pores(pores=Ps, r=1.5, flatten=False)
+        b = net.find_nearby_pores(pores=Ps, r=1.5, ragged=True, workers=-1)
+        assert np.all(b.indptr == np.cumsum([0] + [len(i) for i in a]))
+        assert np.all(b.indices == np.concatenate(a))
+        assert 1 not in b.indices
+        b = net.find_nearby_pores(pores=[], r=1.5, ragged=True)
+        assert np.all(b.indptr == [0])
+
+    def test_transaction(self):
+        net = op.network.Cubic(shape=[4, 4, 4])
+        air = op.phase.Air(network=net)
+        with net.transaction() as edits:
+            op.topotools.extend(network=net, coords=[[5, 5, 5]],
+                                conns=[[0, 64]], labels='new')
+            # Nested transactions join the outer one
+            with net.transaction():
+                op.topotools.extend(network=net, coords=[[6, 6, 6]],
+                                    conns=[[64, 65]], labels='new')
+            op.topotools.trim(network=net, pores=[1])
+            assert net.Np == 64
+            assert edits.Np == 66
+        assert net.Np == 65
+        assert net.Nt == 144 - 4 + 2
+        assert air.Np == 65
+        assert net.num_pores('new') == 2
+        assert net.num_throats('new') == 2
+        assert np.all(net.coords[net.pores('new')] == [[5, 5, 5], [6, 6, 6]])
+        # Edits are discarded if an exception is raised
+        with pytest.raises(Exception):
+            with net.transaction():
+                op.topotools.extend(network=net, coords=[[7, 7, 7]])
+                raise Exception('Abort')
+        assert net.Np == 65
+        assert net._edits is None
+
     def test_into(self):
         net = op.network.Demo([4, 4, 1])
         # This test is lame, but just to keep the code cov counter happy
@@ -120,6 +120,20 @@ class CheckNetworkHealthTest:
         a = op.utils.check_network_health(net)
         assert a['looped_throats'] == np.array([300])
 
+    def test_network_health_report(self):
+        net = op.network.Cubic(shape=[5, 5, 5])
+        extend(network=net, throat_conns=[[5, 5], net.conns[0]])
+        net['throat.conns'][1] = net['throat.conns'][1][::-1]
+        net['throat.conns'][2] = [5, 5555]
+        a = op.utils.network_health_report(net)
+        assert np.all(a.health['looped_throats'] == [300])
+        assert np.all(a.health['duplicate_throats'] == [301])
+        assert np.all(a.health['bidirectional_throats'] == [1])
+        assert np.all(a.health['headless_throats'] == [2])
+        assert np.size(a.health['disconnected_pores']) == 0
+        assert a.cluster_number.size == net.Np
+        assert set(a.timings.keys()) == {'throats', 'clusters'}
+
 
 if __name__ == '__main__':
 
@@ -199,6 +199,20 @@ class SKGRQueriesTest:
         c = queries.find_complementary_nodes(inds=[0, 2], network=g, asmask=True)
         assert np.all(c == np.array([False, True, False, True]))
 
+    def test_find_neighbors_ragged(self):
+        g = cubic(shape=[4, 4, 1])
+        r = queries.find_neighbor_nodes(network=g, inds=[0, 5], ragged=True)
+        assert np.all(r.indptr == [0, 2, 6])
+        assert np.all(r.indices == [1, 4, 1, 4, 6, 9])
+        r = queries.find_neighbor_nodes(network=g, inds=[0, 5], logic='and',
+                                        ragged=True)
+        assert np.all(r.indices == [1, 4, 1, 4])
+        r = queries.find_neighbor_edges(network=g, inds=[0, 1], ragged=True)
+        a = queries.find_neighbor_edges(network=g, inds=[0, 1],
+                                        flatten=False)
+        assert np.all(np.diff(r.indptr) == [len(i) for i in a])
+        assert np.all(r.indices == np.hstack(a))
+
     def test_find_path_undirected(self):
         g = cubic(shape=[4, 4, 1])
         p = queries.find_path(network=g, pairs=[[0, 11], [11, 0]])
@@ -226,6 +240,39 @@ class SKGRQueriesTest:
         assert p['edge_paths'][0] == []
         assert p['edge_paths'][1] == [0]
 
+    def test_find_shortest_paths_ragged(self):
+        g = cubic(shape=[4, 4, 1])
+        p = queries.find_shortest_paths(network=g, sources=[0, 5, 3],
+                                        targets=[15, 5, 0])
+        assert np.all(p.distance == [6, 0, 3])
+        assert np.all(np.diff(p.node_indptr) == [7, 1, 4])
+        assert np.all(np.diff(p.edge_indptr) == [6, 0, 3])
+        n = p.nodes[p.node_indptr[2]:p.node_indptr[3]]
+        e = p.edges[p.edge_indptr[2]:p.edge_indptr[3]]
+        assert np.all(n == [3, 2, 1, 0])
+        assert np.all(np.sort(g['edge.conns'][e], axis=None)
+                      == [0, 1, 1, 2, 2, 3])
+
+    def test_find_shortest_paths_one_to_all(self):
+        g = cubic(shape=[4, 4, 1])
+        p = queries.find_shortest_paths(network=g, sources=[0, 15])
+        assert p.sources.size == 32
+        assert np.all(p.targets[:16] == np.arange(16))
+        assert np.all(p.distance[:16] == p.distance[16:][::-1])
+        assert np.all(p.nodes[p.node_indptr[:-1]] == p.sources)
+        assert np.all(p.nodes[p.node_indptr[1:] - 1] == p.targets)
+
+    def test_find_shortest_paths_weights(self):
+        g = cubic(shape=[3, 2, 1])
+        # Make the direct edge between 0 and 1 expensive
+        w = np.ones(g['edge.conns'].shape[0])
+        w[0] = 10
+        p = queries.find_shortest_paths(network=g, sources=[0], targets=[1],
+                                        weights=w)
+        assert p.distance[0] == 3
+        assert np.all(p.nodes == [0, 2, 3, 1])
+        assert 0 not in p.edges
+
 
 if __name__ == '__main__':
     t = SKGRQueriesTest()
@@ -0,0 +1,95 @@
+import numpy as np
+from openpnm._skgraph.generators import cubic
+from openpnm._skgraph import simulations
+
+
+class SKGRSimulationsTest:
+    def setup_class(self):
+        np.random.seed(0)
+        self.g = cubic(shape=[10, 10, 1])
+        self.conns = self.g['edge.conns']
+        self.inlets = np.where(self.g['node.coords'][:, 0] < 1)[0]
+        self.outlets = np.where(self.g['node.coords'][:, 0] > 9)[0]
+
+    def test_incremental_clusters_bonds(self):
+        c = simulations.IncrementalClusters(self.conns)
+        vals = np.random.rand(self.conns.shape[0])
+        for p in np.linspace(0, 1, 11):
+            c.add_bonds(vals <= p)
+            s1, b1 = c.labels
+            s2, b2 = simulations.bond_percolation(self.conns, vals <= p)
+            # Labels differ in numbering but must describe the same clusters
+            assert np.all((s1 >= 0) == (s2 >= 0))
+            assert np.all((b1 >= 0) == (b2 >= 0))
+            pairs = np.unique(np.vstack((s1, s2)).T, axis=0)
+            assert len(np.unique(pairs[:, 0])) == len(pairs)
+            assert len(np.unique(pairs[:, 1])) == len(pairs)
+            flag = simulations.ispercolating(self.conns, vals <= p,
+                                             self.inlets, self.outlets)
+            assert c.ispercolating(self.inlets, self.outlets) == flag
+
+    def test_incremental_clusters_sites(self):
+        c = simulations.IncrementalClusters(self.conns)
+        vals = np.random.rand(self.conns.max() + 1)
+        for p in np.linspace(0, 1, 11):
+            c.add_sites(vals <= p)
+            s1, b1 = c.labels
+            s2, b2 = simulations.site_percolation(self.conns, vals <= p)
+            assert np.all((s1 >= 0) == (s2 >= 0))
+            assert np.all((b1 >= 0) == (b2 >= 0))
+            s, b = c.find_connected(self.inlets)
+            hits = np.unique(s2[self.inlets])
+            hits = hits[hits >= 0]
+            assert np.all(s == np.isin(s2, hits))
+            assert np.all(b == np.isin(b2, hits))
+
+    def test_find_percolation_threshold(self):
+        vals = np.random.rand(self.conns.shape[0])
+        Pc = simulations.find_percolation_threshold(
+            self.conns, vals, self.inlets, self.outlets)
+        assert simulations.ispercolating(self.conns, vals <= Pc,
+                                         self.inlets, self.outlets)
+        assert not simulations.ispercolating(self.conns, vals < Pc,
+                                             self.inlets, self.outlets)
+        # Masks are also accepted
+        mask = np.zeros(self.conns.max() + 1, dtype=bool)
+        mask[self.outlets] = True
+        assert Pc == simulations.find_percolation_threshold(
+            self.conns, vals, self.inlets, mask)
+        # Disconnected inlets and outlets give inf
+        vals[np.any(np.isin(self.conns, self.inlets), axis=1)] = np.inf
+        Pc = simulations.find_percolation_threshold(
+            self.conns, vals, self.inlets, self.outlets)
+        assert Pc == np.inf
+
+    def test_find_percolation_threshold_shared_inlet_and_outlet(self):
+        conns = np.array([[0, 1], [1, 2]])
+        vals = np.array([3.0, 5.0])
+        Pc = simulations.find_percolation_threshold(conns, vals, [0], [0, 2])
+        assert Pc == 0.0
+        mask = np.array([True, False, False])
+        Pc = simulations.find_percolation_threshold(conns, vals, mask, mask)
+        assert Pc == 0.0
+
+    def test_find_percolation_threshold_isolated_sites(self):
+        # Sites 3 and 4 have no bonds, so are missed if Np is inferred
+        conns = np.array([[0, 1], [1, 2]])
+        vals = np.array([1.0, 2.0])
+        mask = np.zeros(5, dtype=bool)
+        mask[2] = True
+        Pc = simulations.find_percolation_threshold(
+            conns, vals, [0], mask, Np=5)
+        assert Pc == 2.0
+        Pc = simulations.find_percolation_threshold(
+            conns, vals, [0], [4], Np=5)
+        assert Pc == np.inf
+
+
+if __name__ == '__main__':
+    t = SKGRSimulationsTest()
+    t.setup_class()
+    self = t
+    for item in t.__dir__():
+        if item.startswith('test'):
+            print(f'Running test: {item}')
+            t.__getattribute__(item)()
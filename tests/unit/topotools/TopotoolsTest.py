@@ -139,6 +139,14 @@ class TopotoolsTest:
         assert net.Np == 150
         assert net.Nt == 300
 
+    def test_clone_pores_empty(self):
+        for mode in ['parents', 'siblings', 'isolated']:
+            net = op.network.Cubic(shape=[5, 5, 5])
+            topotools.clone_pores(network=net, pores=[], mode=mode)
+            assert net.Np == 125
+            assert net.Nt == 300
+            assert net.num_pores('clone') == 0
+
     def test_clone_pores_with_labels(self):
         net = op.network.Cubic(shape=[5, 5, 5])
         topotools.clone_pores(network=net, pores=net.pores('left'),
@@ -163,6 +171,21 @@ class TopotoolsTest:
         assert 'pore.test1' not in net2
         assert 'pore.test2' not in net2
 
+    def test_merge_networks_leaves_phases_unchanged(self):
+        net1 = op.network.Cubic(shape=[3, 3, 3])
+        net2 = op.network.Cubic(shape=[3, 3, 3])
+        phase = op.phase.Phase(network=net1)
+        phase['pore.test'] = 1.0
+        topotools.merge_networks(network=net1, donor=net2)
+        assert net1.Np == 54
+        assert phase['pore.test'].shape == (27, )
+        # Phases are extended if other additions are made alongside
+        with net1.transaction():
+            topotools.merge_networks(network=net1, donor=net2)
+            topotools.extend(network=net1, coords=[[9, 9, 9]])
+        assert net1.Np == 82
+        assert phase['pore.test'].shape == (82, )
+
     def test_merge_networks_with_active_geometries(self):
         pn = op.network.Cubic(shape=[3, 3, 3], name='net_01')
         pn2 = op.network.Cubic(shape=[3, 3, 3], name='net_02')
@@ -180,6 +203,14 @@ class TopotoolsTest:
         topotools.merge_pores(testnet, to_merge)
         assert testnet.Np == 998
 
+    def test_merge_pores_neighboring_groups(self):
+        net = op.network.Cubic(shape=[4, 1, 1])
+        topotools.merge_pores(net, [[0, 1], [2, 3]])
+        assert net.Np == 2
+        assert net.Nt == 1
+        assert np.allclose(net.coords[:, 0], [1.0, 3.0])
+        assert net.num_throats('merged') == 1
+
     def test_connect_pores(self):
         testnet = op.network.Cubic(shape=[10, 10, 10])
         Nt_old = testnet.Nt
@@ -228,6 +259,29 @@ class TopotoolsTest:
         topotools.trim(pn, throats=pn.Ts[trimmers])
         assert ~np.any(pn['throat.random'] < 0.25)
 
+    def test_trim_updates_neighbor_index(self):
+        from openpnm.network._network import _TopologyIndex
+        pn = op.network.Cubic(shape=[5, 4, 3])
+        pn.settings['pack_labels'] = True
+        pn['pore.left_half'] = pn['pore.coords'][:, 0] < 2.5
+        pn['throat.diameter'] = np.arange(pn.Nt, dtype=float)
+        water = op.phase.Water(network=pn)
+        pn.find_neighbor_pores(pores=0)
+        Ts = np.setdiff1d(pn.Ts, pn.find_neighbor_throats(pores=[1, 30]))
+        Ts = np.setdiff1d(Ts, [5, 60])
+        topotools.trim(pn, pores=[1, 30], throats=[5, 60], workers=2)
+        topo = pn._topology
+        assert topo is not None
+        assert pn._get_topology() is topo
+        new = _TopologyIndex(pn.conns, pn.coords, topo.version)
+        for item in ['indptr', 'pores', 'throats', 'am_order',
+                     'im_throats', 'im_order']:
+            assert np.all(getattr(topo, item) == getattr(new, item))
+        assert pn.num_pores('left_half') == 23
+        assert np.all(pn['throat.diameter'] == Ts)
+        assert water.Np == pn.Np
+        assert water['throat.all'].shape == (pn.Nt, )
+
     def test_iscoplanar(self):
         # Generate planar points with several parallel vectors at start
         coords = [[0, 0, 0], [0, 0, 0], [0, 0, 1], [0, 0, 2], [0, 1, 2]]
@@ -327,6 +381,19 @@ class TopotoolsTest:
         assert op.topotools.is_fully_connected(pn, pores_BC=[0]) is False
         assert op.topotools.is_fully_connected(pn, pores_BC=[]) is False
 
+    def test_is_fully_connected_updated_after_topology_changes(self):
+        pn = op.network.Cubic(shape=[4, 4, 1])
+        assert op.topotools.is_fully_connected(pn) is True
+        op.topotools.trim(network=pn, throats=pn.find_neighbor_throats(5))
+        assert op.topotools.is_fully_connected(pn) is False
+        mask = np.zeros(pn.Np, dtype=bool)
+        mask[[0, 5]] = True
+        assert op.topotools.is_fully_connected(pn, pores_BC=mask) is True
+        assert op.topotools.is_fully_connected(pn, pores_BC=[5, 0]) is True
+        assert op.topotools.is_fully_connected(pn, pores_BC=[0]) is False
+        op.topotools.extend(network=pn, throat_conns=[[4, 5]])
+        assert op.topotools.is_fully_connected(pn) is True
+
     def test_is_fully_connected_with_alg(self):
         pn = op.network.Cubic(shape=[4, 4, 1])
         Ts = pn.find_neighbor_throats(5)
@@ -37,6 +37,39 @@ class ProjectTest:
         with pytest.raises(KeyError):
             air.project._get_locations('pore.foo')
 
+    def test_project_back_reference_after_copy(self):
+        pn = op.network.Cubic([3, 3, 3])
+        air = op.phase.Air(network=pn)
+        proj = pn.project.copy()
+        assert pn.project is not proj
+        assert proj.network.project is proj
+        assert proj.network is not pn
+        assert proj[air.name].project is proj
+        assert proj[air.name].network is proj.network
+        assert air.network is pn
+
+    def test_project_back_reference_after_remove(self):
+        pn = op.network.Cubic([3, 3, 3])
+        air = op.phase.Air(network=pn)
+        proj = pn.project
+        proj.remove(air)
+        assert air.project is None
+        proj.append(air)
+        assert air.project is proj
+        self.ws.close_project(proj)
+        assert pn.project is None
+
+    def test_pickle_project_with_back_references(self):
+        import pickle
+        pn = op.network.Cubic([3, 3, 3])
+        air = op.phase.Air(network=pn)
+        proj = pickle.loads(pickle.dumps(pn.project))
+        proj.name = self.ws._validate_name()
+        self.ws[proj.name] = proj
+        assert proj.network.project is proj
+        assert proj[air.name].models['pore.density@all'].target \
+            is proj[air.name]
+
     # def test_change_simulation_name_by_moving_in_dict(self):
     #     proj = self.ws.new_project()
     #     old_name = proj.name